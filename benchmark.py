@@ -0,0 +1,845 @@
+# НАГРУЗОЧНЫЕ ЗАМЕРЫ СЕРВИСОВ НА СИНТЕТИЧЕСКИХ ДАННЫХ
+"""Замер каждой публичной функции services/ на синтетических наборах 1x, 10x, 100x.
+
+    python benchmark.py                         # масштаб 1x, результат в benchmark_results.json
+    python benchmark.py --scale 1x --scale 10x --repeat 10 --output after.json --compare before.json
+    python benchmark.py --only cinema_service.sell --only scenario
+    python benchmark.py --engine-profiles --sales 300   # сравнение профилей движка
+
+Для каждого масштаба создаётся локальная база SQLite (RPM_BENCH_DB - URL
+базы, {scale} заменяется на масштаб). Созданная база переиспользуется, пока
+совпадают масштаб, seed и день набора, - это записано в файле <база>.json.
+Каждый вызов выполняется в транзакции, которая затем откатывается, поэтому
+изменяющие функции повторяются на одинаковых данных. Сценарии из нескольких
+вызовов (scenario.*_workflow) замеряются с настоящей фиксацией на копии
+набора, которая удаляется после замеров: отдельными вызовами сервисов и
+одной единицей работы ([unit_of_work]). Для каждого масштаба также
+сравниваются место на диске и память на одно место у карты мест (seat_maps)
+и у билета на каждое место (tickets) - раздел seat_storage. Интерфейс не нужен.
+
+С --engine-profiles вместо замеров функций сравниваются профили движка из
+config.ENGINE_PROFILES: для каждого на своей копии набора замеряются продажи
+мест по карте с настоящей фиксацией (продаж в секунду), а затем те же продажи
+при потоках отчётов и задержка отчётов, которые читают базу во время продаж.
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import argparse
+import gc
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import sqlalchemy
+from sqlalchemy import event, func, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import services
+from config import ENGINE_PROFILES
+from database import create_db_engine, init_db, transactional
+from models.cinema import Hall, Screening, Ticket, SeatMap
+from models.license import Contract
+from models.procurement import OrderSupliers, OrderClients
+from models.supplier import supplier_supply_type
+from models.read_models import TicketRow, columns_of
+from services import (analytics_service, cinema_service, expiry_service, license_service, procumenet_service,
+                      sales_rollup_service, schedule_service, seat_map_service, supplier_service)
+from utils.pagination import DEFAULT_PAGE_SIZE
+from utils.query_profiler import QueryProfiler
+from utils.synthetic_data import SCALES, DAYS_AFTER, create_dataset
+
+BENCH_DB_URL = os.environ.get("RPM_BENCH_DB", "sqlite:///" + os.path.join(tempfile.gettempdir(),
+                                                                          "rpm_benchmark_{scale}.db"))
+TICKET_SAMPLE = 500_000  # Билетов в сравнении загрузки ORM и строк чтения
+SLOWER_RATIO = 1.25  # Во сколько раз медиана должна вырасти, чтобы --compare отметил замедление
+SEAT_STORAGE_SCREENINGS = 50  # Показов каждого способа продажи в замере памяти мест
+PROFILE_SALES = 200  # Продаж по одному месту в каждом замере профиля движка
+PROFILE_READERS = 2  # Потоков отчётов, читающих базу во время продаж
+
+
+class Case(NamedTuple):
+    """Замер функции: run(db, data, *prepare(db, data)), время считается только для run"""
+    function: Callable
+    run: Callable
+    prepare: Optional[Callable] = None  # Подготовка данных в той же транзакции, не замеряется
+    label: str = ""
+    memory: bool = False  # Замерить пиковую память (tracemalloc) в отдельном прогоне
+    durable: bool = False  # Настоящие COMMIT на копии набора вместо отката внешней транзакции
+
+    @property
+    def name(self) -> str:
+        module = self.function.__module__
+        prefix = module.rsplit(".", 1)[-1] if module.startswith("services.") else "scenario"
+        return f"{prefix}.{self.function.__name__}" + (f"[{self.label}]" if self.label else "")
+
+
+# ПОДГОТОВКА НАБОРА ДАННЫХ
+
+def dataset_url(scale_name: str) -> str:
+    return BENCH_DB_URL.replace("{scale}", scale_name)
+
+
+def ensure_dataset(url: str, scale: int, seed: int, anchor: date) -> Dict[str, Any]:  # Создать или переиспользовать базу
+    path = make_url(url).database
+    meta_path = f"{path}.json"
+    expected = {'scale': scale, 'seed': seed, 'anchor': anchor.isoformat()}
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if all(meta.get(key) == value for key, value in expected.items()) and os.path.exists(path):
+            engine = create_db_engine(url)
+            try:
+                init_db(engine)  # Набор создан на старой версии схемы - применяем новые миграции
+            finally:
+                engine.dispose()
+            return dict(meta, reused=True)
+    if os.path.exists(path):
+        if not os.path.exists(meta_path):  # Чужой файл не удаляем
+            raise ValueError(f"Файл {path} существует и не создан benchmark.py, укажите другую базу в RPM_BENCH_DB")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    print(f"Создание набора {scale}x в {path}...", flush=True)
+    started = time.perf_counter()
+    counts = create_dataset(url, scale, seed, anchor)
+    meta = dict(expected, counts=counts, build_seconds=round(time.perf_counter() - started, 1))
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return dict(meta, reused=False)
+
+
+def discover(db: Session, anchor: date) -> Dict[str, Any]:  # ID и значения для вызовов на этом наборе
+    """Выбрать из набора объекты, на которых вызываются функции: показы, билеты, заказы и т.д."""
+    tomorrow = datetime.combine(anchor + timedelta(days=1), datetime.min.time())
+    past_day = anchor - timedelta(days=10)
+    data = {
+        'anchor': anchor,
+        'past_day': past_day.isoformat(),
+        'month_ago': (anchor - timedelta(days=30)).isoformat(),
+        'yesterday': (anchor - timedelta(days=1)).isoformat(),
+        'future_day': (anchor + timedelta(days=1)).isoformat(),
+        'free_week': (anchor + timedelta(days=DAYS_AFTER + 1)).isoformat(),  # Неделя без расписания
+        'year_ahead': (anchor + timedelta(days=365)).isoformat(),
+    }
+
+    has_seat_map = db.query(SeatMap.screening_id).filter(SeatMap.screening_id == Screening.id).exists()
+    future = db.query(Screening).filter(Screening.datetime >= tomorrow, ~has_seat_map).order_by(Screening.id).first()
+    free_seats = [seat for seat, in db.query(Ticket.seat_number).filter(
+        Ticket.screening_id == future.id, Ticket.sold == False).order_by(Ticket.id).limit(3)]
+    data.update(future_screening=future.id, film_id=future.film_id, hall_id=future.hall_id, free_seats=free_seats[:2],
+                unsold_ticket=db.query(Ticket.id).filter(Ticket.screening_id == future.id,
+                                                         Ticket.seat_number == free_seats[2]).scalar())
+    sold_ticket = db.query(Ticket).join(Screening, Screening.id == Ticket.screening_id).filter(
+        Screening.datetime >= tomorrow, Ticket.sold == True).order_by(Ticket.id).first()
+    data.update(sold_future_ticket=sold_ticket.id, client_order=sold_ticket.order_id)
+
+    seat_map = db.query(SeatMap).order_by(SeatMap.screening_id).first()
+    data['seat_map_screenings'] = [screening_id for screening_id, in db.query(SeatMap.screening_id).join(
+        Screening, Screening.id == SeatMap.screening_id).filter(Screening.datetime >= tomorrow).order_by(
+        SeatMap.screening_id)]
+    free_indexes = seat_map_service.get_available_seat_indexes(seat_map)
+    data.update(seat_map=seat_map, seat_map_screening=seat_map.screening_id, free_indexes=free_indexes[:2],
+                sold_index=next(index for index in range(seat_map.seat_count)
+                                if seat_map_service.is_seat_sold(seat_map, index)))
+
+    day_start = datetime.combine(past_day, datetime.min.time())
+    day_ids = [screening_id for screening_id, in db.query(Screening.id).filter(
+        Screening.datetime >= day_start, Screening.datetime < day_start + timedelta(days=1)).order_by(Screening.id)]
+    data.update(past_screening=day_ids[0], day_screenings=day_ids)
+    data['other_hall'] = db.query(Hall.id).filter(Hall.id != future.hall_id).order_by(Hall.id).limit(1).scalar()
+    data['hall'] = db.query(Hall).order_by(Hall.id).first()
+
+    contract = db.query(Contract).filter(Contract.end_date >= anchor + timedelta(days=60),
+                                         Contract.start_date <= anchor).order_by(Contract.id).first()
+    linked = {type_id for type_id, in db.query(supplier_supply_type.c.supply_type_id).filter(
+        supplier_supply_type.c.supplier_id == contract.supplier_id)}
+    data.update(contract_id=contract.id, supplier_id=contract.supplier_id,
+                contract_end=min(contract.end_date, anchor + timedelta(days=60)).isoformat(),
+                linked_type=min(linked), unlinked_type=min({1, 2, 3, 4, 5} - linked))
+    data['supplier_order'] = db.query(OrderSupliers.id).filter(
+        OrderSupliers.status.in_(["создан", "в процессе"])).order_by(OrderSupliers.id).limit(1).scalar()
+
+    screenings = db.query(func.count(Screening.id)).scalar()
+    deep = db.query(Screening.datetime, Screening.id).order_by(Screening.datetime, Screening.id).offset(
+        screenings * 9 // 10).first()
+    orders = db.query(func.count(OrderClients.id)).scalar()
+    deep_order = db.query(OrderClients.order_date, OrderClients.id).order_by(
+        OrderClients.order_date.desc(), OrderClients.id.desc()).offset(orders * 9 // 10).first()
+    data.update(deep_screening_cursor=tuple(deep), deep_order_cursor=tuple(deep_order))
+    return data
+
+
+# СЦЕНАРИИ ИЗ ОТЛОЖЕННЫХ ЗАМЕРОВ
+
+def load_tickets_orm(db: Session, data: Dict[str, Any]) -> int:  # Билеты ORM-объектами
+    return len(db.query(Ticket).limit(TICKET_SAMPLE).all())
+
+
+def load_tickets_projection(db: Session, data: Dict[str, Any]) -> int:  # Те же билеты строками чтения
+    return len([TicketRow._make(row) for row in db.query(*columns_of(TicketRow, Ticket)).limit(TICKET_SAMPLE)])
+
+
+def order_workflow(db: Session, data: Dict[str, Any], screening_id: int,
+                   seat_indexes: List[int]):  # Касса: заказ, продажа мест, сумма заказа
+    order = procumenet_service.create_client_order(db, "Клиент сценария", "+79990000002")
+    tickets = seat_map_service.sell_seats(db, screening_id, seat_indexes, order_id=order.id)
+    return procumenet_service.update_client_order_amount(db, order.id, sum(ticket.price for ticket in tickets))
+
+
+def supplier_order_workflow(db: Session, data: Dict[str, Any]):  # Закупка: заказ поставщику и три позиции
+    order = procumenet_service.create_supplier_order(db, data['supplier_id'], data['contract_id'])
+    for number in range(1, 4):
+        procumenet_service.add_item_to_supplier_order(db, order.id, f"Позиция {number}", 10, 150.0)
+    return order
+
+
+# ВЫЗОВЫ ФУНКЦИЙ
+
+def _created(function, *args, **kwargs):  # Подготовка: создать объект и передать его ID в замер
+    return lambda db, d: (function(db, *[arg(d) if callable(arg) else arg for arg in args], **kwargs).id,)
+
+
+def _screening(key):  # Подготовка: ORM-объект показа
+    return lambda db, d: (db.get(Screening, d[key]),)
+
+
+def _scan(db, d):
+    expiry_service.scan_expiring(db)
+    return ()
+
+
+def _schedule(db, d):
+    return (schedule_service.generate_weekly_schedule(db, d['free_week'], days=7),)
+
+
+def _free_seats(db, d):  # Подготовка: показ и два места, ещё не проданные прошлыми прогонами сценария
+    for screening_id in d['seat_map_screenings']:
+        free_indexes = seat_map_service.get_available_seat_indexes(seat_map_service.get_seat_map(db, screening_id))
+        if len(free_indexes) >= 2:
+            return screening_id, free_indexes[:2]
+    raise ValueError("В копии набора не осталось свободных мест по карте")
+
+
+def build_cases() -> List[Case]:
+    cs, ls, ps, ss = cinema_service, license_service, procumenet_service, supplier_service
+    an, ex, sr, sc, sm = analytics_service, expiry_service, sales_rollup_service, schedule_service, seat_map_service
+    page = DEFAULT_PAGE_SIZE
+    return [
+        # АНАЛИТИКА
+        Case(an.add_supplier_score, lambda db, d: an.add_supplier_score(db, d['supplier_id'], 4.0, 4.5, 3.5, 5.0)),
+        Case(an.get_all_scores, lambda db, d: an.get_all_scores(db)),
+        Case(an.remove_score, lambda db, d: an.remove_score(db, 1)),
+        Case(an.create_complaint, lambda db, d: an.create_complaint(db, "Замер производительности",
+                                                                    order_id=d['client_order'])),
+        Case(an.get_all_complaints, lambda db, d: an.get_all_complaints(db, status="на рассмотрении")),
+        Case(an.update_complaint_status, lambda db, d: an.update_complaint_status(db, 1, "решён")),
+        Case(an.delete_complaint, lambda db, d: an.delete_complaint(db, 1)),
+        Case(an.get_complaint_stats, lambda db, d: an.get_complaint_stats(db, 365)),
+        Case(an.get_supplier_top, lambda db, d: an.get_supplier_top(db, 30, 10)),
+
+        # ФИЛЬМЫ И ЗАЛЫ
+        Case(cs.create_film, lambda db, d: cs.create_film(db, 1, "Фильм для замера", 120, "Описание")),
+        Case(cs.get_all_films, lambda db, d: cs.get_all_films(db, limit=page, with_total=True)),
+        Case(cs.get_all_films, lambda db, d: cs.get_all_films(db, active_only=True), label="active"),
+        Case(cs.get_films_page, lambda db, d: cs.get_films_page(db)),
+        Case(cs.get_film_by_id, lambda db, d: cs.get_film_by_id(db, d['film_id'])),
+        Case(cs.update_film, lambda db, d: cs.update_film(db, d['film_id'], description="Новое описание")),
+        Case(cs.delete_film, lambda db, d, film_id: cs.delete_film(db, film_id),
+             _created(cs.create_film, 1, "Фильм для удаления", 100)),
+        Case(cs.create_hall, lambda db, d: cs.create_hall(db, "Зал для замера", 10, 12)),
+        Case(cs.get_all_halls, lambda db, d: cs.get_all_halls(db)),
+        Case(cs.get_halls_page, lambda db, d: cs.get_halls_page(db)),
+        Case(cs.get_hall_by_id, lambda db, d: cs.get_hall_by_id(db, d['hall_id'])),
+        Case(cs.get_hall_by_name, lambda db, d: cs.get_hall_by_name(db, d['hall'].name)),
+        Case(cs.get_hall_layout, lambda db, d: cs.get_hall_layout(d['hall'])),
+        Case(cs.delete_hall, lambda db, d, hall_id: cs.delete_hall(db, hall_id),
+             _created(cs.create_hall, "Зал для удаления", 10, 12)),
+
+        # ПОКАЗЫ
+        Case(cs.create_screening, lambda db, d: cs.create_screening(db, d['film_id'], d['free_week'] + " 10:00",
+                                                                    d['hall'].name, 350.0)),
+        Case(cs.get_all_screenings, lambda db, d: cs.get_all_screenings(db, start_date=d['past_day'],
+                                                                        end_date=d['past_day'])),
+        Case(cs.list_screenings, lambda db, d: cs.list_screenings(db, limit=page, with_total=True)),
+        Case(cs.list_screenings, lambda db, d: cs.list_screenings(db, cursor=d['deep_screening_cursor'], limit=page),
+             label="deep page"),
+        Case(cs.list_screenings, lambda db, d: cs.list_screenings(db, sort='film', limit=page), label="by film"),
+        Case(cs.get_screenings_page, lambda db, d: cs.get_screenings_page(db)),
+        Case(cs.get_available_screenings, lambda db, d: cs.get_available_screenings(db)),
+        Case(cs.update_screening, lambda db, d: cs.update_screening(db, d['future_screening'], ticket_price=380.0)),
+        Case(cs.delete_screening, lambda db, d, screening_id: cs.delete_screening(db, screening_id),
+             _created(cs.create_screening, lambda d: d['film_id'], lambda d: d['free_week'] + " 12:00",
+                      lambda d: d['hall'].name, 300.0)),
+        Case(cs.get_screenings_for_date, lambda db, d: cs.get_screenings_for_date(db, d['past_day'])),
+
+        # БИЛЕТЫ И ПРОДАЖИ
+        Case(cs.create_ticket, lambda db, d: cs.create_ticket(db, d['future_screening'], "99-1", 300.0)),
+        Case(cs.layout_seat_numbers, lambda db, d: cs.layout_seat_numbers(cs.get_hall_layout(d['hall']))),
+        Case(cs.generate_seat_inventory, lambda db, d, screening_id: cs.generate_seat_inventory(db, screening_id),
+             _created(cs.create_screening, lambda d: d['film_id'], lambda d: d['free_week'] + " 14:00",
+                      lambda d: d['hall'].name, 300.0)),
+        Case(cs.generate_inventory_for_period, lambda db, d: cs.generate_inventory_for_period(db, d['future_day'])),
+        Case(cs.get_tickets_by_screening, lambda db, d: cs.get_tickets_by_screening(db, d['past_screening'])),
+        Case(cs.get_available_seats, lambda db, d: cs.get_available_seats(db, d['future_screening'])),
+        Case(cs.sell_ticket, lambda db, d: cs.sell_ticket(db, d['unsold_ticket'])),
+        Case(cs.sell_tickets, lambda db, d: cs.sell_tickets(db, d['future_screening'], d['free_seats'],
+                                                            client_name="Иван Петров", phone="+79990000000")),
+        Case(cs.cancel_ticket_sale, lambda db, d: cs.cancel_ticket_sale(db, d['sold_future_ticket'])),
+        Case(cs.delete_ticket, lambda db, d: cs.delete_ticket(db, d['unsold_ticket'])),
+
+        # ОТЧЁТЫ КИНОТЕАТРА
+        Case(cs.get_daily_revenue, lambda db, d: cs.get_daily_revenue(db, d['past_day'])),
+        Case(cs.get_revenue_range, lambda db, d: cs.get_revenue_range(db, d['month_ago'], d['yesterday'])),
+        Case(cs.get_screening_attendance, lambda db, d: cs.get_screening_attendance(db, d['past_screening'])),
+        Case(cs.get_attendance_for_screenings,
+             lambda db, d: cs.get_attendance_for_screenings(db, d['day_screenings'])),
+        Case(cs.get_attendance_for_date, lambda db, d: cs.get_attendance_for_date(db, d['past_day'])),
+        Case(cs.get_popular_films, lambda db, d: cs.get_popular_films(db, 5, 30)),
+        Case(cs.get_popular_films, lambda db, d: cs.get_popular_films(db, 5, 30), label="cold",
+             prepare=lambda db, d: cs.leaderboard.invalidate() or ()),
+
+        # КАРТЫ МЕСТ
+        Case(sm.create_seat_map, lambda db, d, screening_id: sm.create_seat_map(db, screening_id),
+             _created(cs.create_screening, lambda d: d['film_id'], lambda d: d['free_week'] + " 16:00",
+                      lambda d: d['hall'].name, 300.0)),
+        Case(sm.get_seat_map, lambda db, d: sm.get_seat_map(db, d['seat_map_screening'])),
+        Case(sm.get_seat_numbers, lambda db, d: sm.get_seat_numbers(d['seat_map'])),
+        Case(sm.is_seat_sold, lambda db, d: sm.is_seat_sold(d['seat_map'], d['sold_index'])),
+        Case(sm.get_available_seat_indexes, lambda db, d: sm.get_available_seat_indexes(d['seat_map'])),
+        Case(sm.get_seat_price, lambda db, d: sm.get_seat_price(d['seat_map'], d['sold_index'], 300.0)),
+        Case(sm.get_seat_map_occupancy, lambda db, d: sm.get_seat_map_occupancy(d['seat_map'])),
+        Case(sm.sell_seats, lambda db, d: sm.sell_seats(db, d['seat_map_screening'], d['free_indexes'])),
+        Case(sm.cancel_seats, lambda db, d: sm.cancel_seats(db, d['seat_map_screening'], [d['sold_index']])),
+        Case(sm.migrate_screening_to_seat_map,
+             lambda db, d: sm.migrate_screening_to_seat_map(db, d['future_screening'])),
+
+        # ИТОГИ ПРОДАЖ И РАСПИСАНИЕ
+        Case(sr.rollup_generation, lambda db, d: sr.rollup_generation()),
+        Case(sr.rollup_version, lambda db, d: sr.rollup_version(db)),
+        Case(sr.has_uncommitted_rollup_changes, lambda db, d: sr.has_uncommitted_rollup_changes(db)),
+        Case(sr.record_ticket_sales, lambda db, d, screening: sr.record_ticket_sales(
+            db, screening, datetime.now(), 2, 600.0), _screening('future_screening')),
+        Case(sr.record_ticket_refunds, lambda db, d, screening: sr.record_ticket_refunds(
+            db, screening, datetime.now() - timedelta(days=1), 1, 300.0), _screening('future_screening')),
+        Case(sr.move_screening_sales, lambda db, d, screening: sr.move_screening_sales(
+            db, screening.id, screening.film_id, screening.hall_id, d['other_hall']), _screening('past_screening')),
+        Case(sr.rebuild_sales_rollup, lambda db, d: sr.rebuild_sales_rollup(db, d['month_ago'], d['yesterday']),
+             label="month"),
+        Case(sc.generate_weekly_schedule, lambda db, d: sc.generate_weekly_schedule(db, d['free_week'], days=7)),
+        Case(sc.validate_schedule, lambda db, d, slots: sc.validate_schedule(db, slots), _schedule),
+        Case(sc.save_schedule, lambda db, d, slots: sc.save_schedule(db, slots, 350.0), _schedule),
+
+        # КОНТРАКТЫ И ЛИЦЕНЗИИ
+        Case(ls.create_contract, lambda db, d: ls.create_contract(db, d['supplier_id'], "Договор для замера",
+                                                                  d['anchor'].isoformat(), d['year_ahead'])),
+        Case(ls.get_all_contracts, lambda db, d: ls.get_all_contracts(db, active_only=True)),
+        Case(ls.get_contracts_page, lambda db, d: ls.get_contracts_page(db)),
+        Case(ls.get_contract_by_id, lambda db, d: ls.get_contract_by_id(db, d['contract_id'])),
+        Case(ls.update_contract, lambda db, d: ls.update_contract(db, d['contract_id'], title="Договор (изменён)")),
+        Case(ls.delete_contract, lambda db, d, contract_id: ls.delete_contract(db, contract_id),
+             _created(ls.create_contract, lambda d: d['supplier_id'], "Договор для удаления",
+                      lambda d: d['anchor'].isoformat(), lambda d: d['year_ahead'])),
+        Case(ls.create_license, lambda db, d: ls.create_license(db, d['supplier_id'], d['contract_id'],
+                                                                "Лицензия для замера", "BENCH-KEY-1",
+                                                                d['anchor'].isoformat(), d['contract_end'])),
+        Case(ls.get_all_licenses, lambda db, d: ls.get_all_licenses(db, active_only=True)),
+        Case(ls.get_licenses_page, lambda db, d: ls.get_licenses_page(db)),
+        Case(ls.get_license_by_id, lambda db, d: ls.get_license_by_id(db, 1)),
+        Case(ls.update_license, lambda db, d: ls.update_license(db, 1, digital_key="BENCH-KEY-2")),
+        Case(ls.delete_license, lambda db, d, license_id: ls.delete_license(db, license_id),
+             _created(ls.create_license, lambda d: d['supplier_id'], lambda d: d['contract_id'],
+                      "Лицензия для удаления", "BENCH-KEY-3", lambda d: d['anchor'].isoformat(),
+                      lambda d: d['contract_end'])),
+        Case(ls.get_expiring_contracts, lambda db, d: ls.get_expiring_contracts(db, 30)),
+        Case(ls.get_expiring_licenses, lambda db, d: ls.get_expiring_licenses(db, 30)),
+        Case(ls.get_contract_summary, lambda db, d: ls.get_contract_summary(db, d['contract_id'])),
+        Case(ls.get_all_contract_summaries, lambda db, d: ls.get_all_contract_summaries(db)),
+        Case(ls.get_supplier_contracts_summary, lambda db, d: ls.get_supplier_contracts_summary(db, d['supplier_id'])),
+        Case(ls.get_all_supplier_contract_summaries, lambda db, d: ls.get_all_supplier_contract_summaries(db)),
+
+        # УВЕДОМЛЕНИЯ О СРОКАХ
+        Case(ex.scan_expiring, lambda db, d: ex.scan_expiring(db)),
+        Case(ex.scan_expiring, lambda db, d: ex.scan_expiring(db), _scan, label="unchanged"),
+        Case(ex.get_expiry_notifications, lambda db, d: ex.get_expiry_notifications(db), _scan),
+        Case(ex.diff_notifications, lambda db, d, notifications: ex.diff_notifications(
+            {(item['kind'], item['object_id']): item for item in notifications[1:]}, notifications),
+             lambda db, d: (_scan(db, d) or ex.get_expiry_notifications(db),)),
+
+        # ЗАКАЗЫ
+        Case(ps.create_supplier_order, lambda db, d: ps.create_supplier_order(db, d['supplier_id'], d['contract_id'],
+                                                                              d['future_day'])),
+        Case(ps.get_all_supplier_orders, lambda db, d: ps.get_all_supplier_orders(db, limit=page, with_total=True)),
+        Case(ps.get_supplier_order_by_id, lambda db, d: ps.get_supplier_order_by_id(db, d['supplier_order'])),
+        Case(ps.update_supplier_order_status,
+             lambda db, d: ps.update_supplier_order_status(db, d['supplier_order'], "доставлен")),
+        Case(ps.add_item_to_supplier_order,
+             lambda db, d: ps.add_item_to_supplier_order(db, d['supplier_order'], "Попкорн", 10, 100.0)),
+        Case(ps.get_order_items, lambda db, d: ps.get_order_items(db, d['supplier_order'])),
+        Case(ps.delete_supplier_order, lambda db, d, order_id: ps.delete_supplier_order(db, order_id),
+             _created(ps.create_supplier_order, lambda d: d['supplier_id'], lambda d: d['contract_id'])),
+        Case(ps.create_client_order, lambda db, d: ps.create_client_order(db, "Иван Петров", "+79990000000")),
+        Case(ps.get_all_client_orders, lambda db, d: ps.get_all_client_orders(db, limit=page, with_total=True)),
+        Case(ps.get_all_client_orders, lambda db, d: ps.get_all_client_orders(db, cursor=d['deep_order_cursor'],
+                                                                              limit=page), label="deep page"),
+        Case(ps.get_client_order_by_id, lambda db, d: ps.get_client_order_by_id(db, d['client_order'])),
+        Case(ps.update_client_order_status,
+             lambda db, d: ps.update_client_order_status(db, d['client_order'], "оплачен")),
+        Case(ps.update_client_order_amount,
+             lambda db, d: ps.update_client_order_amount(db, d['client_order'], 1000.0)),
+        Case(ps.delete_client_order, lambda db, d, order_id: ps.delete_client_order(db, order_id),
+             _created(ps.create_client_order, "Клиент для удаления", "+79990000001")),
+        Case(ps.get_supplier_order_stats, lambda db, d: ps.get_supplier_order_stats(db, d['supplier_id'])),
+        Case(ps.get_daily_client_revenue, lambda db, d: ps.get_daily_client_revenue(db, d['past_day'])),
+        Case(ps.get_top_suppliers, lambda db, d: ps.get_top_suppliers(db, 5, 365)),
+
+        # ПОСТАВЩИКИ
+        Case(ss.create_supplier, lambda db, d: ss.create_supplier(db, "ООО «Замер»", "+79990000002", "ИНН 0", [2])),
+        Case(ss.get_all_suppliers, lambda db, d: ss.get_all_suppliers(db, limit=page, with_total=True)),
+        Case(ss.get_all_suppliers, lambda db, d: ss.get_all_suppliers(db, supply_type_id=1), label="by type"),
+        Case(ss.get_suppliers_page, lambda db, d: ss.get_suppliers_page(db)),
+        Case(ss.get_supplier_by_id, lambda db, d: ss.get_supplier_by_id(db, d['supplier_id'])),
+        Case(ss.update_supplier, lambda db, d: ss.update_supplier(db, d['supplier_id'], contact_info="+79990000003")),
+        Case(ss.add_supply_type_to_supplier,
+             lambda db, d: ss.add_supply_type_to_supplier(db, d['supplier_id'], d['unlinked_type'])),
+        Case(ss.remove_supply_type_from_supplier,
+             lambda db, d: ss.remove_supply_type_from_supplier(db, d['supplier_id'], d['linked_type'])),
+        Case(ss.delete_supplier, lambda db, d, supplier_id: ss.delete_supplier(db, supplier_id),
+             _created(ss.create_supplier, "ООО «Для удаления»")),
+        Case(ss.create_supply_type, lambda db, d: ss.create_supply_type(db, "замер", "Тип для замера")),
+        Case(ss.get_all_supply_types, lambda db, d: ss.get_all_supply_types(db)),
+        Case(ss.get_supply_type_by_id, lambda db, d: ss.get_supply_type_by_id(db, 1)),
+        Case(ss.update_supply_type, lambda db, d: ss.update_supply_type(db, 1, description="Прокат")),
+        Case(ss.delete_supply_type, lambda db, d, type_id: ss.delete_supply_type(db, type_id),
+             _created(ss.create_supply_type, "для удаления")),
+        Case(ss.get_supplier_stats, lambda db, d: ss.get_supplier_stats(db, d['supplier_id'])),
+        Case(ss.get_suppliers_by_supply_type, lambda db, d: ss.get_suppliers_by_supply_type(db, 1)),
+        Case(ss.search_suppliers, lambda db, d: ss.search_suppliers(db, "Кино")),
+
+        # СЦЕНАРИИ
+        Case(load_tickets_orm, load_tickets_orm, memory=True),
+        Case(load_tickets_projection, load_tickets_projection, memory=True),
+        Case(order_workflow, order_workflow, _free_seats, durable=True),
+        Case(order_workflow, transactional(order_workflow), _free_seats, label="unit_of_work", durable=True),
+        Case(supplier_order_workflow, supplier_order_workflow, durable=True),
+        Case(supplier_order_workflow, transactional(supplier_order_workflow), label="unit_of_work", durable=True),
+    ]
+
+
+def public_functions() -> List[Callable]:  # Все публичные функции модулей services
+    functions = []
+    for module_info in pkgutil.iter_modules(services.__path__):
+        module = importlib.import_module(f"services.{module_info.name}")
+        functions.extend(member for name, member in inspect.getmembers(module, inspect.isfunction)
+                         if not name.startswith("_") and member.__module__ == module.__name__)
+    return functions
+
+
+# ЗАМЕРЫ
+
+def rollback_engine(url: str, profile: str):  # Движок, на котором откат внешней транзакции отменяет commit сервисов
+    engine = create_db_engine(url, profile=profile)
+
+    @event.listens_for(engine, "connect")
+    def _manual_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None  # pysqlite сам не начинает транзакцию перед SAVEPOINT
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+def durable_copy(url: str) -> str:  # Копия набора для сценариев с настоящей фиксацией
+    path = make_url(url).database
+    copy_path = f"{path}.durable"
+    source, target = sqlite3.connect(path), sqlite3.connect(copy_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+    return f"sqlite:///{copy_path}"
+
+
+def remove_database(url: str) -> None:
+    path = make_url(url).database
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _call(db: Session, case: Case, data: Dict[str, Any], observe: Optional[Callable]) -> float:
+    args = case.prepare(db, data) if case.prepare else ()
+    gc.collect()
+    if observe is not None:
+        with observe():
+            case.run(db, data, *args)
+        return 0.0
+    started = time.perf_counter()
+    case.run(db, data, *args)
+    return (time.perf_counter() - started) * 1000
+
+
+def run_once(engine, case: Case, data: Dict[str, Any], observe: Optional[Callable] = None) -> float:  # Один вызов, мс
+    if case.durable:  # Копия набора: изменения остаются, COMMIT настоящий
+        with Session(engine, expire_on_commit=False) as db:
+            return _call(db, case, data, observe)
+    with engine.connect() as conn:
+        outer = conn.begin()
+        db = Session(bind=conn, join_transaction_mode="create_savepoint",
+                     expire_on_commit=False)  # commit сервиса - только точка сохранения
+        try:
+            return _call(db, case, data, observe)
+        finally:
+            db.close()
+            outer.rollback()  # Изменения замера не остаются в наборе
+
+
+def measure(engine, case: Case, data: Dict[str, Any], warmup: int, repeat: int) -> Dict[str, Any]:
+    """Время вызова после прогрева, затем отдельный прогон для числа запросов и памяти"""
+    try:
+        for _ in range(warmup):
+            run_once(engine, case, data)
+        timings = sorted(run_once(engine, case, data) for _ in range(repeat))
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+    result = {
+        'repeat': repeat,
+        'min_ms': round(timings[0], 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, round(0.95 * (len(timings) - 1)))], 3),
+        'max_ms': round(timings[-1], 3),
+    }
+
+    profiler = QueryProfiler().attach(engine)
+    try:
+        run_once(engine, case, data, observe=lambda: profiler.scope(case.name))
+    finally:
+        profiler.detach()
+    stats = profiler.as_dict().get(case.name, {})
+    result.update(statements=stats.get('statements', 0), rows=stats.get('rows', 0))
+
+    if case.memory:
+        tracemalloc.start()
+        try:
+            run_once(engine, case, data)
+            result['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_scale(scale_name: str, args, cases: List[Case]) -> Dict[str, Any]:
+    url = dataset_url(scale_name)
+    dataset = ensure_dataset(url, SCALES[scale_name], args.seed, args.anchor)
+    engine = rollback_engine(url, args.profile)
+    copy_url = durable_copy(url) if any(case.durable for case in cases) else None
+    durable_engine = create_db_engine(copy_url, profile=args.profile) if copy_url else None
+    try:
+        with Session(engine) as db:
+            data = discover(db, args.anchor)
+        results = {}
+        for case in cases:
+            result = results[case.name] = measure(durable_engine if case.durable else engine, case, data,
+                                                  args.warmup, args.repeat)
+            if 'error' in result:
+                print(f"{scale_name:>5} {case.name:<62} ОШИБКА {result['error']}", flush=True)
+            else:
+                print(f"{scale_name:>5} {case.name:<62} {result['median_ms']:>10.3f} мс "
+                      f"(p95 {result['p95_ms']:.3f}), запросов {result['statements']}", flush=True)
+        storage = seat_storage(engine) if not args.only or any(part in "seat_storage" for part in args.only) else None
+        if storage:
+            print(f"{scale_name:>5} место: tickets {storage['tickets']['disk_bytes_per_seat']} байт на диске, "
+                  f"{storage['tickets']['memory_bytes_per_seat']} в памяти; seat_maps "
+                  f"{storage['seat_maps']['disk_bytes_per_seat']} на диске, "
+                  f"{storage['seat_maps']['memory_bytes_per_seat']} в памяти", flush=True)
+    finally:
+        engine.dispose()
+        if copy_url:
+            durable_engine.dispose()
+            remove_database(copy_url)
+    return {'url': url, 'dataset': dataset, 'cases': results, 'seat_storage': storage}
+
+
+# КАРТА МЕСТ ПРОТИВ БИЛЕТА НА КАЖДОЕ МЕСТО
+
+def _table_bytes(db: Session, table) -> Optional[int]:  # Таблица с индексами на диске, None - SQLite без dbstat
+    names = [table.name] + [index.name for index in table.indexes]
+    placeholders = ", ".join(f":name_{number}" for number in range(len(names)))
+    try:
+        return db.execute(text(f"SELECT sum(pgsize) FROM dbstat WHERE name IN ({placeholders})"),
+                          {f"name_{number}": name for number, name in enumerate(names)}).scalar() or 0
+    except OperationalError:
+        return None
+
+
+def _peak_bytes(load: Callable) -> int:  # Пиковая память загрузки (tracemalloc)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        load()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _per_seat(total: Optional[int], seats: int) -> Optional[float]:
+    return round(total / seats, 1) if total is not None and seats else None
+
+
+def seat_storage(engine) -> Dict[str, Any]:
+    """Байт на одно место на диске и в памяти: строки tickets против битовой карты seat_maps"""
+    with Session(engine) as db:
+        ticket_rows = db.query(func.count(Ticket.id)).scalar()
+        seat_map_count, seat_map_seats = db.query(func.count(SeatMap.screening_id), func.sum(SeatMap.seat_count)).one()
+        has_seat_map = db.query(SeatMap.screening_id).filter(SeatMap.screening_id == Ticket.screening_id).exists()
+        ticket_screenings = [screening_id for screening_id, in db.query(Ticket.screening_id).filter(
+            ~has_seat_map).distinct().order_by(Ticket.screening_id).limit(SEAT_STORAGE_SCREENINGS)]
+        map_screenings = [screening_id for screening_id, in db.query(SeatMap.screening_id).order_by(
+            SeatMap.screening_id).limit(SEAT_STORAGE_SCREENINGS)]
+        result = {
+            'tickets': {'rows': ticket_rows, 'disk_bytes': _table_bytes(db, Ticket.__table__)},
+            'seat_maps': {'screenings': seat_map_count, 'seats': seat_map_seats or 0,
+                          'disk_bytes': _table_bytes(db, SeatMap.__table__)},
+        }
+
+    def load_tickets():  # Все места показов строками билетов и список свободных
+        with Session(engine) as db:
+            tickets = db.query(Ticket).filter(Ticket.screening_id.in_(ticket_screenings)).all()
+            load_tickets.seats = len(tickets)
+            return [ticket.seat_number for ticket in tickets if not ticket.sold]
+
+    def load_seat_maps():  # Те же данные по картам мест
+        with Session(engine) as db:
+            seat_maps = db.query(SeatMap).filter(SeatMap.screening_id.in_(map_screenings)).all()
+            load_seat_maps.seats = sum(seat_map.seat_count for seat_map in seat_maps)
+            return [seat_map_service.get_available_seat_indexes(seat_map) for seat_map in seat_maps]
+
+    for key, load, screenings in (('tickets', load_tickets, ticket_screenings),
+                                  ('seat_maps', load_seat_maps, map_screenings)):
+        peak = _peak_bytes(load)
+        result[key].update(loaded_screenings=len(screenings), loaded_seats=load.seats, peak_bytes=peak,
+                           memory_bytes_per_seat=_per_seat(peak, load.seats))
+    result['tickets']['disk_bytes_per_seat'] = _per_seat(result['tickets']['disk_bytes'], ticket_rows)
+    result['seat_maps']['disk_bytes_per_seat'] = _per_seat(result['seat_maps']['disk_bytes'], seat_map_seats)
+    return result
+
+
+# СРАВНЕНИЕ ПРОФИЛЕЙ ДВИЖКА
+
+def _percentile_ms(ordered: List[float], fraction: float) -> float:
+    return round(ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))], 3) if ordered else 0.0
+
+
+def _sale_seats(db: Session, data: Dict[str, Any], count: int) -> List[tuple]:  # Свободные места карт: (показ, индекс)
+    seats = []
+    for screening_id in data['seat_map_screenings']:
+        seat_map = seat_map_service.get_seat_map(db, screening_id)
+        seats.extend((screening_id, index) for index in seat_map_service.get_available_seat_indexes(seat_map))
+        if len(seats) >= count:
+            return seats[:count]
+    raise ValueError(f"В наборе меньше {count} свободных мест по карте, уменьшите --sales")
+
+
+def _sell_seats(engine, seats: List[tuple]) -> List[float]:  # Продажи по одному месту с фиксацией, время каждой, мс
+    timings = []
+    for screening_id, index in seats:
+        with Session(engine, expire_on_commit=False) as db:
+            started = time.perf_counter()
+            seat_map_service.sell_seats(db, screening_id, [index])
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _read_reports(engine, data: Dict[str, Any], stop: threading.Event, latencies: List[float],
+                  errors: List[str]) -> None:  # Поток отчётов: посещаемость за день, пока идут продажи
+    try:
+        while not stop.is_set():
+            with Session(engine) as db:
+                started = time.perf_counter()
+                cinema_service.get_attendance_for_date(db, data['past_day'])
+                latencies.append((time.perf_counter() - started) * 1000)
+    except Exception as e:
+        errors.append(f"{type(e).__name__}: {e}")
+
+
+def measure_engine_profile(url: str, profile: str, data: Dict[str, Any], sales: int) -> Dict[str, Any]:
+    """Продажи мест одни и при потоках отчётов на копии набора с профилем profile.
+    Потоков отчётов не больше, чем пул профиля даёт соединений сверх соединения продаж"""
+    settings = ENGINE_PROFILES[profile]
+    reader_count = min(PROFILE_READERS, settings['pool_size'] + settings['max_overflow'] - 1)
+    copy_url = durable_copy(url)
+    engine = create_db_engine(copy_url, profile=profile)
+    try:
+        with Session(engine) as db:
+            seats = _sale_seats(db, data, 2 * sales)
+        started = time.perf_counter()
+        alone = sorted(_sell_seats(engine, seats[:sales]))
+        alone_seconds = time.perf_counter() - started
+
+        stop = threading.Event()
+        latencies, errors = [], []
+        readers = [threading.Thread(target=_read_reports, args=(engine, data, stop, latencies, errors))
+                   for _ in range(reader_count)]
+        for reader in readers:
+            reader.start()
+        try:
+            started = time.perf_counter()
+            concurrent = sorted(_sell_seats(engine, seats[sales:]))
+            concurrent_seconds = time.perf_counter() - started
+        finally:
+            stop.set()
+            for reader in readers:
+                reader.join()
+    finally:
+        engine.dispose()
+        remove_database(copy_url)
+    if errors:
+        raise RuntimeError(f"Ошибка потока отчётов: {errors[0]}")
+    reads = sorted(latencies)
+    return {
+        'sales': sales,
+        'sales_per_second': round(sales / alone_seconds, 1),
+        'sale_median_ms': round(statistics.median(alone), 3),
+        'sale_p95_ms': _percentile_ms(alone, 0.95),
+        'concurrent_sales_per_second': round(sales / concurrent_seconds, 1),
+        'concurrent_sale_p95_ms': _percentile_ms(concurrent, 0.95),
+        'readers': reader_count,
+        'reads': len(reads),
+        'read_median_ms': round(statistics.median(reads), 3) if reads else 0.0,
+        'read_p95_ms': _percentile_ms(reads, 0.95),
+        'read_max_ms': round(reads[-1], 3) if reads else 0.0,
+    }
+
+
+def compare_engine_profiles(scale_name: str, args) -> Dict[str, Any]:  # Все профили движка на одном наборе
+    url = dataset_url(scale_name)
+    dataset = ensure_dataset(url, SCALES[scale_name], args.seed, args.anchor)
+    engine = create_db_engine(url)
+    try:
+        with Session(engine) as db:
+            data = discover(db, args.anchor)
+    finally:
+        engine.dispose()
+    results = {}
+    for profile in ENGINE_PROFILES:
+        try:
+            result = results[profile] = measure_engine_profile(url, profile, data, args.sales)
+        except Exception as e:
+            results[profile] = {'error': f"{type(e).__name__}: {e}"}
+            print(f"{scale_name:>5} {profile:<12} ОШИБКА {results[profile]['error']}", flush=True)
+            continue
+        reads = (f"отчёт при продажах {result['read_median_ms']:.3f} мс (p95 {result['read_p95_ms']:.3f}, "
+                 f"{result['reads']} чтений в {result['readers']} потоках)" if result['readers']
+                 else "без отчётов: пул профиля на одно соединение")
+        print(f"{scale_name:>5} {profile:<12} продаж/с {result['sales_per_second']:>8.1f} "
+              f"(с отчётами {result['concurrent_sales_per_second']:.1f}), {reads}", flush=True)
+    return {'url': url, 'dataset': dataset, 'profiles': results}
+
+
+def compare(results: Dict[str, Any], baseline_path: str) -> None:  # Сравнение медиан с прошлым запуском
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nСРАВНЕНИЕ С {baseline_path} ({baseline['meta'].get('commit')})")
+    for scale_name, scale in results['scales'].items():
+        old_cases = baseline.get('scales', {}).get(scale_name, {}).get('cases', {})
+        for name, result in scale['cases'].items():
+            old = old_cases.get(name)
+            if not old or 'median_ms' not in old or 'median_ms' not in result or not old['median_ms']:
+                continue
+            ratio = result['median_ms'] / old['median_ms']
+            mark = "  МЕДЛЕННЕЕ" if ratio >= SLOWER_RATIO else ""
+            print(f"{scale_name:>5} {name:<62} {old['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} мс "
+                  f"x{ratio:.2f}{mark}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):  # Не git-репозиторий или git не установлен
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры сервисов на синтетических данных")
+    parser.add_argument("--scale", action="append", choices=list(SCALES), help="масштаб набора (можно несколько)")
+    parser.add_argument("--warmup", type=int, default=1, help="прогревочных вызовов")
+    parser.add_argument("--repeat", type=int, default=5, help="замеряемых вызовов")
+    parser.add_argument("--seed", type=int, default=0, help="seed генератора данных")
+    parser.add_argument("--anchor", type=date.fromisoformat, default=date.today(), help="\"сегодня\" набора, YYYY-MM-DD")
+    parser.add_argument("--profile", default="box_office", help="профиль движка SQLite")
+    parser.add_argument("--only", action="append", help="замерять только функции, имя которых содержит строку")
+    parser.add_argument("--output", default="benchmark_results.json", help="файл результатов JSON")
+    parser.add_argument("--compare", help="файл результатов прошлого запуска для сравнения")
+    parser.add_argument("--engine-profiles", action="store_true",
+                        help="сравнить профили движка из config.ENGINE_PROFILES вместо замеров функций")
+    parser.add_argument("--sales", type=int, default=PROFILE_SALES, help="продаж в замере профиля движка")
+    args = parser.parse_args(argv)
+    if args.repeat < 1 or args.warmup < 0:
+        parser.error("--repeat должен быть положительным, --warmup - неотрицательным")
+    if args.sales < 1:
+        parser.error("--sales должен быть положительным")
+
+    cases = build_cases()
+    covered = {case.function for case in cases}
+    uncovered = sorted(f"{function.__module__}.{function.__name__}" for function in public_functions()
+                       if function not in covered)
+    for name in uncovered:
+        print(f"Нет замера для {name}")
+    if args.only:
+        cases = [case for case in cases if any(part in case.name for part in args.only)]
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'started_at': datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'profile': args.profile,
+            'seed': args.seed,
+            'anchor': args.anchor.isoformat(),
+            'warmup': args.warmup,
+            'repeat': args.repeat,
+            'sales': args.sales,
+        },
+        'uncovered': uncovered,
+        'scales': {},
+        'engine_profiles': {},
+    }
+    for scale_name in args.scale or ["1x"]:
+        if args.engine_profiles:
+            results['engine_profiles'][scale_name] = compare_engine_profiles(scale_name, args)
+        else:
+            results['scales'][scale_name] = run_scale(scale_name, args, cases)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+    print(f"Результаты записаны в {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# ЗАМЕР ВРЕМЕНИ ЗАПУСКА: КОМАНДНАЯ СТРОКА ПРОТИВ ГРАФИЧЕСКОГО ИНТЕРФЕЙСА
+"""Время от запуска нового интерпретатора до результата.
+
+    python benchmark_startup.py
+    python benchmark_startup.py --database sqlite:////tmp/rpm_benchmark_1x.db --repeat 20 --output startup.json
+
+Замеряются: пустой интерпретатор (python -c pass), отчёт командной строки
+(python -m rpm_cli popular-films) и интерфейс до первого кадра (импорт окон,
+init_db, показ главного окна и первый проход цикла событий; Qt без экрана -
+QT_QPA_PLATFORM=offscreen). Каждый запуск - отдельный процесс, поэтому
+учитывается весь импорт модулей. Обе медианы включают импорт SQLAlchemy,
+поэтому доля отчёта от запуска интерфейса показывает, сколько стоят PyQt и
+окна сверх сервисов. Отдельный запуск с python -X importtime показывает
+самые долгие импорты до первого кадра. Код выхода 1, если до первого кадра
+загружено окно раздела, медиана запуска интерфейса больше
+--max-first-frame-ms или доля отчёта больше --max-ratio.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+GUI_FIRST_FRAME = f"""
+import os, sys
+sys.path.insert(0, {ROOT!r})
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+from database import init_db
+from ui.main_window import MainWindow
+init_db()
+app = QApplication([])
+win = MainWindow()
+win.show()
+
+def first_frame():  # Первый проход цикла событий после показа окна
+    print("\\n".join(sorted(sys.modules)), flush=True)
+    os._exit(0)  # Не ждём фоновые задачи окна
+
+QTimer.singleShot(0, first_frame)
+app.exec()
+"""
+
+# Модули, которые не должны загружаться до первого кадра: окна разделов открываются по кнопке
+DEFERRED_MODULES = ("ui.content_window", "ui.finance_window", "ui.procurement_window", "ui.notification_dialog")
+TOP_IMPORTS = 10  # Самых долгих импортов верхнего уровня в отчёте
+
+CASES = {
+    'python': [sys.executable, "-c", "pass"],
+    'cli_report': [sys.executable, "-m", "rpm_cli", "popular-films"],
+    'gui_first_frame': [sys.executable, "-c", GUI_FIRST_FRAME],
+}
+
+
+def run_case(command: List[str], env: Dict[str, str]) -> float:  # Время одного запуска, мс
+    started = time.perf_counter()
+    process = subprocess.run(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    elapsed = (time.perf_counter() - started) * 1000
+    if process.returncode != 0:
+        raise RuntimeError(f"Запуск завершился с кодом {process.returncode}:\n{process.stderr.decode(errors='replace')}")
+    return elapsed
+
+
+def measure(command: List[str], env: Dict[str, str], warmup: int, repeat: int) -> Dict[str, Any]:
+    for _ in range(warmup):  # Прогрев файлового кэша ОС
+        run_case(command, env)
+    timings = sorted(run_case(command, env) for _ in range(repeat))
+    return {
+        'repeat': repeat,
+        'min_ms': round(timings[0], 1),
+        'median_ms': round(statistics.median(timings), 1),
+        'max_ms': round(timings[-1], 1),
+    }
+
+
+def import_profile(env: Dict[str, str]) -> Dict[str, Any]:
+    """Запуск интерфейса до первого кадра с python -X importtime: время импорта и загруженные модули"""
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", GUI_FIRST_FRAME], cwd=ROOT, env=env,
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Запуск завершился с кодом {process.returncode}:\n{process.stderr}")
+    top_level = []  # (модуль, накопленное время импорта в мкс) для импортов верхнего уровня
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name[1:].startswith(" "):  # Вложенные импорты сдвинуты отступом
+            top_level.append((name.strip(), int(cumulative)))
+    modules = set(process.stdout.split())
+    top_level.sort(key=lambda item: item[1], reverse=True)
+    return {
+        'import_ms': round(sum(cumulative for _, cumulative in top_level) / 1000, 1),
+        'top_imports': [{'module': name, 'ms': round(cumulative / 1000, 1)} for name, cumulative in top_level[:TOP_IMPORTS]],
+        'modules_loaded': len(modules),
+        'deferred_loaded': [name for name in DEFERRED_MODULES if name in modules],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Время запуска командной строки и интерфейса")
+    parser.add_argument("--database", help="URL базы (по умолчанию - новая пустая база во временном каталоге)")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--max-ratio", type=float, help="допустимая доля отчёта от запуска интерфейса")
+    parser.add_argument("--max-first-frame-ms", type=float, help="допустимая медиана запуска интерфейса, мс")
+    parser.add_argument("--output", help="файл результатов JSON")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    with tempfile.TemporaryDirectory() as tmp:
+        env["RPM_DATABASE_URL"] = args.database or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        run_case([sys.executable, "-m", "rpm_cli", "migrate"], env)  # Схема готова до замеров: запуски одинаковы
+        results = {}
+        for name, command in CASES.items():
+            results[name] = measure(command, env, args.warmup, args.repeat)
+            print(f"{name:<16} {results[name]['median_ms']:>8.1f} мс (min {results[name]['min_ms']:.1f})", flush=True)
+        imports = import_profile(env)
+
+    print(f"\nИмпорт до первого кадра: {imports['import_ms']:.1f} мс (-X importtime), модулей {imports['modules_loaded']}")
+    for item in imports['top_imports']:
+        print(f"  {item['module']:<40} {item['ms']:>8.1f} мс")
+    ratio = results['cli_report']['median_ms'] / results['gui_first_frame']['median_ms']
+    print(f"Отчёт командной строки: {ratio:.2f} от запуска интерфейса")
+
+    problems = [f"до первого кадра загружен {name}" for name in imports['deferred_loaded']]
+    if args.max_first_frame_ms is not None and results['gui_first_frame']['median_ms'] > args.max_first_frame_ms:
+        problems.append(f"запуск интерфейса дольше {args.max_first_frame_ms:.0f} мс")
+    if args.max_ratio is not None and ratio > args.max_ratio:
+        problems.append(f"доля отчёта от запуска интерфейса больше {args.max_ratio:.2f}")
+    for problem in problems:
+        print(f"ПРЕВЫШЕНИЕ: {problem}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                'meta': {'started_at': datetime.now().isoformat(timespec="seconds"),
+                         'python': platform.python_version(), 'platform': platform.platform()},
+                'cases': results,
+                'gui_imports': imports,
+                'cli_to_gui_ratio': round(ratio, 3),
+                'problems': problems,
+            }, f, ensure_ascii=False, indent=2)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,4 +11,54 @@ def get_database_path():
         base_dir = os.path.dirname(os.path.abspath(__file__)) # Если запущено как скрипт Python
     return os.path.join(base_dir, "database.db")
 
-DATABASE_URL = f"sqlite:///{get_database_path()}"
+DATABASE_URL = os.environ.get("RPM_DATABASE_URL", f"sqlite:///{get_database_path()}")  # Переменная окружения - другая база (замеры, обслуживание)
+
+
+# ПРОФИЛИ НАСТРОЙКИ ДВИЖКА SQLITE
+# Значения применяются через PRAGMA при каждом новом подключении к базе
+ENGINE_PROFILES = {
+    # Касса: частые короткие записи, читатели не блокируются продажей билета
+    "box_office": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -20000,  # ~20 МБ страничного кэша
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,  # мс ожидания блокировки вместо ошибки "database is locked"
+        "pool_size": 5,
+        "max_overflow": 10,
+    },
+    # Отчёты: длинные агрегирующие чтения, больше кэша и mmap
+    "reporting": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -131072,  # ~128 МБ
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+        "pool_size": 10,
+        "max_overflow": 10,
+    },
+    # Массовая загрузка: один писатель, без fsync на каждую транзакцию
+    "bulk_import": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,  # ~256 МБ
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+        "pool_size": 1,
+        "max_overflow": 0,
+    },
+}
+
+DATABASE_PROFILE = os.environ.get("RPM_DB_PROFILE", "box_office")  # Профиль движка по умолчанию
+DATABASE_ECHO = os.environ.get("RPM_DB_ECHO", "") == "1"  # Вывод SQL в консоль только по явному запросу
+QUERY_PROFILE_PATH = os.environ.get("RPM_QUERY_PROFILE", "")  # JSON со статистикой запросов по сервисам (пусто - профилирование выключено)
+
+# РАСПИСАНИЕ ПОКАЗОВ
+CLEANING_GAP_MINUTES = 15  # Минимальный перерыв между показами в одном зале на уборку
+
+# УВЕДОМЛЕНИЯ
+NOTIFICATION_DAYS_THRESHOLD = 30  # За сколько дней до окончания контракта или лицензии показывать уведомление
+NOTIFICATION_REFRESH_SECONDS = int(os.environ.get("RPM_NOTIFY_INTERVAL", "300"))  # Период фоновой проверки сроков
@@ -1,21 +1,124 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from config import DATABASE_URL
+from contextlib import contextmanager
+from functools import wraps
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from config import DATABASE_URL, DATABASE_PROFILE, DATABASE_ECHO, ENGINE_PROFILES
 
 # Создаем базовый класс для моделей
 Base = declarative_base()
 
+# PRAGMA, которые выставляются на каждом новом подключении
+_PRAGMAS = ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")
+
+# Фабрика движков с профилями настройки SQLite
+def create_db_engine(url: str = DATABASE_URL, profile: str = DATABASE_PROFILE, echo: bool = DATABASE_ECHO) -> Engine:
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Неизвестный профиль движка: {profile}. Допустимые значения: {list(ENGINE_PROFILES)}")
+    settings = ENGINE_PROFILES[profile]
+
+    engine_kwargs = {}
+    if url not in ("sqlite://", "sqlite:///:memory:"):  # Для базы в памяти пул не настраивается
+        engine_kwargs.update(pool_size=settings["pool_size"], max_overflow=settings["max_overflow"])
+    engine = create_engine(url, echo=echo, **engine_kwargs)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name in _PRAGMAS:
+            cursor.execute(f"PRAGMA {name} = {settings[name]}")
+        cursor.close()
+
+    return engine
+
 # Создаем движок (engine) для подключения к базе даннных
-_engine = create_engine(DATABASE_URL, echo=True)
+_engine = create_db_engine()
+
+# Фабрика для создания сессий: после фиксации объекты не устаревают, повторное чтение (refresh) не нужно -
+# значения по умолчанию у моделей задаются в Python, и база ничего не дописывает в строки сама
+SessionLocal = sessionmaker(bind=_engine, expire_on_commit=False)
+
+# ЕДИНИЦА РАБОТЫ: НЕСКОЛЬКО ВЫЗОВОВ СЕРВИСОВ В ОДНОЙ ТРАНЗАКЦИИ
+
+_UOW_DEPTH = "unit_of_work_depth"  # Ключи в db.info
+_UOW_FAILED = "unit_of_work_failed"  # Транзакция единицы откачена - единицу нельзя фиксировать
+
+def in_unit_of_work(db: Session) -> bool:
+    return db.info.get(_UOW_DEPTH, 0) > 0
 
-# Фабрика для создания сессий
-SessionLocal = sessionmaker(bind=_engine)
+def commit(db: Session) -> None:
+    """Фиксация в конце функции сервиса: внутри единицы работы - только flush, COMMIT сделает единица"""
+    if in_unit_of_work(db):
+        db.flush()
+    else:
+        db.commit()
+
+def rollback(db: Session) -> None:
+    """Откат в функции сервиса. Откатывается вся транзакция сессии, поэтому внутри единицы работы
+    теряются и её прежние изменения (в том числе записанные напрямую через db.add и flush) -
+    единица отменяется и в конце не фиксирует ничего"""
+    if in_unit_of_work(db):
+        db.info[_UOW_FAILED] = True
+    db.rollback()
+
+@contextmanager
+def unit_of_work(db: Session = None):
+    """Один COMMIT на все вызовы сервисов внутри блока, при исключении - откат всего блока.
+
+        with unit_of_work(db):
+            order = create_client_order(db, "Иван Петров", "+79990000000")
+            sell_seats(db, screening_id, [4, 5], order_id=order.id)
+
+    Без db открывается и закрывается своя сессия. Вложенные блоки входят во внешний:
+    исключение во вложенном блоке отменяет и внешний, даже если его перехватили.
+    """
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+    depth = db.info.get(_UOW_DEPTH, 0)
+    db.info[_UOW_DEPTH] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            if db.info.get(_UOW_FAILED):
+                raise ValueError("Единица работы отменена: изменения уже откачены одной из операций")
+            db.commit()
+    except Exception:
+        if depth == 0:
+            db.rollback()
+        else:
+            db.info[_UOW_FAILED] = True
+        raise
+    finally:
+        db.info[_UOW_DEPTH] = depth
+        if depth == 0:
+            db.info.pop(_UOW_FAILED, None)
+            if own_session:
+                db.close()
+
+def transactional(function):
+    """Декоратор функции function(db, ...): все её вызовы сервисов - одна единица работы"""
+    @wraps(function)
+    def wrapper(db: Session, *args, **kwargs):
+        with unit_of_work(db):
+            return function(db, *args, **kwargs)
+    return wrapper
+
+# Загрузка всех моделей: связи заданы именами классов и настраиваются, только когда импортированы все модели
+def load_models():
+    import models.supplier, models.license, models.cinema, models.procurement, models.analytics
+
+# Функция для инициализация базы данных (по умолчанию - основной базы программы)
+def init_db(engine: Engine = None):
+    engine = engine or _engine
+    from migrations import LATEST_VERSION, get_schema_version, run_migrations
+    with engine.connect() as conn:
+        if get_schema_version(conn) >= LATEST_VERSION:  # Схема актуальна: проверка каждой таблицы при запуске не нужна
+            return
 
-# Функция для инициализация базы данных
-def init_db():
     from models.supplier import Supplier, SupplyType, supplier_supply_type
-    from models.license import Contract, License
-    from models.cinema import Film, Screening, Ticket
+    from models.license import Contract, License, ExpiryNotification
+    from models.cinema import Film, Screening, Ticket, SeatMap, Hall, SalesDailyRollup, SalesRollupVersion
     from models.procurement import OrderSupliers, OrderClients, OrderItem
     from models.analytics import SupplierKPI, Complaint
     
@@ -27,13 +130,21 @@ def init_db():
         Contract.__table__,
         License.__table__,
         Film.__table__,
+        Hall.__table__,
         Screening.__table__,
         OrderClients.__table__,
         Ticket.__table__,
         OrderSupliers.__table__,
         OrderItem.__table__,
         SupplierKPI.__table__,
-        Complaint.__table__
+        Complaint.__table__,
+        SeatMap.__table__,
+        SalesDailyRollup.__table__,
+        SalesRollupVersion.__table__,
+        ExpiryNotification.__table__
     ]
     
-    Base.metadata.create_all(bind=_engine, tables=tables)
+    Base.metadata.create_all(bind=engine, tables=tables)
+
+    # Применяем миграции схемы (индексы и новые столбцы для существующих баз)
+    run_migrations(engine)
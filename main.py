@@ -1,10 +1,12 @@
 # ОСНОВНОЙ ФАЙЛ ДЛЯ ЗАПУСКА PYQT ПРОГРАММЫ
+import gc
 import sys
 import traceback
 
 from ui.main_window import MainWindow
 from PyQt6.QtWidgets import QApplication
 from database import init_db
+from config import QUERY_PROFILE_PATH
 
 def excepthook(exc_type, exc_value, exc_tb):
     error_msg = "".join(traceback.format_exception(exc_type, exc_value, exc_tb))
@@ -16,6 +18,10 @@ def excepthook(exc_type, exc_value, exc_tb):
 def main():
     sys.excepthook = excepthook
 
+    if QUERY_PROFILE_PATH:  # Статистика запросов сервисов за время работы программы
+        from utils.query_profiler import profiler
+        profiler.attach()
+
     # Инициализация базы данных
     try:
         init_db()
@@ -25,8 +31,14 @@ def main():
 
     app = QApplication([])
     win = MainWindow()
+    gc.freeze()  # Объекты запуска не просматриваются сборщиком мусора: его паузы во время фоновых отчётов короче
     win.show()
-    sys.exit(app.exec())
+    exit_code = app.exec()
+
+    if QUERY_PROFILE_PATH:
+        print(profiler.report())
+        profiler.dump_json(QUERY_PROFILE_PATH)
+    sys.exit(exit_code)
 
 
 if __name__ == '__main__':
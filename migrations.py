@@ -0,0 +1,165 @@
+# ВЕРСИОННЫЕ МИГРАЦИИ СХЕМЫ БАЗЫ ДАННЫХ
+# Номер применённой версии хранится в PRAGMA user_version базы SQLite,
+# поэтому уже установленные базы получают новые индексы и столбцы при запуске.
+# Для базы актуальной версии init_db не вызывает create_all, поэтому новая
+# таблица тоже добавляется только миграцией.
+
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from database import Base
+
+
+def get_schema_version(conn: Connection) -> int:
+    """Текущая версия схемы базы данных"""
+    return conn.execute(text("PRAGMA user_version")).scalar() or 0
+
+
+def _set_schema_version(conn: Connection, version: int) -> None:
+    conn.execute(text(f"PRAGMA user_version = {int(version)}"))
+
+
+def _create_indexes(conn: Connection, *index_names: str) -> None:
+    """Создать индексы, объявленные в ORM-моделях, если их ещё нет"""
+    indexes = {index.name: index for table in Base.metadata.tables.values() for index in table.indexes}
+    for name in index_names:
+        indexes[name].create(bind=conn, checkfirst=True)
+
+
+def _migration_1_hot_indexes(conn: Connection) -> None:
+    """Индексы под фильтры сервисов: билеты, показы, лицензии, контракты, заказы, претензии, KPI"""
+    _create_indexes(
+        conn,
+        'ix_tickets_screening_sold', 'ix_tickets_sold_date',
+        'ix_screenings_datetime', 'ix_screenings_hall_datetime', 'ix_screenings_film_datetime',
+        'ix_films_license_id',
+        'ix_licenses_end_date', 'ix_licenses_contract_id', 'ix_licenses_film_title', 'ix_licenses_digital_key',
+        'ix_contracts_end_date', 'ix_contracts_supplier_id',
+        'ix_complaints_date', 'ix_complaints_status_date',
+        'ix_supplier_kpis_calculation_date', 'ix_supplier_kpis_supplier_date',
+        'ix_orders_supliers_created_date', 'ix_orders_supliers_supplier_date',
+        'ix_orders_clients_order_date',
+    )
+
+
+def _column_exists(conn: Connection, table: str, column: str) -> bool:
+    return any(row[1] == column for row in conn.execute(text(f"PRAGMA table_info({table})")))
+
+
+def _migration_2_halls(conn: Connection) -> None:
+    """Залы как отдельная сущность: screenings.hall_id и перенос названий залов из текста"""
+    if not _column_exists(conn, 'screenings', 'hall_id'):
+        conn.execute(text("ALTER TABLE screenings ADD COLUMN hall_id INTEGER REFERENCES halls(id)"))
+
+    # Геометрия залов неизвестна, а вместимость берём как наибольшее число мест среди показов зала
+    conn.execute(text("""
+        INSERT INTO halls (name, rows, seats_per_row, capacity)
+        SELECT s.hall, 0, 0, COALESCE(MAX(t.seats), 0)
+        FROM screenings s
+        LEFT JOIN (SELECT screening_id, COUNT(*) AS seats FROM tickets GROUP BY screening_id) t
+            ON t.screening_id = s.id
+        WHERE s.hall NOT IN (SELECT name FROM halls)
+        GROUP BY s.hall
+    """))
+    conn.execute(text("""
+        UPDATE screenings SET hall_id = (SELECT halls.id FROM halls WHERE halls.name = screenings.hall)
+        WHERE hall_id IS NULL
+    """))
+    _create_indexes(conn, 'ix_screenings_hall_id_datetime')
+
+
+def _migration_3_screening_end(conn: Connection) -> None:
+    """Сохранённое время окончания показа для проверки пересечений по индексу"""
+    if not _column_exists(conn, 'screenings', 'end_datetime'):
+        conn.execute(text("ALTER TABLE screenings ADD COLUMN end_datetime DATETIME"))
+    conn.execute(text("""
+        UPDATE screenings SET end_datetime = (
+            SELECT datetime(screenings.datetime, '+' || COALESCE(films.duration, 0) || ' minutes') || '.000000'
+            FROM films WHERE films.id = screenings.film_id)
+        WHERE end_datetime IS NULL
+    """))
+    _create_indexes(conn, 'ix_screenings_hall_id_end')
+
+
+def _migration_4_sales_rollup(conn: Connection) -> None:
+    """Дневные итоги продаж: таблица и первичное заполнение по истории билетов"""
+    Base.metadata.tables['sales_daily_rollup'].create(bind=conn, checkfirst=True)
+    _create_indexes(conn, 'ix_sales_daily_rollup_film_date')
+    conn.execute(text("""
+        INSERT INTO sales_daily_rollup (date, film_id, hall_id, tickets_sold, revenue, refunds, refund_amount)
+        SELECT date(t.sold_date), COALESCE(s.film_id, 0), COALESCE(s.hall_id, 0), COUNT(t.id), ROUND(SUM(t.price), 2), 0, 0
+        FROM tickets t
+        LEFT JOIN screenings s ON s.id = t.screening_id
+        WHERE t.sold = 1 AND t.sold_date IS NOT NULL
+            AND NOT EXISTS (SELECT 1 FROM sales_daily_rollup)
+        GROUP BY date(t.sold_date), COALESCE(s.film_id, 0), COALESCE(s.hall_id, 0)
+    """))
+
+
+def _migration_5_expiry_notifications(conn: Connection) -> None:
+    """Состояние уведомлений об окончании сроков для инкрементального сканирования"""
+    Base.metadata.tables['expiry_notifications'].create(bind=conn, checkfirst=True)
+
+
+def _migration_6_list_indexes(conn: Connection) -> None:
+    """Индексы под постраничные списки фильмов и поставщиков по названию"""
+    _create_indexes(conn, 'ix_films_title_id', 'ix_suppliers_name_id')
+
+
+def _migration_7_expiry_threshold(conn: Connection) -> None:
+    """Состояние уведомлений отдельно для каждого порога дней. Сохранённые уведомления - только
+    результат прошлого сканирования, поэтому таблица создаётся заново и заполнится следующим сканированием"""
+    if not _column_exists(conn, 'expiry_notifications', 'days_threshold'):
+        conn.execute(text("DROP TABLE IF EXISTS expiry_notifications"))
+        Base.metadata.tables['expiry_notifications'].create(bind=conn)
+
+
+def _migration_8_sales_rollup_version(conn: Connection) -> None:
+    """Номер изменения итогов продаж в базе для кэшей отчётов в нескольких процессах"""
+    Base.metadata.tables['sales_rollup_version'].create(bind=conn, checkfirst=True)
+
+
+# СПИСОК МИГРАЦИЙ: (ВЕРСИЯ, ФУНКЦИЯ). НОВЫЕ МИГРАЦИИ ДОБАВЛЯЮТСЯ ТОЛЬКО В КОНЕЦ
+MIGRATIONS = [
+    (1, _migration_1_hot_indexes),
+    (2, _migration_2_halls),
+    (3, _migration_3_screening_end),
+    (4, _migration_4_sales_rollup),
+    (5, _migration_5_expiry_notifications),
+    (6, _migration_6_list_indexes),
+    (7, _migration_7_expiry_threshold),
+    (8, _migration_8_sales_rollup_version),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def run_migrations(engine: Engine) -> int:
+    """Применить все миграции новее текущей версии схемы, вернуть итоговую версию"""
+    with engine.begin() as conn:
+        version = get_schema_version(conn)
+        for target_version, migration in MIGRATIONS:
+            if target_version <= version:
+                continue
+            migration(conn)
+            _set_schema_version(conn, target_version)
+            version = target_version
+    return version
+
+
+def find_full_scans(conn: Connection, statement, parameters=None) -> List[str]:
+    """Строки EXPLAIN QUERY PLAN, в которых запрос читает таблицу целиком (SCAN без индекса).
+    statement - выражение SQLAlchemy или текст SQL драйвера с параметрами parameters"""
+    if isinstance(statement, str):
+        sql, params = statement, parameters or ()
+    else:
+        compiled = statement.compile(dialect=conn.dialect)
+        sql = str(compiled)
+        params = tuple(compiled.params[name] for name in compiled.positiontup) if compiled.positiontup else compiled.params
+    plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).all()]
+    subqueries = {detail.split()[1] for detail in plan
+                  if detail.startswith(("MATERIALIZE ", "CO-ROUTINE "))}  # Подзапросы, а не таблицы
+    return [detail for detail in plan if detail.startswith("SCAN ") and " INDEX " not in detail
+            and detail.split()[1] not in subqueries and not detail.startswith("SCAN CONSTANT ROW")]
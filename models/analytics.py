@@ -2,7 +2,7 @@
 # - АНАЛИТИКИ ЭФФЕКТИВНОСТИ ПОСТАВЩИКОВ
 # - УПРАВЛЕНИЕ ПРЕТЕНЗИЯМИ ОТ КЛИЕНТОВ
 
-from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 import sys
 import os
@@ -29,6 +29,12 @@ class SupplierKPI(Base):
     # СВЯЗИ ДЛЯ СОЗДАНИЕ ТАБЛИЦЫ
     supplier = relationship("Supplier", back_populates="kpi") # ПРИВЯЗКА ПОСТАВЩИКА К ORM МОДЕЛИ ПОСТАВЩИКОВ
 
+    # ИНДЕКСЫ ДЛЯ ВЫБОРКИ ОЦЕНОК ЗА ПЕРИОД
+    __table_args__ = (
+        Index('ix_supplier_kpis_calculation_date', 'calculation_date'),
+        Index('ix_supplier_kpis_supplier_date', 'supplier_id', 'calculation_date'),
+    )
+
 class Complaint(Base):
     # ТАБЛИЦА ПРЕТЕНЗИЙ ОТ КЛИЕНТОВ
     __tablename__ = 'complaints'
@@ -43,3 +49,10 @@ class Complaint(Base):
     # СВЯЗИ ДЛЯ СОЗДАНИЕ ТАБЛИЦЫ
     order = relationship("OrderClients", back_populates="complaint") # СВЯЗЬ С ТАБЛИЦЕЙ ПОКУПОК КЛИЕНТА
     ticket = relationship("Ticket", back_populates="complaint") # СВЯЗЬ С ТАБЛИЦЕЙ БИЛЕТОВ
+
+    # ИНДЕКСЫ ДЛЯ ВЫБОРКИ ПРЕТЕНЗИЙ ЗА ПЕРИОД И ПО СТАТУСУ
+    __table_args__ = (
+        Index('ix_complaints_date', 'date'),
+        Index('ix_complaints_status_date', 'status', 'date'),
+    )
+
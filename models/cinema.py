@@ -1,7 +1,7 @@
 # ORM МОДЕЛЬ ДЛЯ: 
 # - УПРАВЛЕНИЕ КИНОТЕАТРОМ
 
-from sqlalchemy import Column, Integer, DateTime, Float, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, Date, DateTime, Float, ForeignKey, Boolean, Text, Index, LargeBinary
 from sqlalchemy.orm import relationship
 import sys
 import os
@@ -26,6 +26,27 @@ class Film(Base):
     license = relationship("License", back_populates="film") # СВЯЗЬ С ТАБЛИЦЕЙ ЛИЦЕНЗИЙ
     screenings = relationship("Screening", back_populates="film") # СВЯЗЬ С ТАБЛИЦЕЙ ПОКАЗОВ
 
+    # ИНДЕКСЫ ДЛЯ ПОИСКА ФИЛЬМА ПО ЛИЦЕНЗИИ И ПОСТРАНИЧНОГО СПИСКА ПО НАЗВАНИЮ
+    __table_args__ = (
+        Index('ix_films_license_id', 'license_id'),
+        Index('ix_films_title_id', 'title', 'id'),
+    )
+
+class Hall(Base):
+    # ТАБЛИЦА ЗАЛОВ КИНОТЕАТРА
+    __tablename__ = 'halls'
+
+    # ОСНОВНЫЕ СТОЛБЦЫ ДЛЯ СОЗДАНИЕ ТАБЛИЦЫ
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(Text, nullable=False, unique=True) # НАЗВАНИЕ ЗАЛА
+    rows = Column(Integer, nullable=False, default=0) # КОЛИЧЕСТВО РЯДОВ
+    seats_per_row = Column(Integer, nullable=False, default=0) # КОЛИЧЕСТВО МЕСТ В РЯДУ
+    capacity = Column(Integer, nullable=False, default=0) # ВМЕСТИМОСТЬ ЗАЛА (0 - НЕИЗВЕСТНА)
+    seat_categories = Column(Text) # КАТЕГОРИИ МЕСТ ПО РЯДАМ В JSON: {РЯД: КАТЕГОРИЯ}
+
+    # СВЯЗИ ДЛЯ СОЗДАНИЕ ТАБЛИЦЫ
+    screenings = relationship("Screening", back_populates="cinema_hall") # СВЯЗЬ С ТАБЛИЦЕЙ ПОКАЗОВ
+
 class Screening(Base):
     # ТАБЛИЦА ПОКАЗОВ ФИЛЬМОВ
     __tablename__ = 'screenings'
@@ -34,12 +55,24 @@ class Screening(Base):
     id = Column(Integer, primary_key=True, index=True)
     film_id = Column(Integer, ForeignKey('films.id')) # ФИЛЬМ, КОТОРЫЙ ПРИВЯЗАН К ПОКАЗУ
     datetime = Column(DateTime, nullable=False) # ДАТА И ВРЕМЯ НАЧАЛА ФИЛЬМА
-    hall = Column(Text, nullable=False) # ЗАЛ, В КОТОРОМ БУДЕТ ПРОВОДИТЬСЯ ФИЛЬМ
+    end_datetime = Column(DateTime) # ДАТА И ВРЕМЯ ОКОНЧАНИЯ ФИЛЬМА (НАЧАЛО + ДЛИТЕЛЬНОСТЬ)
+    hall = Column(Text, nullable=False) # НАЗВАНИЕ ЗАЛА, В КОТОРОМ БУДЕТ ПРОВОДИТЬСЯ ФИЛЬМ
+    hall_id = Column(Integer, ForeignKey('halls.id')) # ЗАЛ, В КОТОРОМ БУДЕТ ПРОВОДИТЬСЯ ФИЛЬМ
     ticket_price = Column(Float, nullable=False) # ЦЕНА БИЛЕТА НА ФИЛЬМ
     
     # СВЯЗИ ДЛЯ СОЗДАНИЕ ТАБЛИЦЫ
     film = relationship("Film", back_populates="screenings") # СВЯЗЬ С ТАБЛИЦЕЙ ФИЛЬМОВ
     ticket = relationship("Ticket", back_populates="screening") # СВЯЗЬ С ТАБЛИЦЕЙ БИЛЕТОВ
+    cinema_hall = relationship("Hall", back_populates="screenings") # СВЯЗЬ С ТАБЛИЦЕЙ ЗАЛОВ
+
+    # ИНДЕКСЫ ДЛЯ ПОИСКА ПО ДАТЕ, ЗАЛУ И ФИЛЬМУ
+    __table_args__ = (
+        Index('ix_screenings_datetime', 'datetime'),
+        Index('ix_screenings_hall_datetime', 'hall', 'datetime'),
+        Index('ix_screenings_hall_id_datetime', 'hall_id', 'datetime'),
+        Index('ix_screenings_hall_id_end', 'hall_id', 'end_datetime'),
+        Index('ix_screenings_film_datetime', 'film_id', 'datetime'),
+    )
 
 class Ticket(Base):
     # ТАБЛИЦА БИЛЕТОВ
@@ -58,4 +91,50 @@ class Ticket(Base):
     screening = relationship("Screening", back_populates="ticket") # СВЯЗЬ С ТАБЛИЦЕЙ ПОКАЗОВ
     complaint = relationship("Complaint", back_populates="ticket") # СВЯЗЬ С ТАБЛИЦЕЙ ЖАЛОБ
     order = relationship("OrderClients", back_populates='ticket') # СВЯЗЬ С ПОКУПКАМИ
-    
+
+    # ИНДЕКСЫ ДЛЯ ПОИСКА БИЛЕТОВ ПО ПОКАЗУ И ДАТЕ ПРОДАЖИ
+    __table_args__ = (
+        Index('ix_tickets_screening_sold', 'screening_id', 'sold'),
+        Index('ix_tickets_sold_date', 'sold', 'sold_date'),
+    )
+
+class SeatMap(Base):
+    # КОМПАКТНАЯ КАРТА ЗАНЯТОСТИ МЕСТ ПОКАЗА (АЛЬТЕРНАТИВА БИЛЕТУ НА КАЖДОЕ МЕСТО)
+    __tablename__ = 'seat_maps'
+
+    # ОСНОВНЫЕ СТОЛБЦЫ ДЛЯ СОЗДАНИЕ ТАБЛИЦЫ
+    screening_id = Column(Integer, ForeignKey('screenings.id'), primary_key=True) # ПОКАЗ, К КОТОРОМУ ОТНОСИТСЯ КАРТА
+    layout = Column(Text, nullable=False) # СХЕМА ЗАЛА В JSON: {РЯД: КОЛИЧЕСТВО МЕСТ}, ЗАДАЁТ ИНДЕКСЫ МЕСТ
+    seat_count = Column(Integer, nullable=False) # ВСЕГО МЕСТ В ЗАЛЕ
+    occupancy = Column(LargeBinary, nullable=False) # БИТОВАЯ КАРТА ПРОДАННЫХ МЕСТ (БИТ i = МЕСТО С ИНДЕКСОМ i)
+    price_overrides = Column(Text) # ИНДИВИДУАЛЬНЫЕ ЦЕНЫ МЕСТ В JSON: {ИНДЕКС: ЦЕНА}
+    version = Column(Integer, nullable=False, default=0) # ВЕРСИЯ ДЛЯ УСЛОВНОГО ОБНОВЛЕНИЯ КАРТЫ
+
+    # СВЯЗИ ДЛЯ СОЗДАНИЕ ТАБЛИЦЫ
+    screening = relationship("Screening") # СВЯЗЬ С ТАБЛИЦЕЙ ПОКАЗОВ
+
+class SalesDailyRollup(Base):
+    # ДНЕВНЫЕ ИТОГИ ПРОДАЖ БИЛЕТОВ ПО ФИЛЬМУ И ЗАЛУ (ОБНОВЛЯЮТСЯ ВМЕСТЕ С ПРОДАЖЕЙ)
+    __tablename__ = 'sales_daily_rollup'
+
+    # ОСНОВНЫЕ СТОЛБЦЫ ДЛЯ СОЗДАНИЕ ТАБЛИЦЫ
+    date = Column(Date, primary_key=True) # ДЕНЬ ПРОДАЖИ (ДЛЯ ВОЗВРАТОВ - ДЕНЬ ВОЗВРАТА)
+    film_id = Column(Integer, primary_key=True, default=0) # ФИЛЬМ ПОКАЗА (0 - НЕИЗВЕСТЕН)
+    hall_id = Column(Integer, primary_key=True, default=0) # ЗАЛ ПОКАЗА (0 - НЕИЗВЕСТЕН)
+    tickets_sold = Column(Integer, nullable=False, default=0) # ПРОДАНО БИЛЕТОВ ЗА ВЫЧЕТОМ ВОЗВРАТОВ
+    revenue = Column(Float, nullable=False, default=0.0) # ВЫРУЧКА ЗА ВЫЧЕТОМ ВОЗВРАТОВ
+    refunds = Column(Integer, nullable=False, default=0) # КОЛИЧЕСТВО ВОЗВРАТОВ
+    refund_amount = Column(Float, nullable=False, default=0.0) # СУММА ВОЗВРАТОВ
+
+    # ИНДЕКСЫ ДЛЯ ОТЧЁТОВ ПО ФИЛЬМУ ЗА ПЕРИОД
+    __table_args__ = (
+        Index('ix_sales_daily_rollup_film_date', 'film_id', 'date'),
+    )
+
+class SalesRollupVersion(Base):
+    # НОМЕР ИЗМЕНЕНИЯ ДНЕВНЫХ ИТОГОВ В БАЗЕ: КЭШИ ОТЧЁТОВ ВСЕХ ПРОЦЕССОВ СВЕРЯЮТСЯ С НИМ
+    __tablename__ = 'sales_rollup_version'
+
+    # ОСНОВНЫЕ СТОЛБЦЫ ДЛЯ СОЗДАНИЕ ТАБЛИЦЫ
+    id = Column(Integer, primary_key=True) # ВСЕГДА 1: ОДНА СТРОКА НА БАЗУ
+    version = Column(Integer, nullable=False, default=0) # УВЕЛИЧИВАЕТСЯ В ТРАНЗАКЦИИ, ИЗМЕНИВШЕЙ ИТОГИ
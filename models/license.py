@@ -1,7 +1,8 @@
 # ORM МОДЕЛЬ ДЛЯ: 
 # - УПРАВЛЕНИЯМИ КОНТРАКТАМИ И ЛИЦЕНЗИЯМИ
+# - УВЕДОМЛЕНИЯМИ ОБ ОКОНЧАНИИ СРОКОВ
 
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 import sys
 import os
@@ -28,6 +29,12 @@ class Contract(Base):
     license = relationship("License", back_populates="contract") # СВЯЗЬ С ТАБЛИЦЕЙ ЛИЦЕНЗИЙ
     order = relationship("OrderSupliers", back_populates="contract") # СВЯЗЬ С ТАБЛИЦЕЙ ЗАКАЗОВ ПОСТАВЩИКОВ
 
+    # ИНДЕКСЫ ДЛЯ ПОИСКА ПО ПОСТАВЩИКУ И СРОКУ ДЕЙСТВИЯ
+    __table_args__ = (
+        Index('ix_contracts_end_date', 'end_date'),
+        Index('ix_contracts_supplier_id', 'supplier_id'),
+    )
+
 class License(Base):
     # ТАБЛИЦЫ ЛИЦЕНЗИЙ НА ФИЛЬМЫ
     __tablename__ = 'licenses'
@@ -45,4 +52,33 @@ class License(Base):
     supplier = relationship("Supplier", back_populates="licenses") # СВЯЗЬ С ТАБЛИЦЕЙ ПОСТАВЩИКОВ
     contract = relationship("Contract", back_populates="license") # СВЯЗЬ С ТАБЛИЦЕЙ КОНТРАКТОВ
     film = relationship("Film", back_populates="license", uselist=False) # СВЯЗЬ С ТАБЛИЦЕЙ ФИЛЬМОВ
-    
+
+    # ИНДЕКСЫ ДЛЯ ПОИСКА ПО КОНТРАКТУ, СРОКУ, НАЗВАНИЮ И КЛЮЧУ
+    __table_args__ = (
+        Index('ix_licenses_end_date', 'end_date'),
+        Index('ix_licenses_contract_id', 'contract_id'),
+        Index('ix_licenses_film_title', 'film_title'),
+        Index('ix_licenses_digital_key', 'digital_key'),
+    )
+
+class ExpiryNotification(Base):
+    # ТАБЛИЦА УЖЕ СФОРМИРОВАННЫХ УВЕДОМЛЕНИЙ ОБ ОКОНЧАНИИ КОНТРАКТОВ И ЛИЦЕНЗИЙ
+    __tablename__ = 'expiry_notifications'
+
+    # ОСНОВНЫЕ СТОЛБЦЫ ДЛЯ СОЗДАНИЕ ТАБЛИЦЫ
+    id = Column(Integer, primary_key=True, index=True)
+    days_threshold = Column(Integer, nullable=False) # ПОРОГ СКАНИРОВАНИЯ В ДНЯХ: У КАЖДОГО ПОРОГА СВОЁ СОСТОЯНИЕ
+    kind = Column(String(20), nullable=False) # ТИП ОБЪЕКТА: "contract" ИЛИ "license"
+    object_id = Column(Integer, nullable=False) # ID КОНТРАКТА ИЛИ ЛИЦЕНЗИИ
+    name = Column(String(200), nullable=False) # НАЗВАНИЕ КОНТРАКТА ИЛИ ФИЛЬМА ЛИЦЕНЗИИ
+    related_id = Column(Integer) # ПОСТАВЩИК КОНТРАКТА ИЛИ ФИЛЬМ ЛИЦЕНЗИИ
+    related_name = Column(String(200)) # ИМЯ ПОСТАВЩИКА ИЛИ НАЗВАНИЕ ФИЛЬМА
+    end_date = Column(Date, nullable=False) # ДАТА ОКОНЧАНИЯ
+    first_seen = Column(DateTime, nullable=False) # КОГДА УВЕДОМЛЕНИЕ ПОЯВИЛОСЬ
+    updated_at = Column(DateTime, nullable=False) # КОГДА УВЕДОМЛЕНИЕ ИЗМЕНИЛОСЬ ПОСЛЕДНИЙ РАЗ
+
+    # ОДНО УВЕДОМЛЕНИЕ НА ОБЪЕКТ ДЛЯ КАЖДОГО ПОРОГА
+    __table_args__ = (
+        UniqueConstraint('days_threshold', 'kind', 'object_id', name='uq_expiry_notifications_threshold_object'),
+    )
+
@@ -2,7 +2,7 @@
 # - УПРАВЛЕНИЯМИ ЗАКУПОЧНОЙ ДЕЯТЕЛЬНОСТИ ПОСТАВЩИКОВ
 # - УПРАВЛЕНИЯМИ ПОКУПКАМИ КЛИЕНТОВ
 
-from sqlalchemy import Column, Integer, String, Date, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 import sys
 import os
@@ -30,6 +30,12 @@ class OrderSupliers(Base):
     contract = relationship("Contract", back_populates="order") # СВЯЗЬ С ТАБЛИЦЕЙ КОНТРАКТОВ
     items = relationship("OrderItem", back_populates="order") # СВЯЗЬ С ТАБЛИЦЕЙ ЗАКАЗНЫХ ТОВАРОВ
 
+    # ИНДЕКСЫ ДЛЯ ВЫБОРКИ ЗАКАЗОВ ЗА ПЕРИОД
+    __table_args__ = (
+        Index('ix_orders_supliers_created_date', 'created_date'),
+        Index('ix_orders_supliers_supplier_date', 'supplier_id', 'created_date'),
+    )
+
 class OrderClients(Base):
     # ТАБЛИЦА ПОКУПОК КЛИЕНТОВ
     __tablename__ = 'orders_clients'
@@ -46,6 +52,11 @@ class OrderClients(Base):
     complaint = relationship("Complaint", back_populates="order") # СВЯЗЬ С ТАБЛИЦЕЙ ПРЕТЕНЗИЙ ОТ КЛИЕНТОВ
     ticket = relationship("Ticket", back_populates="order") # СВЯЗЬ С ТАБЛИЦЕЙ БИЛЕТОВ
 
+    # ИНДЕКСЫ ДЛЯ ВЫБОРКИ ЗАКАЗОВ ЗА ПЕРИОД
+    __table_args__ = (
+        Index('ix_orders_clients_order_date', 'order_date'),
+    )
+
 class OrderItem(Base):
     # ТАБЛИЦА ЗАКАЗНЫХ ТОВАРОВ
     __tablename__ = 'order_items'
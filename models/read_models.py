@@ -0,0 +1,110 @@
+# МОДЕЛИ ЧТЕНИЯ ДЛЯ СПИСКОВ И ОТЧЁТОВ:
+# - СТРОКИ ТОЛЬКО ДЛЯ ЧТЕНИЯ, ЗАПОЛНЯЕМЫЕ ЗАПРОСОМ ПО НУЖНЫМ СТОЛБЦАМ
+# - ORM-ОБЪЕКТЫ ИСПОЛЬЗУЮТСЯ ТОЛЬКО ДЛЯ ИЗМЕНЕНИЯ ДАННЫХ
+
+from datetime import date, datetime
+from typing import List, NamedTuple, Optional
+
+
+class FilmRow(NamedTuple):
+    id: int
+    license_id: Optional[int]
+    title: str
+    duration: Optional[int]
+    description: Optional[str]
+
+
+class HallRow(NamedTuple):
+    id: int
+    name: str
+    rows: int
+    seats_per_row: int
+    capacity: int
+    seat_categories: Optional[str]
+
+
+class ScreeningBriefRow(NamedTuple):
+    """Показ без продаж"""
+    id: int
+    film_id: Optional[int]
+    datetime: datetime
+    end_datetime: Optional[datetime]
+    hall_id: Optional[int]
+    hall: str
+    ticket_price: float
+
+
+class ScreeningRow(NamedTuple):
+    """Показ с названием фильма и продажами"""
+    id: int
+    film_id: Optional[int]
+    film_title: Optional[str]  # None, если фильм удалён
+    datetime: datetime
+    end_datetime: Optional[datetime]
+    hall: str
+    ticket_price: float
+    tickets_sold: int
+    revenue: float
+
+
+class TicketRow(NamedTuple):
+    id: int
+    screening_id: Optional[int]
+    order_id: Optional[int]
+    seat_number: str
+    price: float
+    sold: Optional[bool]
+    sold_date: Optional[datetime]
+
+
+class SupplierRow(NamedTuple):
+    id: int
+    name: str
+    contact_info: Optional[str]
+    details: Optional[str]
+
+
+class ContractRow(NamedTuple):
+    id: int
+    supplier_id: Optional[int]
+    title: str
+    start_date: date
+    end_date: date
+    file_path: Optional[str]
+
+
+class LicenseRow(NamedTuple):
+    id: int
+    supplier_id: Optional[int]
+    contract_id: Optional[int]
+    film_title: str
+    digital_key: Optional[str]
+    start_date: date
+    end_date: date
+
+
+class SupplierOrderRow(NamedTuple):
+    id: int
+    supplier_id: Optional[int]
+    contract_id: Optional[int]
+    status: Optional[str]
+    created_date: datetime
+    delivery_date: Optional[date]
+    total_amount: Optional[float]
+
+
+class ClientOrderRow(NamedTuple):
+    id: int
+    client_name: Optional[str]
+    phone: Optional[str]
+    order_date: datetime
+    total_amount: Optional[float]
+    status: Optional[str]
+
+
+def columns_of(row_type, model) -> List:  # Столбцы ORM-модели в порядке полей строки
+    return [getattr(model, field) for field in row_type._fields]
+
+
+def project(page, row_type):  # Страница с результатом запроса, переложенным в строки чтения
+    return page._replace(items=[row_type._make(row) for row in page.items])
@@ -1,7 +1,7 @@
 # ORM МОДЕЛЬ ДЛЯ: 
 # - УПРАВЛЕНИЯМИ РЕЕСТРОМ ПОСТАВЩИКОВ
 
-from sqlalchemy import Column, Integer, String, Text, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 import sys
 import os
@@ -36,6 +36,11 @@ class Supplier(Base):
     kpi = relationship("SupplierKPI", back_populates="supplier", uselist=False) # СВЯЗЬ СО СРАВНИТЕЛЬНОЙ ТАБЛИЦЕЙ ПОСТАВЩИКОВ
     supply_types = relationship("SupplyType", secondary=supplier_supply_type, back_populates="supplier") # СВЯЗЬ С ТАБЛИЦЕЙ ТИПОВ ПОСТАВЩИКОВ
 
+    # ИНДЕКС ДЛЯ ПОСТРАНИЧНОГО СПИСКА ПО ИМЕНИ
+    __table_args__ = (
+        Index('ix_suppliers_name_id', 'name', 'id'),
+    )
+
 class SupplyType(Base):
     # ТАБЛИЦА ТИПОВ ПОСТАВЩИКОВ
     __tablename__ = 'supply_types'
@@ -0,0 +1,2 @@
+# КОМАНДНАЯ СТРОКА ПРОГРАММЫ БЕЗ ГРАФИЧЕСКОГО ИНТЕРФЕЙСА
+"""Отчёты, импорт/экспорт и обслуживание базы: python -m rpm_cli --help"""
@@ -0,0 +1,7 @@
+# ЗАПУСК КОМАНДНОЙ СТРОКИ: python -m rpm_cli
+import sys
+
+from rpm_cli.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# РАЗБОР АРГУМЕНТОВ И ВЫВОД РЕЗУЛЬТАТА КОМАНД В JSON ИЛИ CSV
+"""Команды без PyQt: каждая импортирует только свои сервисы при вызове.
+
+    python -m rpm_cli revenue 2024-05-01
+    python -m rpm_cli --format csv -o top.csv popular-films --days 7
+    python -m rpm_cli --database sqlite:///copy.db export client-orders --start 2024-01-01
+    python -m rpm_cli import films films.csv
+    python -m rpm_cli optimize --vacuum
+
+Результат пишется в stdout или в файл --output. Код выхода 1 - ошибка
+проверки данных или базы, а также результат с непустым списком errors
+(строки импорта с ошибками, нарушения целостности базы).
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+import argparse
+import csv
+import json
+import os
+import sys
+
+# Добавляем путь для импорта модулей
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATABASE_URL, ENGINE_PROFILES
+
+EXPORT_ENTITIES = ("films", "halls", "screenings", "suppliers", "supply-types", "contracts", "licenses",
+                   "supplier-orders", "client-orders")
+IMPORT_ENTITIES = ("films", "halls", "suppliers", "supply-types")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m rpm_cli", description="Отчёты и обслуживание базы без интерфейса")
+    parser.add_argument("--database", default=DATABASE_URL, help="URL базы (по умолчанию - база программы)")
+    parser.add_argument("--profile", choices=list(ENGINE_PROFILES), help="профиль движка (по умолчанию - свой у команды)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json", help="формат вывода")
+    parser.add_argument("-o", "--output", help="файл результата (по умолчанию - stdout)")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="команда")
+
+    def command(name, handler, profile, help_text):  # handler - имя функции в rpm_cli.commands
+        sub = commands.add_parser(name, help=help_text, description=help_text)
+        sub.set_defaults(handler=handler, default_profile=profile)
+        return sub
+
+    # ОТЧЁТЫ
+    sub = command("revenue", "revenue", "reporting", "выручка за день или за период (--end)")
+    sub.add_argument("date", help="день или начало периода, YYYY-MM-DD")
+    sub.add_argument("--end", help="конец периода, YYYY-MM-DD")
+    sub.add_argument("--group-by", default="day,film,hall", help="группировка периода: day, film, hall через запятую")
+    sub = command("attendance", "attendance", "reporting", "посещаемость показов за день или одного показа")
+    sub.add_argument("date", nargs="?", help="день показов, YYYY-MM-DD")
+    sub.add_argument("--screening", type=int, help="ID показа вместо дня")
+    sub = command("popular-films", "popular_films", "reporting", "популярные фильмы по проданным билетам")
+    sub.add_argument("--limit", type=int, default=5)
+    sub.add_argument("--days", type=int, default=30)
+    sub = command("expiring", "expiring", "reporting", "контракты или лицензии с истекающим сроком")
+    sub.add_argument("kind", choices=("contracts", "licenses"))
+    sub.add_argument("--days", type=int, default=30)
+    sub = command("supplier-top", "supplier_top", "reporting", "рейтинг поставщиков по оценкам")
+    sub.add_argument("--days", type=int, default=30)
+    sub.add_argument("--top", type=int, default=10)
+    sub = command("complaint-stats", "complaint_stats", "reporting", "статистика претензий за период")
+    sub.add_argument("--days", type=int, default=30)
+
+    # ИМПОРТ И ЭКСПОРТ
+    sub = command("export", "export_rows", "reporting", "выгрузить список целиком (постранично по ключу)")
+    sub.add_argument("entity", choices=EXPORT_ENTITIES)
+    sub.add_argument("--start", help="начало периода для screenings и client-orders, YYYY-MM-DD")
+    sub.add_argument("--end", help="конец периода для screenings и client-orders, YYYY-MM-DD")
+    sub = command("import", "import_rows", "bulk_import", "загрузить строки CSV через сервисы с проверкой")
+    sub.add_argument("entity", choices=IMPORT_ENTITIES)
+    sub.add_argument("file", help="CSV с заголовком (столбцы как в export), - для stdin")
+
+    # ОБСЛУЖИВАНИЕ БАЗЫ
+    command("migrate", "migrate", "box_office", "создать таблицы и применить миграции схемы")
+    sub = command("rebuild-sales-rollup", "rebuild_sales_rollup", "bulk_import", "пересчитать дневные итоги продаж")
+    sub.add_argument("--start", help="начало периода, YYYY-MM-DD (по умолчанию - вся история)")
+    sub.add_argument("--end", help="конец периода, YYYY-MM-DD")
+    sub = command("scan-expiring", "scan_expiring", "box_office", "обновить уведомления об истекающих сроках")
+    sub.add_argument("--days", type=int, default=30)
+    sub = command("generate-inventory", "generate_inventory", "bulk_import", "создать места для показов периода")
+    sub.add_argument("start", help="первый день, YYYY-MM-DD")
+    sub.add_argument("--days", type=int, default=7)
+    sub = command("optimize", "optimize", "box_office", "обновить статистику планировщика SQLite")
+    sub.add_argument("--vacuum", action="store_true", help="также сжать файл базы (VACUUM)")
+    command("integrity-check", "integrity_check", "box_office", "проверить целостность файла базы")
+    sub = command("generate-data", "generate_data", "bulk_import", "заполнить пустую базу синтетическими данными")
+    sub.add_argument("--scale", choices=("1x", "10x", "100x"), default="1x")
+    sub.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+# ВЫВОД РЕЗУЛЬТАТА
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Значение типа {type(value).__name__} не сериализуется в JSON")
+
+
+def _record(item) -> Dict[str, Any]:  # Строка результата словарём: dict или строка чтения (NamedTuple)
+    return item if isinstance(item, dict) else item._asdict()
+
+
+def _is_record(result) -> bool:
+    return isinstance(result, dict) or hasattr(result, "_asdict")
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (dict, list, tuple)):  # Вложенные значения - JSON в ячейке
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    return value
+
+
+def write_result(result, stream, fmt: str) -> None:
+    """Записать результат: словарь - одним объектом/строкой, список или генератор - построчно"""
+    if fmt == "json":
+        if result is None or _is_record(result):
+            json.dump(None if result is None else _record(result), stream, ensure_ascii=False, indent=2,
+                      default=_json_default)
+            stream.write("\n")
+            return
+        stream.write("[")  # Массив пишется по мере чтения строк: выгрузка не держит весь список в памяти
+        for index, item in enumerate(result):
+            stream.write(",\n" if index else "\n")
+            stream.write(json.dumps(_record(item), ensure_ascii=False, default=_json_default))
+        stream.write("\n]\n")
+        return
+
+    rows = [] if result is None else [result] if _is_record(result) else result
+    writer = None
+    for item in rows:
+        record = _record(item)
+        if writer is None:  # Заголовок по первой строке
+            writer = csv.DictWriter(stream, fieldnames=list(record), lineterminator="\n")
+            writer.writeheader()
+        writer.writerow({key: _csv_cell(value) for key, value in record.items()})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from sqlalchemy.exc import SQLAlchemyError
+    from sqlalchemy.orm import Session
+    from database import create_db_engine, load_models
+    from rpm_cli import commands
+
+    load_models()  # Без PyQt модели не импортируются окнами
+    engine = create_db_engine(args.database, profile=args.profile or args.default_profile)
+    stream = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        with Session(engine) as db:
+            result = getattr(commands, args.handler)(db, args)
+            write_result(result, stream, args.format)  # В сессии: выгрузка читает страницы по мере записи
+    except (ValueError, SQLAlchemyError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:  # Вывод закрыт раньше конца (например, | head)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+        engine.dispose()
+    return 1 if isinstance(result, dict) and result.get('errors') else 0
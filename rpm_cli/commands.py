@@ -0,0 +1,187 @@
+# КОМАНДЫ КОМАНДНОЙ СТРОКИ: КАЖДАЯ ИМПОРТИРУЕТ ТОЛЬКО НУЖНЫЕ ЕЙ СЕРВИСЫ
+"""Функции команд handler(db, args): возвращают словарь, список или генератор строк"""
+from typing import Any, Callable, Dict, Iterator, List
+import csv
+import importlib
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+EXPORT_PAGE_SIZE = 5000  # Строк на страницу выгрузки
+
+# Выгрузка: сущность -> (модуль сервиса, функция списка, поддерживает ли период start/end)
+EXPORTS = {
+    'films': ("services.cinema_service", "get_all_films", False),
+    'screenings': ("services.cinema_service", "list_screenings", True),
+    'suppliers': ("services.supplier_service", "get_all_suppliers", False),
+    'contracts': ("services.license_service", "get_all_contracts", False),
+    'licenses': ("services.license_service", "get_all_licenses", False),
+    'supplier-orders': ("services.procumenet_service", "get_all_supplier_orders", False),
+    'client-orders': ("services.procumenet_service", "get_all_client_orders", True),
+}
+
+
+def _id_list(value: str) -> List[int]:  # "1;3" -> [1, 3]
+    return [int(part) for part in value.replace(",", ";").split(";") if part.strip()]
+
+
+# Импорт: сущность -> (модуль сервиса, функция создания, {столбец CSV: преобразование})
+IMPORTS = {
+    'films': ("services.cinema_service", "create_film",
+              {'license_id': int, 'title': str, 'duration': int, 'description': str}),
+    'halls': ("services.cinema_service", "create_hall", {'name': str, 'rows': int, 'seats_per_row': int}),
+    'suppliers': ("services.supplier_service", "create_supplier",
+                  {'name': str, 'contact_info': str, 'details': str, 'supply_type_ids': _id_list}),
+    'supply-types': ("services.supplier_service", "create_supply_type", {'name': str, 'description': str}),
+}
+
+
+def _service(module_name: str, function_name: str) -> Callable:
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+# ОТЧЁТЫ
+
+def revenue(db: Session, args):
+    from services.cinema_service import get_daily_revenue, get_revenue_range
+    if args.end is None:
+        return get_daily_revenue(db, args.date)
+    return get_revenue_range(db, args.date, args.end, group_by=tuple(
+        key.strip() for key in args.group_by.split(",") if key.strip()))
+
+
+def attendance(db: Session, args):
+    from services.cinema_service import get_attendance_for_date, get_screening_attendance
+    if args.screening is not None:
+        return get_screening_attendance(db, args.screening)
+    if args.date is None:
+        raise ValueError("Укажите день показов или --screening")
+    return get_attendance_for_date(db, args.date)
+
+
+def popular_films(db: Session, args):
+    from services.cinema_service import get_popular_films
+    return get_popular_films(db, args.limit, args.days)
+
+
+def expiring(db: Session, args):
+    from services.license_service import get_expiring_contracts, get_expiring_licenses
+    function = get_expiring_contracts if args.kind == "contracts" else get_expiring_licenses
+    return function(db, args.days)
+
+
+def supplier_top(db: Session, args):
+    from services.analytics_service import get_supplier_top
+    return get_supplier_top(db, args.days, args.top)
+
+
+def complaint_stats(db: Session, args):
+    from services.analytics_service import get_complaint_stats
+    return get_complaint_stats(db, args.days)
+
+
+# ИМПОРТ И ЭКСПОРТ
+
+def export_rows(db: Session, args) -> Iterator:
+    """Все строки списка: страницы читаются по курсору по мере записи"""
+    if args.entity == "halls":
+        from services.cinema_service import get_all_halls
+        return iter(get_all_halls(db))
+    if args.entity == "supply-types":
+        from services.supplier_service import get_all_supply_types
+        return ({'id': supply_type.id, 'name': supply_type.name, 'description': supply_type.description}
+                for supply_type in get_all_supply_types(db))
+
+    module_name, function_name, with_period = EXPORTS[args.entity]
+    if not with_period and (args.start or args.end):
+        raise ValueError(f"Период --start/--end не поддерживается для {args.entity}")
+    filters = {'start_date': args.start, 'end_date': args.end} if with_period else {}
+    return _pages(_service(module_name, function_name), db, filters)
+
+
+def _pages(function: Callable, db: Session, filters: Dict[str, Any]) -> Iterator:
+    cursor = None
+    while True:
+        page = function(db, cursor=cursor, limit=EXPORT_PAGE_SIZE, **filters)
+        yield from page.items
+        if page.next_cursor is None:
+            return
+        cursor = page.next_cursor
+
+
+def import_rows(db: Session, args) -> Dict[str, Any]:
+    """Создать объекты из строк CSV; строка с ошибкой пропускается и попадает в errors"""
+    module_name, function_name, columns = IMPORTS[args.entity]
+    create = _service(module_name, function_name)
+    source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8-sig", newline="")
+    created, errors = 0, []
+    try:
+        reader = csv.DictReader(source)
+        if not set(columns) & set(reader.fieldnames or []):
+            raise ValueError(f"В файле нет ни одного из столбцов: {', '.join(columns)}")
+        for line, row in enumerate(reader, start=2):  # Первая строка - заголовок
+            try:
+                kwargs = {name: convert(row[name]) for name, convert in columns.items()
+                          if row.get(name) not in (None, "")}  # Пустые ячейки - значения по умолчанию
+                create(db, **kwargs)
+                created += 1
+            except (ValueError, TypeError, SQLAlchemyError) as e:
+                db.rollback()
+                errors.append(f"строка {line}: {e}")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    return {'entity': args.entity, 'created': created, 'errors': errors}
+
+
+# ОБСЛУЖИВАНИЕ БАЗЫ
+
+def migrate(db: Session, args) -> Dict[str, Any]:
+    from database import init_db
+    init_db(db.get_bind())
+    return {'schema_version': db.execute(text("PRAGMA user_version")).scalar()}
+
+
+def rebuild_sales_rollup(db: Session, args) -> Dict[str, Any]:
+    from services.sales_rollup_service import rebuild_sales_rollup
+    return rebuild_sales_rollup(db, args.start, args.end)
+
+
+def scan_expiring(db: Session, args) -> Dict[str, Any]:
+    from services.expiry_service import scan_expiring
+    return scan_expiring(db, args.days)
+
+
+def generate_inventory(db: Session, args) -> List[Dict[str, int]]:
+    from services.cinema_service import generate_inventory_for_period
+    created = generate_inventory_for_period(db, args.start, days=args.days)
+    return [{'screening_id': screening_id, 'new_seats': count} for screening_id, count in created.items()]
+
+
+def _database_size_mb(db: Session) -> float:
+    page_count = db.execute(text("PRAGMA page_count")).scalar()
+    page_size = db.execute(text("PRAGMA page_size")).scalar()
+    return round(page_count * page_size / 2 ** 20, 1)
+
+
+def optimize(db: Session, args) -> Dict[str, Any]:
+    size_before = _database_size_mb(db)
+    db.execute(text("PRAGMA optimize"))  # ANALYZE только для таблиц, статистика которых устарела
+    db.commit()
+    if args.vacuum:
+        with db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")  # VACUUM нельзя выполнить внутри транзакции
+    return {'size_mb_before': size_before, 'size_mb_after': _database_size_mb(db), 'vacuum': args.vacuum}
+
+
+def integrity_check(db: Session, args) -> Dict[str, Any]:
+    messages = [message for message, in db.execute(text("PRAGMA integrity_check"))]
+    return {'integrity': "ok" if messages == ["ok"] else "ошибки", 'errors': [] if messages == ["ok"] else messages}
+
+
+def generate_data(db: Session, args) -> Dict[str, int]:
+    from utils.synthetic_data import SCALES, create_dataset
+    db.close()  # Набор создаётся своим движком для массовой загрузки
+    return create_dataset(args.database, SCALES[args.scale], args.seed)
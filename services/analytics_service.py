@@ -8,6 +8,7 @@ import os
 # Добавляем путь для импорта модулей
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from database import commit  # Фиксация с учётом единицы работы
 from models.analytics import SupplierKPI, Complaint  # Импортируем ORM-модели
 from utils.validators import validate_positive_int, validate_status, validate_limit
 
@@ -32,8 +33,7 @@ def add_supplier_score(db: Session, supplier_id: int,
     )
 
     db.add(new_score)
-    db.commit()  # Добавляем запись в сессию
-    db.refresh(new_score)  # Обновляем объект из базы
+    commit(db)  # Добавляем запись в сессию
     return new_score  # Возвращаем созданную запись
 
 
@@ -52,7 +52,7 @@ def remove_score(db: Session, score_id: int) -> bool:  # Удалить оцен
     if not score:  # Если запись не найдена
         return False  # Возвращаем False (ничего не удалено)
     db.delete(score)
-    db.commit()
+    commit(db)
     return True  # Возвращаем успех
 
 
@@ -79,8 +79,7 @@ def create_complaint(db: Session, description: str,
     )
 
     db.add(new_complaint)
-    db.commit()
-    db.refresh(new_complaint)  # Обновляем объект из базы
+    commit(db)
     return new_complaint  # Возвращаем созданную запись
 
 
@@ -103,8 +102,7 @@ def update_complaint_status(db: Session, complaint_id: int, new_status: str) ->
 
     complaint.status = new_status  # Присваиваем новый статус
     db.add(complaint)
-    db.commit()
-    db.refresh(complaint)  # Обновляем объект из базы
+    commit(db)
     return complaint  # Возвращаем обновлённую запись
 
 
@@ -114,7 +112,7 @@ def delete_complaint(db: Session, complaint_id: int) -> bool:  # Удалить
     if not complaint:  # Если запись не найдена
         return False  # Возвращаем False (ничего не удалено)
     db.delete(complaint)
-    db.commit()
+    commit(db)
     return True  # Возвращаем успех
 
 
@@ -127,7 +125,7 @@ def get_complaint_stats(db: Session, days: int = 30) -> Dict[str, Any]:  # Сф
                      for s in ["на рассмотрении", "решён", "не решён"]}  # Количество по каждому статусу
 
     avg_open_days = None  # Среднее время открытых претензий (в днях)
-    open_complaints = db.query(Complaint).filter(Complaint.status == "на рассмотрении", Complaint.date >= start_date).all()  # Выборка открытых
+    open_complaints = db.query(Complaint.date).filter(Complaint.status == "на рассмотрении", Complaint.date >= start_date).all()  # Даты открытых
     if open_complaints:  # Если есть открытые претензии
         total_days = sum((datetime.now() - comp.date).days for comp in open_complaints)  # Суммируем дни в открытом состоянии
         avg_open_days = round(total_days / len(open_complaints), 1)  # Считаем среднее и округляем
@@ -1,16 +1,25 @@
 from sqlalchemy.orm import Session  # Работа с сессией SQLAlchemy
-from sqlalchemy import func, and_  # Агрегатные функции и логические операторы
+from sqlalchemy import func, and_, case, update, insert  # Агрегатные функции и логические операторы
 from datetime import datetime, timedelta  # Работа с датами
-from typing import List, Optional, Dict, Any  # Типизация
+from typing import List, Optional, Dict, Any, Tuple  # Типизация
+import json
 import sys
 import os
 
 # Добавляем путь для импорта модулей
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models.cinema import Film, Screening, Ticket  # ORM-модели
+from database import commit, rollback  # Фиксация с учётом единицы работы
+from models.cinema import Film, Hall, Screening, Ticket, SeatMap, SalesDailyRollup  # ORM-модели
+from models.read_models import (FilmRow, HallRow, ScreeningBriefRow, ScreeningRow, TicketRow,
+                                columns_of, project)  # Строки для чтения
+from models.procurement import OrderClients
+from services.sales_rollup_service import record_ticket_sales, record_ticket_refunds, move_screening_sales
+from services.leaderboard_service import leaderboard
 from utils.validators import validate_positive_int, validate_string, validate_price
-from utils.helper import parse_date
+from utils.helper import parse_date, parse_datetime
+from utils.pagination import Page, keyset_page, DEFAULT_PAGE_SIZE
+from config import CLEANING_GAP_MINUTES
 
 # РАБОТА С ФИЛЬМАМИ
 def create_film(db: Session, license_id: int, title: str, duration: int, description: str = "") -> Film:  # Создать фильм
@@ -28,17 +37,23 @@ def create_film(db: Session, license_id: int, title: str, duration: int, descrip
                     description=description.strip() if description else "")  # Создаём объект фильма
 
     db.add(new_film)
-    db.commit()  # Добавляем фильм
-    db.refresh(new_film)  # Обновляем объект
+    commit(db)  # Добавляем фильм
     return new_film  # Возвращаем результат
 
 
-def get_all_films(db: Session, active_only: bool = False) -> List[Film]:  # Получить список фильмов
-    query = db.query(Film)  # Базовый запрос
+def get_all_films(db: Session, active_only: bool = False, cursor: Optional[Tuple] = None,
+                  limit: Optional[int] = None, with_total: bool = False) -> Page:  # Получить список фильмов
+    """Фильмы по названию и ID; без limit - все фильмы одной страницей"""
+    query = db.query(*columns_of(FilmRow, Film))  # Базовый запрос
     if active_only:  # Если нужны только активные
         current_time = datetime.now()  # Текущее время
-        query = query.join(Screening).filter(Screening.datetime > current_time)  # Фильтр по будущим показам
-    return query.order_by(Film.title).all()  # Сортировка и возврат
+        query = query.filter(Film.screenings.any(Screening.datetime > current_time))  # Есть будущие показы
+    return project(keyset_page(query, [Film.title, Film.id], cursor, limit,
+                               key=lambda film: (film.title, film.id), with_total=with_total), FilmRow)
+
+
+def get_films_page(db: Session, cursor: Optional[Tuple] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:  # Страница списка фильмов
+    return get_all_films(db, cursor=cursor, limit=limit)
 
 
 def get_film_by_id(db: Session, film_id: int) -> Optional[Film]:  # Получить фильм по ID
@@ -61,14 +76,15 @@ def update_film(db: Session, film_id: int, title: Optional[str] = None,
         validate_positive_int(duration, "Длительность фильма")  # Проверка длительности
         if duration > 300:  # Ограничение
             raise ValueError(f"Длительность фильма не может превышать 300 минут, получено: {duration}")  # Ошибка
-        film.duration = duration  # Обновляем
+        if duration != film.duration:
+            film.duration = duration  # Обновляем
+            _update_future_screening_ends(db, film_id, duration)  # Прошедшие показы не меняются
 
     if description is not None:  # Если нужно обновить описание
         film.description = description.strip() if description else ""  # Обновляем
 
     db.add(film)
-    db.commit()
-    db.refresh(film)  # Обновляем объект
+    commit(db)
     return film  # Возвращаем результат
 
 
@@ -84,14 +100,80 @@ def delete_film(db: Session, film_id: int) -> bool:  # Удалить фильм
         raise ValueError(f"Невозможно удалить фильм: есть {future_screenings} запланированных показов")  # Ошибка
 
     db.delete(film)
-    db.commit()
+    commit(db)
     return True
 
+# РАБОТА С ЗАЛАМИ
+
+def create_hall(db: Session, name: str, rows: int, seats_per_row: int,
+                seat_categories: Optional[Dict[str, str]] = None) -> Hall:  # Создать зал
+    validate_string(name, "Название зала")  # Проверка названия
+    validate_positive_int(rows, "Количество рядов")  # Проверка геометрии зала
+    validate_positive_int(seats_per_row, "Количество мест в ряду")
+
+    existing_hall = db.query(Hall).filter(func.lower(Hall.name) == func.lower(name.strip())).first()  # Проверка дубликата
+    if existing_hall:
+        raise ValueError(f"Зал '{name}' уже существует (ID: {existing_hall.id})")  # Ошибка
+
+    new_hall = Hall(name=name.strip(), rows=rows, seats_per_row=seats_per_row, capacity=rows * seats_per_row,
+                    seat_categories=json.dumps(seat_categories, ensure_ascii=False) if seat_categories else None)  # Создаём зал
+
+    db.add(new_hall)
+    commit(db)
+    return new_hall
+
+
+def get_all_halls(db: Session) -> List[HallRow]:  # Получить список залов
+    return [HallRow._make(row) for row in db.query(*columns_of(HallRow, Hall)).order_by(Hall.name).all()]
+
+
+def get_halls_page(db: Session, cursor: Optional[Tuple] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:  # Страница списка залов
+    return project(keyset_page(db.query(*columns_of(HallRow, Hall)), [Hall.name, Hall.id], cursor, limit,
+                               key=lambda hall: (hall.name, hall.id)), HallRow)
+
+
+def get_hall_by_id(db: Session, hall_id: int) -> Optional[Hall]:  # Получить зал по ID
+    validate_positive_int(hall_id, "ID зала")  # Проверка ID
+    return db.query(Hall).filter(Hall.id == hall_id).first()
+
+
+def get_hall_by_name(db: Session, name: str) -> Optional[Hall]:  # Получить зал по названию
+    validate_string(name, "Название зала")  # Проверка названия
+    return db.query(Hall).filter(Hall.name == name.strip()).first()
+
+
+def get_hall_layout(hall) -> Dict[str, int]:  # Схема зала {ряд: количество мест}
+    if not hall.rows or not hall.seats_per_row:  # Геометрия зала неизвестна
+        raise ValueError(f"Для зала '{hall.name}' не задана схема рядов и мест")  # Ошибка
+    return {str(row): hall.seats_per_row for row in range(1, hall.rows + 1)}
+
+
+def delete_hall(db: Session, hall_id: int) -> bool:  # Удалить зал
+    validate_positive_int(hall_id, "ID зала")  # Проверка ID
+    hall = db.query(Hall).filter(Hall.id == hall_id).first()  # Поиск зала
+    if not hall:
+        return False
+
+    screenings_count = db.query(Screening).filter(Screening.hall_id == hall_id).count()  # Проверяем показы в зале
+    if screenings_count > 0:
+        raise ValueError(f"Невозможно удалить зал: есть {screenings_count} показов")  # Ошибка
+
+    db.delete(hall)
+    commit(db)
+    return True
+
+
+def _require_hall(db: Session, name: str) -> Hall:  # Найти зал по названию или сообщить об ошибке
+    hall = get_hall_by_name(db, name)
+    if not hall:
+        raise ValueError(f"Зал '{name}' не найден")  # Ошибка
+    return hall
+
 # РАБОТА С ПОКАЗАМИ
 
 def create_screening(db: Session, film_id: int, datetime_str: str, hall: str, ticket_price: float) -> Screening:  # Создать показ
     validate_positive_int(film_id, "ID фильма")  # Проверка ID фильма
-    screening_datetime = parse_date(datetime_str)  # Парсим дату
+    screening_datetime = parse_datetime(datetime_str)  # Парсим дату и время
     if screening_datetime < datetime.now():  # Проверка на прошлое
         raise ValueError("Дата и время показа не могут быть в прошлом")  # Ошибка
     validate_string(hall, "Название зала")  # Проверка названия зала
@@ -100,28 +182,56 @@ def create_screening(db: Session, film_id: int, datetime_str: str, hall: str, ti
     film = db.query(Film).filter(Film.id == film_id).first()  # Проверяем фильм
     if not film:  # Если фильм не найден
         raise ValueError(f"Фильм с ID {film_id} не найден")  # Ошибка
+    cinema_hall = _require_hall(db, hall)  # Проверяем зал
 
-    screening_end = screening_datetime + timedelta(minutes=film.duration)  # Конец показа
-    conflicting = db.query(Screening).filter(  # Проверка конфликта времени
-        Screening.hall == hall,
-        and_(Screening.datetime < screening_end,
-             func.datetime(Screening.datetime, f'+{film.duration} minutes') > screening_datetime)
-    ).first()
-    if conflicting:  # Если найден конфликт
+    screening_end = _screening_end(screening_datetime, film.duration)  # Конец показа
+    if _find_hall_conflict(db, cinema_hall.id, screening_datetime, screening_end):  # Проверка конфликта времени
         raise ValueError(f"Конфликт времени в зале '{hall}'")  # Ошибка
 
-    new_screening = Screening(film_id=film_id, datetime=screening_datetime,
-                              hall=hall.strip(), ticket_price=round(float(ticket_price), 2))  # Создаём показ
+    new_screening = Screening(film_id=film_id, datetime=screening_datetime, end_datetime=screening_end,
+                              hall=cinema_hall.name, hall_id=cinema_hall.id,
+                              ticket_price=round(float(ticket_price), 2))  # Создаём показ
 
     db.add(new_screening)
-    db.commit()  # Добавляем показ
-    db.refresh(new_screening)  # Обновляем объект
+    commit(db)  # Добавляем показ
     return new_screening  # Возвращаем результат
 
 
+def _screening_end(start: datetime, duration: Optional[int]) -> datetime:  # Окончание показа по длительности фильма
+    return start + timedelta(minutes=duration or 0)
+
+
+def _update_future_screening_ends(db: Session, film_id: int, duration: int) -> None:  # Новое окончание будущих показов
+    screenings = db.query(Screening).filter(Screening.film_id == film_id,
+                                            Screening.datetime > datetime.now()).order_by(Screening.datetime).all()
+    for screening in screenings:
+        screening.end_datetime = _screening_end(screening.datetime, duration)
+    for screening in screenings:  # Проверка после пересчёта всех показов: соседние показы фильма тоже удлинились
+        conflict = screening.hall_id and _find_hall_conflict(db, screening.hall_id, screening.datetime,
+                                                             screening.end_datetime, exclude_id=screening.id)
+        if conflict:
+            rollback(db)
+            raise ValueError(f"Конфликт времени в зале '{screening.hall}': показ {screening.id} с новой длительностью "
+                             f"пересекается с показом {conflict.id}")  # Ошибка
+
+
+def _find_hall_conflict(db: Session, hall_id: int, start: datetime, end: datetime,
+                        exclude_id: Optional[int] = None) -> Optional[Screening]:  # Найти пересекающийся показ в зале
+    gap = timedelta(minutes=CLEANING_GAP_MINUTES)  # Перерыв на уборку
+    query = db.query(Screening).filter(Screening.hall_id == hall_id,
+                                       Screening.end_datetime > start - gap,
+                                       Screening.datetime < end + gap)  # Условия по индексу (hall_id, end_datetime)
+    if exclude_id is not None:
+        query = query.filter(Screening.id != exclude_id)
+    return query.first()
+
+
 def get_all_screenings(db: Session, film_id: Optional[int] = None,
-                       start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Screening]:  # Получить показы
-    query = db.query(Screening)  # Базовый запрос
+                       start_date: Optional[str] = None, end_date: Optional[str] = None,
+                       cursor: Optional[Tuple] = None, limit: Optional[int] = None,
+                       with_total: bool = False) -> Page:  # Получить показы
+    """Показы по времени и ID; без limit - все показы одной страницей"""
+    query = db.query(*columns_of(ScreeningBriefRow, Screening))  # Базовый запрос
     if film_id is not None:  # Фильтр по фильму
         validate_positive_int(film_id, "ID фильма")
         query = query.filter(Screening.film_id == film_id)
@@ -129,7 +239,65 @@ def get_all_screenings(db: Session, film_id: Optional[int] = None,
         query = query.filter(Screening.datetime >= parse_date(start_date))
     if end_date:  # Фильтр по конечной дате
         query = query.filter(Screening.datetime <= parse_date(end_date))
-    return query.order_by(Screening.datetime).all()  # Сортировка и возврат
+    return project(keyset_page(query, [Screening.datetime, Screening.id], cursor, limit,
+                               key=lambda screening: (screening.datetime, screening.id), with_total=with_total),
+                   ScreeningBriefRow)
+
+
+# Сортировки списка показов: выражение ORDER BY и его значение в строке результата
+_SCREENING_SORTS = {
+    'datetime': (Screening.datetime, lambda row: row.datetime),
+    'film': (func.coalesce(Film.title, ''), lambda row: row.film_title or ''),
+    'hall': (Screening.hall, lambda row: row.hall),
+    'price': (Screening.ticket_price, lambda row: row.ticket_price),
+}
+
+
+def list_screenings(db: Session, film_id: Optional[int] = None, hall_id: Optional[int] = None,
+                    start_date: Optional[str] = None, end_date: Optional[str] = None,
+                    sort: str = 'datetime', descending: bool = False, cursor: Optional[Tuple] = None,
+                    limit: Optional[int] = None, with_total: bool = False) -> Page:  # Список показов одним запросом
+    """Показы с названием фильма и продажами одним запросом.
+
+    Проданные билеты и выручка считаются связанными подзапросами по индексу
+    (screening_id, sold), поэтому страница не агрегирует всю таблицу билетов.
+    Даты start_date и end_date включаются целиком. sort - datetime, film, hall
+    или price, при равенстве строки идут по ID; cursor - next_cursor
+    предыдущей страницы. Без limit возвращаются все подходящие показы.
+    """
+    if sort not in _SCREENING_SORTS:
+        raise ValueError(f"Недопустимая сортировка. Допустимые значения: {list(_SCREENING_SORTS)}")  # Ошибка
+    sort_column, sort_value = _SCREENING_SORTS[sort]
+
+    tickets_sold = db.query(func.count(Ticket.id)).filter(
+        Ticket.screening_id == Screening.id, Ticket.sold == True).correlate(Screening).scalar_subquery()
+    revenue = db.query(func.coalesce(func.sum(Ticket.price), 0.0)).filter(
+        Ticket.screening_id == Screening.id, Ticket.sold == True).correlate(Screening).scalar_subquery()
+    query = db.query(Screening.id, Screening.film_id, Film.title.label('film_title'), Screening.datetime,
+                     Screening.end_datetime, Screening.hall, Screening.ticket_price,
+                     tickets_sold.label('tickets_sold'), revenue.label('revenue')).outerjoin(
+        Film, Film.id == Screening.film_id)
+
+    if film_id is not None:  # Фильтр по фильму
+        validate_positive_int(film_id, "ID фильма")
+        query = query.filter(Screening.film_id == film_id)
+    if hall_id is not None:  # Фильтр по залу
+        validate_positive_int(hall_id, "ID зала")
+        query = query.filter(Screening.hall_id == hall_id)
+    if start_date:  # С начала первого дня
+        query = query.filter(Screening.datetime >= datetime.combine(parse_date(start_date), datetime.min.time()))
+    if end_date:  # До конца последнего дня
+        query = query.filter(Screening.datetime < datetime.combine(parse_date(end_date) + timedelta(days=1),
+                                                                   datetime.min.time()))
+
+    page = keyset_page(query, [sort_column, Screening.id], cursor, limit,
+                       key=lambda row: (sort_value(row), row.id), descending=descending, with_total=with_total)
+    return project(page, ScreeningRow)
+
+
+def get_screenings_page(db: Session, cursor: Optional[Tuple] = None,
+                        limit: int = DEFAULT_PAGE_SIZE) -> Page:  # Страница списка показов по времени
+    return list_screenings(db, cursor=cursor, limit=limit)
 
 
 def get_available_screenings(db: Session) -> List[Dict[str, Any]]:  # Получить доступные для покупки показы
@@ -160,23 +328,34 @@ def update_screening(db: Session, screening_id: int, datetime_str: Optional[str]
     if screening.datetime < datetime.now():  # Если показ уже прошёл
         raise ValueError("Невозможно изменить информацию о прошедшем показе")  # Ошибка
 
-    if datetime_str is not None:  # Обновление даты
-        new_datetime = parse_date(datetime_str)
+    # Все аргументы проверяются до первого изменения: ошибка не оставляет в сессии незафиксированных правок
+    new_datetime, new_end, cinema_hall = screening.datetime, screening.end_datetime, None
+    if datetime_str is not None:  # Новая дата
+        new_datetime = parse_datetime(datetime_str)
         if new_datetime < datetime.now():
             raise ValueError("Новая дата и время показа не могут быть в прошлом")
-        screening.datetime = new_datetime
+        duration = screening.end_datetime - screening.datetime if screening.end_datetime else timedelta(0)
+        new_end = new_datetime + duration
+    if hall is not None:  # Новый зал
+        cinema_hall = _require_hall(db, hall)
+    if ticket_price is not None:  # Новая цена
+        validate_price(ticket_price, "Цена билета")
 
-    if hall is not None:  # Обновление зала
-        validate_string(hall, "Название зала")
-        screening.hall = hall.strip()
+    hall_id = cinema_hall.id if cinema_hall else screening.hall_id
+    if (datetime_str is not None or hall is not None) and hall_id and _find_hall_conflict(
+            db, hall_id, new_datetime, new_end or new_datetime, exclude_id=screening_id):  # Проверка конфликта времени
+        raise ValueError(f"Конфликт времени в зале '{cinema_hall.name if cinema_hall else screening.hall}'")  # Ошибка
 
+    screening.datetime, screening.end_datetime = new_datetime, new_end
+    if cinema_hall is not None:  # Обновление зала
+        move_screening_sales(db, screening.id, screening.film_id, screening.hall_id, cinema_hall.id)  # Итоги продаж за залом
+        screening.hall = cinema_hall.name
+        screening.hall_id = cinema_hall.id
     if ticket_price is not None:  # Обновление цены
-        validate_price(ticket_price, "Цена билета")
         screening.ticket_price = round(float(ticket_price), 2)
 
     db.add(screening)
-    db.commit()
-    db.refresh(screening)  # Обновляем объект
+    commit(db)
     return screening  # Возвращаем результат
 
 
@@ -193,7 +372,7 @@ def delete_screening(db: Session, screening_id: int) -> bool:  # Удалить
         raise ValueError(f"Невозможно удалить показ: продано {sold_tickets} билетов")  # Ошибка
 
     db.delete(screening)
-    db.commit()
+    commit(db)
     return True
 
 # РАБОТА С БИЛЕТАМИ
@@ -208,6 +387,7 @@ def create_ticket(db: Session, screening_id: int, seat_number: str, price: float
         raise ValueError(f"Показ с ID {screening_id} не найден")  # Ошибка
     if screening.datetime < datetime.now():  # Проверка на прошедший показ
         raise ValueError("Невозможно создать билет на прошедший показ")  # Ошибка
+    _require_ticket_inventory(db, screening_id)  # Места показа с картой мест - только в карте
 
     existing_ticket = db.query(Ticket).filter(Ticket.screening_id == screening_id,
                                               Ticket.seat_number == seat_number.strip()).first()  # Проверка дубликата
@@ -221,23 +401,120 @@ def create_ticket(db: Session, screening_id: int, seat_number: str, price: float
                         price=round(float(price), 2), sold=False, sold_date=None)  # Создаём билет
 
     db.add(new_ticket)
-    db.commit()
-    db.refresh(new_ticket)
+    commit(db)
     return new_ticket
 
 
-def get_tickets_by_screening(db: Session, screening_id: int, sold_only: Optional[bool] = None) -> List[Ticket]:  # Получить билеты по показу
+def _uses_seat_map(db: Session, screening_id: int) -> bool:  # Места показа хранятся в карте мест (seat_map_service)
+    return db.query(SeatMap.screening_id).filter(SeatMap.screening_id == screening_id).first() is not None
+
+
+def _require_ticket_inventory(db: Session, screening_id: int) -> None:  # Билет на каждое место - только без карты мест
+    if _uses_seat_map(db, screening_id):  # Иначе одно место можно продать и по билету, и по карте
+        raise ValueError(f"Показ {screening_id} продаётся по карте мест, используйте seat_map_service")  # Ошибка
+
+
+def layout_seat_numbers(layout: Dict[str, int]) -> List[str]:  # Номера мест по схеме зала
+    """Номера мест по схеме зала {ряд: количество мест}, например {'A': 3} -> ['A-1', 'A-2', 'A-3']"""
+    seat_numbers = []
+    for row, seats_in_row in layout.items():
+        validate_string(str(row), "Ряд")  # Проверка названия ряда
+        validate_positive_int(seats_in_row, "Количество мест в ряду")  # Проверка количества мест
+        seat_numbers.extend(f"{str(row).strip()}-{seat}" for seat in range(1, seats_in_row + 1))
+    if not seat_numbers:
+        raise ValueError("Схема зала не содержит мест")  # Ошибка
+    return seat_numbers
+
+
+def generate_seat_inventory(db: Session, screening_id: int,
+                            layout: Optional[Dict[str, int]] = None) -> int:  # Создать все места показа
+    """Создать билеты на все места показа по схеме зала одной массовой вставкой, вернуть число новых мест.
+
+    Без layout используется схема зала показа.
+    """
+    validate_positive_int(screening_id, "ID показа")  # Проверка ID показа
+    screening = db.query(Screening).filter(Screening.id == screening_id).first()  # Проверяем показ
+    if not screening:
+        raise ValueError(f"Показ с ID {screening_id} не найден")  # Ошибка
+    if screening.datetime < datetime.now():  # Проверка на прошедший показ
+        raise ValueError("Невозможно создать билеты на прошедший показ")  # Ошибка
+    _require_ticket_inventory(db, screening_id)  # Показ с картой мест не получает билеты на каждое место
+
+    if layout is None:
+        layout = get_hall_layout(screening.cinema_hall) if screening.cinema_hall else {}
+    created = _insert_seat_inventory(db, [screening], layout_seat_numbers(layout))
+    commit(db)
+    return created[screening_id]
+
+
+def generate_inventory_for_period(db: Session, start_date_str: str,
+                                  layouts: Optional[Dict[str, Dict[str, int]]] = None,
+                                  days: int = 7) -> Dict[int, int]:  # Создать места для расписания на период
+    """Создать места для всех будущих показов периода в одной транзакции.
+
+    layouts сопоставляет название зала со схемой {ряд: количество мест}; по
+    умолчанию берутся схемы всех залов с заданной геометрией. Показы в залах
+    без схемы и показы с картой мест пропускаются. Возвращает {ID показа: число новых мест}.
+    """
+    validate_positive_int(days, "Количество дней")  # Проверка периода
+    if layouts is None:
+        layouts = {hall.name: get_hall_layout(hall) for hall in get_all_halls(db) if hall.rows and hall.seats_per_row}
+    period_start = datetime.combine(parse_date(start_date_str), datetime.min.time())  # Начало периода
+    start_datetime = max(period_start, datetime.now())  # Прошедшие показы не трогаем
+    end_datetime = period_start + timedelta(days=days)  # Конец периода
+    seat_numbers_by_hall = {hall: layout_seat_numbers(layout) for hall, layout in layouts.items()}
+
+    screenings = db.query(Screening).filter(Screening.datetime >= start_datetime,
+                                            Screening.datetime < end_datetime,
+                                            Screening.hall.in_(list(seat_numbers_by_hall)),
+                                            ~db.query(SeatMap.screening_id).filter(
+                                                SeatMap.screening_id == Screening.id).exists()).all()  # Показы периода без карты мест
+    created = {}
+    try:
+        for hall, seat_numbers in seat_numbers_by_hall.items():
+            hall_screenings = [screening for screening in screenings if screening.hall == hall]
+            if hall_screenings:
+                created.update(_insert_seat_inventory(db, hall_screenings, seat_numbers))
+        commit(db)  # Одна фиксация на всё расписание
+    except Exception:
+        rollback(db)
+        raise
+    return created
+
+
+def _insert_seat_inventory(db: Session, screenings: List[Screening], seat_numbers: List[str]) -> Dict[int, int]:  # Массовая вставка мест
+    screening_ids = [screening.id for screening in screenings]
+    existing = {}  # Уже существующие места по показам
+    for screening_id, seat_number in db.query(Ticket.screening_id, Ticket.seat_number).filter(
+            Ticket.screening_id.in_(screening_ids)).all():
+        existing.setdefault(screening_id, set()).add(seat_number)
+
+    rows = []  # Строки для executemany
+    created = {}
+    for screening in screenings:
+        taken = existing.get(screening.id, set())
+        new_seats = [seat_number for seat_number in seat_numbers if seat_number not in taken]
+        rows.extend({'screening_id': screening.id, 'seat_number': seat_number, 'price': screening.ticket_price,
+                     'sold': False, 'sold_date': None} for seat_number in new_seats)
+        created[screening.id] = len(new_seats)
+    if rows:
+        db.execute(insert(Ticket), rows)  # Одна массовая вставка вместо запроса на каждое место
+    return created
+
+
+def get_tickets_by_screening(db: Session, screening_id: int, sold_only: Optional[bool] = None) -> List[TicketRow]:  # Получить билеты по показу
     validate_positive_int(screening_id, "ID показа")  # Проверка ID
-    query = db.query(Ticket).filter(Ticket.screening_id == screening_id)  # Базовый запрос
+    query = db.query(*columns_of(TicketRow, Ticket)).filter(Ticket.screening_id == screening_id)  # Базовый запрос
     if sold_only is not None:  # Фильтр по статусу продажи
         query = query.filter(Ticket.sold == sold_only)
-    return query.order_by(Ticket.seat_number).all()  # Сортировка и возврат
+    return [TicketRow._make(row) for row in query.order_by(Ticket.seat_number).all()]  # Сортировка и возврат
 
 
 def get_available_seats(db: Session, screening_id: int) -> List[str]:  # Получить свободные места
     validate_positive_int(screening_id, "ID показа")  # Проверка ID
-    all_tickets = db.query(Ticket).filter(Ticket.screening_id == screening_id).all()  # Все билеты
-    return [ticket.seat_number for ticket in all_tickets if not ticket.sold]  # Только свободные
+    _require_ticket_inventory(db, screening_id)  # Свободные места показа с картой мест - в карте
+    tickets = db.query(Ticket.seat_number, Ticket.sold).filter(Ticket.screening_id == screening_id).all()  # Места показа
+    return [seat_number for seat_number, sold in tickets if not sold]  # Только свободные
 
 
 def sell_ticket(db: Session, ticket_id: int, order_id: Optional[int] = None) -> Optional[Ticket]:  # Продать билет
@@ -250,22 +527,85 @@ def sell_ticket(db: Session, ticket_id: int, order_id: Optional[int] = None) ->
         return None
     if ticket.sold:  # Если уже продан
         raise ValueError(f"Билет ID {ticket_id} уже продан")  # Ошибка
+    _require_ticket_inventory(db, ticket.screening_id)  # Продажа по карте мест - через seat_map_service
 
     screening = db.query(Screening).filter(Screening.id == ticket.screening_id).first()  # Проверка показа
     if screening and screening.datetime < datetime.now():  # Если показ прошёл
         raise ValueError("Невозможно продать билет на прошедший показ")  # Ошибка
 
-    ticket.sold = True  # Отмечаем как проданный
-    ticket.sold_date = datetime.now()  # Дата продажи
+    values = {'sold': True, 'sold_date': datetime.now()}  # Отмечаем как проданный
     if order_id:
-        ticket.order_id = order_id  # Привязываем заказ
+        values['order_id'] = order_id  # Привязываем заказ
+    result = db.execute(update(Ticket).where(Ticket.id == ticket_id, Ticket.sold == False).values(**values))  # Условная продажа
+    if result.rowcount != 1:  # Место успел занять другой кассир
+        rollback(db)
+        raise ValueError(f"Билет ID {ticket_id} уже продан")  # Ошибка
 
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
+    record_ticket_sales(db, screening, values['sold_date'], 1, ticket.price)  # Итоги дня в той же транзакции
+    commit(db)
     return ticket
 
 
+def sell_tickets(db: Session, screening_id: int, seat_numbers: List[str], order_id: Optional[int] = None,
+                 client_name: Optional[str] = None, phone: Optional[str] = None) -> OrderClients:  # Продать несколько мест
+    """Продать несколько мест одного показа в одной транзакции.
+
+    Места занимаются условным UPDATE ... WHERE sold = 0: если хотя бы одно место
+    уже продано или не существует, продажа отменяется целиком. Без order_id
+    создаётся новый заказ клиента, сумма заказа увеличивается на стоимость мест.
+    """
+    validate_positive_int(screening_id, "ID показа")  # Проверка ID показа
+    if not seat_numbers:
+        raise ValueError("Не указаны места для продажи")  # Ошибка
+    for seat_number in seat_numbers:
+        validate_string(seat_number, "Номер места")  # Проверка номера места
+    seats = [seat_number.strip() for seat_number in seat_numbers]
+    if len(set(seats)) != len(seats):
+        raise ValueError("Места в заказе не должны повторяться")  # Ошибка
+    if order_id is not None:
+        validate_positive_int(order_id, "ID заказа")  # Проверка ID заказа
+    else:
+        validate_string(client_name, "Имя клиента", 2)  # Данные для нового заказа
+        validate_string(phone, "Телефон клиента", 5)
+
+    screening = db.query(Screening).filter(Screening.id == screening_id).first()  # Проверка показа
+    if not screening:
+        raise ValueError(f"Показ с ID {screening_id} не найден")  # Ошибка
+    if screening.datetime < datetime.now():  # Если показ прошёл
+        raise ValueError("Невозможно продать билет на прошедший показ")  # Ошибка
+    _require_ticket_inventory(db, screening_id)  # Продажа по карте мест - через seat_map_service
+
+    try:
+        if order_id is not None:
+            order = db.query(OrderClients).filter(OrderClients.id == order_id).first()  # Существующий заказ
+            if not order:
+                raise ValueError(f"Заказ с ID {order_id} не найден")  # Ошибка
+        else:
+            order = OrderClients(client_name=client_name.strip(), phone=phone.strip(), order_date=datetime.now(),
+                                 total_amount=0.0, status="оформлен")  # Новый заказ клиента
+            db.add(order)
+            db.flush()  # Получаем ID заказа без фиксации транзакции
+
+        seat_filter = and_(Ticket.screening_id == screening_id, Ticket.seat_number.in_(seats))
+        sold_at = datetime.now()
+        result = db.execute(update(Ticket).where(seat_filter, Ticket.sold == False).values(
+            sold=True, sold_date=sold_at, order_id=order.id))  # Условно занимаем все места сразу
+        if result.rowcount != len(seats):  # Часть мест уже продана или не существует
+            rollback(db)
+            free_seats = {seat for seat, in db.query(Ticket.seat_number).filter(seat_filter, Ticket.sold == False).all()}
+            unavailable = [seat for seat in seats if seat not in free_seats]
+            raise ValueError(f"Места недоступны для продажи: {', '.join(unavailable)}")  # Ошибка
+
+        amount = db.query(func.sum(Ticket.price)).filter(seat_filter).scalar() or 0  # Стоимость проданных мест
+        order.total_amount = round((order.total_amount or 0) + amount, 2)  # Сумма заказа в той же транзакции
+        record_ticket_sales(db, screening, sold_at, len(seats), amount)  # Итоги дня в той же транзакции
+        commit(db)
+    except Exception:
+        rollback(db)
+        raise
+    return order
+
+
 def cancel_ticket_sale(db: Session, ticket_id: int) -> Optional[Ticket]:  # Отменить продажу билета
     validate_positive_int(ticket_id, "ID билета")  # Проверка ID
     ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()  # Поиск билета
@@ -273,18 +613,19 @@ def cancel_ticket_sale(db: Session, ticket_id: int) -> Optional[Ticket]:  # От
         return None
     if not ticket.sold:  # Если билет не продан
         raise ValueError(f"Билет ID {ticket_id} не продан, отмена невозможна")  # Ошибка
+    _require_ticket_inventory(db, ticket.screening_id)  # Отмена по карте мест - cancel_seats
 
     screening = db.query(Screening).filter(Screening.id == ticket.screening_id).first()  # Проверка показа
     if screening and screening.datetime < datetime.now():  # Если показ прошёл
         raise ValueError("Невозможно отменить продажу билета на прошедший показ")  # Ошибка
 
+    record_ticket_refunds(db, screening, ticket.sold_date, 1, ticket.price)  # Итоги дня в той же транзакции
     ticket.sold = False  # Снимаем продажу
     ticket.sold_date = None
     ticket.order_id = None
 
     db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
+    commit(db)
     return ticket
 
 
@@ -297,107 +638,151 @@ def delete_ticket(db: Session, ticket_id: int) -> bool:  # Удалить бил
         raise ValueError(f"Невозможно удалить проданный билет (ID: {ticket_id})")  # Ошибка
 
     db.delete(ticket)
-    db.commit()
+    commit(db)
     return True
 
 # АНАЛИТИКА КИНОТЕАТРА
 
 def get_daily_revenue(db: Session, date_str: str) -> Dict[str, Any]:  # Получить выручку за день
     target_date = parse_date(date_str)  # Парсим дату
-    start_datetime = datetime.combine(target_date, datetime.min.time())  # Начало дня
-    end_datetime = datetime.combine(target_date, datetime.max.time())  # Конец дня
-
-    tickets_sold = db.query(Ticket).filter(Ticket.sold == True,
-                                           Ticket.sold_date >= start_datetime,
-                                           Ticket.sold_date <= end_datetime).all()  # Проданные билеты за день
-    total_revenue = sum(ticket.price for ticket in tickets_sold)  # Общая выручка
-
-    film_revenue = {}  # Выручка по фильмам
-    for ticket in tickets_sold:
-        screening = db.query(Screening).filter(Screening.id == ticket.screening_id).first()
-        if screening:
-            film = db.query(Film).filter(Film.id == screening.film_id).first()
-            if film:
-                film_revenue[film.title] = film_revenue.get(film.title, 0) + ticket.price
+
+    results = db.query(Film.title,
+                       func.sum(SalesDailyRollup.tickets_sold).label('tickets_sold'),
+                       func.sum(SalesDailyRollup.revenue).label('total_revenue')).select_from(SalesDailyRollup).outerjoin(
+        Film, Film.id == SalesDailyRollup.film_id).filter(
+        SalesDailyRollup.date == target_date).group_by(SalesDailyRollup.film_id, Film.title).having(
+        func.sum(SalesDailyRollup.tickets_sold) > 0).all()  # Итоги дня по фильмам
+
+    total_tickets = sum(tickets_sold for _, tickets_sold, _ in results)  # Всего проданных билетов
+    total_revenue = sum(float(revenue or 0) for _, _, revenue in results)  # Общая выручка
+    film_revenue = {title: float(revenue or 0) for title, _, revenue in results if title is not None}  # Выручка по фильмам
 
     return {
         'date': target_date.isoformat(),
-        'total_tickets_sold': len(tickets_sold),
+        'total_tickets_sold': total_tickets,
         'total_revenue': round(total_revenue, 2),
-        'average_ticket_price': round(total_revenue / len(tickets_sold), 2) if tickets_sold else 0,
+        'average_ticket_price': round(total_revenue / total_tickets, 2) if total_tickets else 0,
         'revenue_by_film': film_revenue
     }
 
 
+def get_revenue_range(db: Session, start_date_str: str, end_date_str: str,
+                      group_by: Tuple[str, ...] = ("day", "film", "hall")) -> List[Dict[str, Any]]:  # Получить выручку за период
+    """Выручка за период с группировкой по дню, фильму и/или залу по дневным итогам продаж"""
+    start_date = parse_date(start_date_str)  # Начало периода
+    end_date = parse_date(end_date_str)  # Конец периода
+    if start_date > end_date:  # Проверка порядка дат
+        raise ValueError("Дата начала периода не может быть позже даты окончания")  # Ошибка
+
+    group_columns = {  # Допустимые измерения группировки
+        'day': SalesDailyRollup.date.label('day'),
+        'film': Film.title.label('film'),
+        'hall': Hall.name.label('hall')
+    }
+    unknown = [key for key in group_by if key not in group_columns]  # Неизвестные измерения
+    if unknown:
+        raise ValueError(f"Недопустимая группировка: {unknown}. Допустимые значения: {list(group_columns)}")  # Ошибка
+
+    columns = [group_columns[key] for key in group_by]  # Столбцы группировки в заданном порядке
+    results = db.query(*columns,
+                       func.sum(SalesDailyRollup.tickets_sold).label('tickets_sold'),
+                       func.sum(SalesDailyRollup.revenue).label('total_revenue')).select_from(SalesDailyRollup).outerjoin(
+        Film, Film.id == SalesDailyRollup.film_id).outerjoin(
+        Hall, Hall.id == SalesDailyRollup.hall_id).filter(
+        SalesDailyRollup.date >= start_date, SalesDailyRollup.date <= end_date).group_by(*columns).having(
+        func.sum(SalesDailyRollup.tickets_sold) > 0).order_by(*columns).all()  # Чтение диапазона итогов
+
+    revenue_rows = []  # Список результатов
+    for row in results:
+        tickets_sold = row.tickets_sold or 0
+        total_revenue = float(row.total_revenue or 0)
+        item = {key: getattr(row, key) for key in group_by}  # Значения измерений
+        if 'day' in item:
+            item['day'] = item['day'].isoformat()  # День строкой, как в отчётах
+        item.update({
+            'tickets_sold': tickets_sold,
+            'total_revenue': round(total_revenue, 2),
+            'average_ticket_price': round(total_revenue / tickets_sold, 2) if tickets_sold else 0
+        })
+        revenue_rows.append(item)
+    return revenue_rows
+
+
 def get_screening_attendance(db: Session, screening_id: int) -> Dict[str, Any]:  # Получить посещаемость показа
     validate_positive_int(screening_id, "ID показа")  # Проверка ID
-    screening = db.query(Screening).filter(Screening.id == screening_id).first()  # Поиск показа
-    if not screening:
+    rows = _query_attendance(db, Screening.id == screening_id)  # Агрегаты по показу
+    if not rows:
         raise ValueError(f"Показ с ID {screening_id} не найден")  # Ошибка
 
-    all_tickets = db.query(Ticket).filter(Ticket.screening_id == screening_id).all()  # Все билеты
-    sold_tickets = [t for t in all_tickets if t.sold]  # Проданные билеты
-    film = db.query(Film).filter(Film.id == screening.film_id).first()  # Фильм
+    attendance = rows[0]
+    attendance['sold_seat_numbers'] = [seat for seat, in db.query(Ticket.seat_number).filter(
+        Ticket.screening_id == screening_id, Ticket.sold == True).all()]  # Только номера проданных мест
+    return attendance
 
-    return {
-        'screening_id': screening_id,
-        'film_title': film.title if film else "Неизвестно",
-        'datetime': screening.datetime,
-        'hall': screening.hall,
-        'total_seats': len(all_tickets),
-        'seats_sold': len(sold_tickets),
-        'seats_available': len(all_tickets) - len(sold_tickets),
-        'occupancy_rate': round(len(sold_tickets) / len(all_tickets) * 100, 2) if all_tickets else 0,
-        'total_revenue': sum(t.price for t in sold_tickets),
-        'sold_seat_numbers': [t.seat_number for t in sold_tickets]
-    }
 
-
-def get_popular_films(db: Session, limit: int = 5, days: int = 30) -> List[Dict[str, Any]]:  # Получить популярные фильмы
-    validate_positive_int(limit, "limit")  # Проверка лимита
-    validate_positive_int(days, "days")  # Проверка периода
-    start_date = datetime.now() - timedelta(days=days)  # Начало периода
-
-    results = db.query(Film.title,
-                       func.count(Ticket.id).label('tickets_sold'),
-                       func.sum(Ticket.price).label('total_revenue')).join(
-        Screening, Film.id == Screening.film_id).join(
-        Ticket, Screening.id == Ticket.screening_id).filter(
-        Ticket.sold == True, Ticket.sold_date >= start_date).group_by(
-        Film.id, Film.title).order_by(func.count(Ticket.id).desc()).limit(limit).all()  # Запрос
-
-    popular_films = []  # Список результатов
-    for idx, (title, tickets_sold, total_revenue) in enumerate(results):
-        popular_films.append({
-            'rank': idx + 1,
-            'film_title': title,
-            'tickets_sold': tickets_sold or 0,
-            'total_revenue': round(float(total_revenue or 0), 2),
-            'average_ticket_price': round(float(total_revenue or 0) / (tickets_sold or 1), 2)
-        })
-    return popular_films
+def get_attendance_for_screenings(db: Session, screening_ids: List[int]) -> List[Dict[str, Any]]:  # Посещаемость нескольких показов
+    """Посещаемость и выручка для набора показов одним агрегирующим запросом"""
+    for screening_id in screening_ids:
+        validate_positive_int(screening_id, "ID показа")  # Проверка ID
+    if not screening_ids:  # Нечего считать
+        return []
+    return _query_attendance(db, Screening.id.in_(screening_ids))
 
 
-def get_screenings_for_date(db: Session, date_str: str) -> List[Dict[str, Any]]:
-    """Получить все показы на определенную дату"""
+def get_attendance_for_date(db: Session, date_str: str) -> List[Dict[str, Any]]:  # Посещаемость всех показов за день
+    """Посещаемость и выручка всех показов на определенную дату одним запросом"""
     target_date = parse_date(date_str)
     start_datetime = datetime.combine(target_date, datetime.min.time())
     end_datetime = datetime.combine(target_date, datetime.max.time())
+    return _query_attendance(db, and_(Screening.datetime >= start_datetime, Screening.datetime <= end_datetime))
+
+
+def _query_attendance(db: Session, condition) -> List[Dict[str, Any]]:  # Общий агрегирующий запрос посещаемости
+    sold_case = case((Ticket.sold == True, 1), else_=0)  # Признак проданного билета
+    revenue_case = case((Ticket.sold == True, Ticket.price), else_=0)  # Выручка только по проданным
+    results = db.query(Screening.id, Screening.film_id, Film.title, Screening.datetime, Screening.hall,
+                       Screening.ticket_price,
+                       Hall.capacity,
+                       func.count(Ticket.id).label('ticket_rows'),
+                       func.coalesce(func.sum(sold_case), 0).label('seats_sold'),
+                       func.coalesce(func.sum(revenue_case), 0).label('total_revenue')).outerjoin(
+        Film, Film.id == Screening.film_id).outerjoin(
+        Hall, Hall.id == Screening.hall_id).outerjoin(
+        Ticket, Ticket.screening_id == Screening.id).filter(condition).group_by(
+        Screening.datetime, Screening.id).order_by(Screening.datetime, Screening.id).all()  # Группировка в порядке индекса по дате, без полного чтения показов
+
+    attendance = []  # Список результатов
+    for row in results:
+        total_seats = row.capacity or row.ticket_rows or 0  # Вместимость зала, если она известна
+        seats_sold = int(row.seats_sold or 0)
+        attendance.append({
+            'screening_id': row.id,
+            'film_title': row.title if row.title is not None else f"Фильм ID:{row.film_id}",
+            'datetime': row.datetime,
+            'hall': row.hall,
+            'ticket_price': row.ticket_price,
+            'total_seats': total_seats,
+            'seats_sold': seats_sold,
+            'seats_available': total_seats - seats_sold,
+            'occupancy_rate': round(seats_sold / total_seats * 100, 2) if total_seats else 0,
+            'total_revenue': round(float(row.total_revenue or 0), 2)
+        })
+    return attendance
 
-    screenings = db.query(Screening).filter(
-        Screening.datetime >= start_datetime,
-        Screening.datetime <= end_datetime
-    ).order_by(Screening.datetime).all()
 
-    result = []
-    for screening in screenings:
-        film = db.query(Film).filter(Film.id == screening.film_id).first()
-        result.append({
-            'id': screening.id,
-            'film_title': film.title if film else f"Фильм ID:{screening.film_id}",
-            'datetime': screening.datetime,
-            'hall': screening.hall,
-            'ticket_price': screening.ticket_price
-        })
+def get_popular_films(db: Session, limit: int = 5, days: int = 30) -> List[Dict[str, Any]]:  # Получить популярные фильмы
+    """Топ фильмов по проданным билетам за последние days дней (кэшируемый рейтинг по дневным итогам)"""
+    validate_positive_int(limit, "limit")  # Проверка лимита
+    validate_positive_int(days, "days")  # Проверка периода
+    return leaderboard.top(db, days=days, limit=limit)
 
-    return result
+
+def get_screenings_for_date(db: Session, date_str: str) -> List[Dict[str, Any]]:
+    """Получить все показы на определенную дату"""
+    return [{
+        'id': row.id,
+        'film_title': row.film_title if row.film_title is not None else f"Фильм ID:{row.film_id}",
+        'datetime': row.datetime,
+        'hall': row.hall,
+        'ticket_price': row.ticket_price
+    } for row in list_screenings(db, start_date=date_str, end_date=date_str).items]
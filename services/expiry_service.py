@@ -0,0 +1,126 @@
+from sqlalchemy.orm import Session  # Работа с сессией SQLAlchemy
+from sqlalchemy import func, delete  # Агрегатные функции и массовое удаление
+from datetime import date, datetime, timedelta  # Работа с датами
+from typing import List, Optional, Dict, Any, Tuple  # Типизация
+import sys
+import os
+
+# Добавляем путь для импорта модулей
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import commit  # Фиксация с учётом единицы работы
+from models.license import Contract, License, ExpiryNotification  # ORM-модели
+from models.supplier import Supplier
+from models.cinema import Film
+from utils.validators import validate_positive_int
+
+# Поля уведомления, изменение которых считается изменением уведомления
+_TRACKED_FIELDS = ('name', 'related_id', 'related_name', 'end_date')
+
+# СКАНИРОВАНИЕ СРОКОВ КОНТРАКТОВ И ЛИЦЕНЗИЙ
+
+def scan_expiring(db: Session, days_threshold: int = 30) -> Dict[str, Any]:  # Найти изменения с прошлого сканирования
+    """Сравнить истекающие контракты и лицензии с сохранёнными уведомлениями.
+
+    Контракты с поставщиками и лицензии с фильмами читаются двумя запросами по
+    индексам даты окончания. Сохранённое состояние у каждого порога дней своё;
+    оно обновляется, а в ответе только отличия от прошлого сканирования с тем же
+    порогом: new и changed - уведомления, removed - ключи (kind, object_id)
+    исчезнувших уведомлений. Состояние общее для всех клиентов базы, поэтому
+    клиент, которому нужны изменения для себя (центр уведомлений), сравнивает
+    get_expiry_notifications со своим прошлым списком через diff_notifications.
+    """
+    validate_positive_int(days_threshold, "Пороговое значение дней")  # Проверяем порог
+    today = date.today()
+    current = {(item['kind'], item['object_id']): item for item in _load_expiring(db, today, days_threshold)}
+    stored = {(row.kind, row.object_id): row for row in db.query(ExpiryNotification).filter(
+        ExpiryNotification.days_threshold == days_threshold)}
+
+    now = datetime.now()
+    new_items, changed_items = [], []
+    for key, item in current.items():
+        row = stored.get(key)
+        if row is None:
+            db.add(ExpiryNotification(days_threshold=days_threshold, kind=item['kind'], object_id=item['object_id'],
+                                      first_seen=now, updated_at=now,
+                                      **{field: item[field] for field in _TRACKED_FIELDS}))
+            new_items.append(item)
+        elif any(getattr(row, field) != item[field] for field in _TRACKED_FIELDS):
+            for field in _TRACKED_FIELDS:
+                setattr(row, field, item[field])
+            row.updated_at = now
+            changed_items.append(item)
+
+    removed = [key for key in stored if key not in current]
+    if removed:
+        db.execute(delete(ExpiryNotification).where(
+            ExpiryNotification.id.in_([stored[key].id for key in removed])).execution_options(
+            synchronize_session=False))  # Истёкшие или продлённые объекты
+    commit(db)
+    return {
+        'scanned_at': now,
+        'new': sorted(new_items, key=_sort_key),
+        'changed': sorted(changed_items, key=_sort_key),
+        'removed': removed
+    }
+
+
+def get_expiry_notifications(db: Session, days_threshold: int = 30) -> List[Dict[str, Any]]:  # Сохранённые уведомления порога
+    """Уведомления из последнего сканирования с порогом days_threshold, отсортированные по дате окончания"""
+    validate_positive_int(days_threshold, "Пороговое значение дней")  # Проверяем порог
+    today = date.today()
+    rows = db.query(ExpiryNotification.kind, ExpiryNotification.object_id, ExpiryNotification.name,
+                    ExpiryNotification.related_id, ExpiryNotification.related_name,
+                    ExpiryNotification.end_date).filter(ExpiryNotification.days_threshold == days_threshold).order_by(
+        ExpiryNotification.end_date, ExpiryNotification.kind, ExpiryNotification.object_id).all()
+    return [_notification(*row, today) for row in rows]
+
+
+def diff_notifications(known: Dict[Tuple[str, int], Dict[str, Any]],
+                       notifications: List[Dict[str, Any]]) -> Dict[str, Any]:  # Изменения относительно своего списка
+    """Отличия notifications от уведомлений known {(kind, object_id): уведомление}, в формате scan_expiring"""
+    current = {(item['kind'], item['object_id']): item for item in notifications}
+    new_items = [item for key, item in current.items() if key not in known]
+    changed_items = [item for key, item in current.items() if key in known
+                     and any(known[key][field] != item[field] for field in _TRACKED_FIELDS)]
+    return {
+        'new': sorted(new_items, key=_sort_key),
+        'changed': sorted(changed_items, key=_sort_key),
+        'removed': [key for key in known if key not in current]
+    }
+
+
+def _load_expiring(db: Session, today: date, days_threshold: int) -> List[Dict[str, Any]]:  # Истекающие объекты двумя запросами
+    threshold_date = today + timedelta(days=days_threshold)
+
+    contracts = db.query(Contract.id, Contract.title, Contract.supplier_id, Supplier.name, Contract.end_date).outerjoin(
+        Supplier, Supplier.id == Contract.supplier_id).filter(
+        Contract.end_date >= today, Contract.end_date <= threshold_date).all()  # Контракты с именами поставщиков
+
+    first_film = db.query(Film.license_id.label('license_id'), func.min(Film.id).label('film_id')).filter(
+        Film.license_id.isnot(None)).group_by(Film.license_id).subquery()  # Первый фильм каждой лицензии
+    licenses = db.query(License.id, License.film_title, first_film.c.film_id, Film.title, License.end_date).outerjoin(
+        first_film, first_film.c.license_id == License.id).outerjoin(
+        Film, Film.id == first_film.c.film_id).filter(
+        License.end_date >= today, License.end_date <= threshold_date).all()  # Лицензии со связанными фильмами
+
+    items = [_notification('contract', *row, today) for row in contracts]
+    items.extend(_notification('license', *row, today) for row in licenses)
+    return items
+
+
+def _notification(kind: str, object_id: int, name: str, related_id: Optional[int], related_name: Optional[str],
+                  end_date: date, today: date) -> Dict[str, Any]:  # Уведомление в виде словаря
+    return {
+        'kind': kind,
+        'object_id': object_id,
+        'name': name,
+        'related_id': related_id,
+        'related_name': related_name,
+        'end_date': end_date,
+        'days_until_expiry': (end_date - today).days
+    }
+
+
+def _sort_key(item: Dict[str, Any]) -> Tuple:
+    return item['end_date'], item['kind'], item['object_id']
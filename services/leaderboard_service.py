@@ -0,0 +1,86 @@
+from sqlalchemy.orm import Session  # Работа с сессией SQLAlchemy
+from sqlalchemy import func  # Агрегатные функции
+from datetime import date, timedelta  # Работа с датами
+from typing import List, Optional, Dict, Any, Tuple  # Типизация
+import threading
+import sys
+import os
+
+# Добавляем путь для импорта модулей
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.cinema import Film, SalesDailyRollup  # ORM-модели
+from services.sales_rollup_service import rollup_generation, rollup_version, has_uncommitted_rollup_changes
+from utils.validators import validate_positive_int
+
+# РЕЙТИНГ ПОПУЛЯРНОСТИ ФИЛЬМОВ ПО СКОЛЬЗЯЩЕМУ ОКНУ
+
+class PopularityLeaderboard:
+    """Рейтинг фильмов за последние N дней по дневным итогам продаж.
+
+    Рейтинг окна считается суммированием дневных строк sales_daily_rollup
+    (их число зависит от дней и фильмов, а не от количества билетов) и
+    кэшируется целиком, поэтому запросы топ-5 и топ-10 за одно окно
+    обслуживаются одним расчётом. Кэш сбрасывается при смене дня и при любом
+    изменении итогов продаж: в этом процессе - сразу после COMMIT, в других
+    процессах (другие кассы) - по номеру изменения итогов в базе, который
+    читается одним запросом по первичному ключу при каждом обращении. При
+    равенстве билетов выше фильм с большей выручкой, затем по названию и ID.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None  # Номера изменения итогов (процесс, база), для которых собран кэш
+        self._rankings: Dict[Tuple[Any, date, int], List[Dict[str, Any]]] = {}
+
+    def top(self, db: Session, days: int = 30, limit: int = 5,
+            today: Optional[date] = None) -> List[Dict[str, Any]]:  # Топ фильмов за окно
+        validate_positive_int(days, "days")  # Проверка периода
+        validate_positive_int(limit, "limit")  # Проверка лимита
+        today = today or date.today()
+        key = (db.get_bind().engine.url, today, days)  # Сессия может быть привязана и к соединению
+        version = rollup_version(db)  # До расчёта: продажа после чтения номера только сбросит кэш
+        with self._lock:
+            generation = (rollup_generation(), version)
+            if self._generation != generation:  # Продажи изменились - кэш устарел
+                self._rankings.clear()
+                self._generation = generation
+            ranking = self._rankings.get(key)
+        if ranking is None:
+            ranking = self._load_ranking(db, today - timedelta(days=days - 1), today)  # days дней, включая сегодня
+            with self._lock:
+                if self._generation == (rollup_generation(), version) and not has_uncommitted_rollup_changes(db):
+                    self._rankings[key] = ranking  # Во время расчёта продаж не было, незафиксированных итогов нет
+        return [dict(item) for item in ranking[:limit]]  # Копии, чтобы не испортить кэш
+
+    def invalidate(self) -> None:  # Сбросить кэш (например, после правки базы в обход сервисов)
+        with self._lock:
+            self._rankings.clear()
+
+    @staticmethod
+    def _load_ranking(db: Session, start_date: date, end_date: date) -> List[Dict[str, Any]]:  # Полный рейтинг окна
+        tickets_sold = func.sum(SalesDailyRollup.tickets_sold)
+        revenue = func.sum(SalesDailyRollup.revenue)
+        results = db.query(Film.id, Film.title, tickets_sold.label('tickets_sold'),
+                           revenue.label('total_revenue')).join(
+            SalesDailyRollup, Film.id == SalesDailyRollup.film_id).filter(
+            SalesDailyRollup.date >= start_date, SalesDailyRollup.date <= end_date).group_by(
+            Film.id, Film.title).having(tickets_sold > 0).order_by(
+            tickets_sold.desc(), revenue.desc(), Film.title, Film.id).all()  # Суммы дневных строк окна
+
+        ranking = []
+        for idx, row in enumerate(results):
+            total_revenue = float(row.total_revenue or 0)
+            ranking.append({
+                'rank': idx + 1,
+                'film_id': row.id,
+                'film_title': row.title,
+                'tickets_sold': row.tickets_sold or 0,
+                'total_revenue': round(total_revenue, 2),
+                'average_ticket_price': round(total_revenue / (row.tickets_sold or 1), 2)
+            })
+        return ranking
+
+
+# Общий рейтинг процесса
+leaderboard = PopularityLeaderboard()
@@ -1,16 +1,20 @@
 from sqlalchemy.orm import Session  # Импортируем класс Session из SQLAlchemy — нужен для работы с базой данных
-from sqlalchemy import and_, or_  # Импортируем функции: and_, or_ (логические операторы для фильтров)
+from sqlalchemy import and_, or_, func, case, exists  # Импортируем логические операторы и функции для группировки
 from datetime import date, timedelta  # Импортируем классы для работы с датами: date и timedelta
-from typing import List, Optional, Dict, Any  # Импортируем типы для аннотаций: список, опциональные значения, словари
+from typing import List, Optional, Dict, Any, Tuple  # Импортируем типы для аннотаций: список, опциональные значения, словари
 import sys
 import os
 
 # Добавляем путь для импорта модулей
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from database import commit  # Фиксация с учётом единицы работы
 from models.license import Contract, License  # Импортируем ORM-модели Contract и License из модуля license
+from models.cinema import Film  # Фильмы нужны, чтобы отметить используемые лицензии
 from utils.validators import validate_positive_int, validate_string
 from utils.helper import parse_date
+from models.read_models import ContractRow, LicenseRow, columns_of, project  # Строки для чтения
+from utils.pagination import Page, keyset_page, DEFAULT_PAGE_SIZE
 
 ######################### создание заказа 
 def create_contract(db: Session, supplier_id: int, title: str,
@@ -35,21 +39,29 @@ def create_contract(db: Session, supplier_id: int, title: str,
     )
 
     db.add(new_contract)
-    db.commit()  # Добавляем контракт в сессию
-    db.refresh(new_contract)  # Обновляем объект, чтобы получить актуальные данные из базы
+    commit(db)  # Добавляем контракт в сессию
     return new_contract  # Возвращаем созданный контракт
 
 
-def get_all_contracts(db: Session, supplier_id: Optional[int] = None,
-                      active_only: bool = False) -> List[Contract]:  # Получить список контрактов
-    query = db.query(Contract)  # Базовый запрос ко всем контрактам
+def get_all_contracts(db: Session, supplier_id: Optional[int] = None, active_only: bool = False,
+                      cursor: Optional[Tuple] = None, limit: Optional[int] = None,
+                      with_total: bool = False) -> Page:  # Получить список контрактов
+    """Контракты, поздние сроки первыми; без limit - все контракты одной страницей"""
+    query = db.query(*columns_of(ContractRow, Contract))  # Базовый запрос: только столбцы списка
     if supplier_id is not None:  # Если указан фильтр по поставщику
         validate_positive_int(supplier_id, "ID поставщика")  # Проверяем ID
         query = query.filter(Contract.supplier_id == supplier_id)  # Фильтруем по поставщику
     if active_only:  # Если нужны только активные контракты
         today = date.today()  # Сегодняшняя дата
         query = query.filter(Contract.start_date <= today, Contract.end_date >= today)  # Фильтруем по активным
-    return query.order_by(Contract.end_date.desc()).all()  # Сортируем по дате окончания и возвращаем список
+    return project(keyset_page(query, [Contract.end_date, Contract.id], cursor, limit,
+                               key=lambda contract: (contract.end_date, contract.id), descending=True,
+                               with_total=with_total), ContractRow)  # Сортируем по дате окончания
+
+
+def get_contracts_page(db: Session, cursor: Optional[Tuple] = None,
+                       limit: int = DEFAULT_PAGE_SIZE) -> Page:  # Страница контрактов, поздние сроки первыми
+    return get_all_contracts(db, cursor=cursor, limit=limit)
 
 
 def get_contract_by_id(db: Session, contract_id: int) -> Optional[Contract]:  # Получить контракт по ID
@@ -80,8 +92,7 @@ def update_contract(db: Session, contract_id: int, title: Optional[str] = None,
         contract.file_path = file_path.strip() if file_path else None  # Обновляем путь
 
     db.add(contract)
-    db.commit()
-    db.refresh(contract)  # Обновляем объект
+    commit(db)
     return contract  # Возвращаем обновлённый контракт
 
 
@@ -95,8 +106,8 @@ def delete_contract(db: Session, contract_id: int) -> bool:  # Удалить к
     if license_count > 0:  # Если есть связанные лицензии
         raise ValueError(f"Невозможно удалить контракт: есть {license_count} связанных лицензий")  # Ошибка
 
-    with db.begin():  # Транзакция
-        db.delete(contract)  # Удаляем контракт
+    db.delete(contract)  # Удаляем контракт
+    commit(db)
     return True  # Возвращаем True (успех)
 
 def create_license(db: Session, supplier_id: int, contract_id: int, film_title: str,
@@ -143,14 +154,16 @@ def create_license(db: Session, supplier_id: int, contract_id: int, film_title:
     )
 
     db.add(new_license)
-    db.commit() # Добавляем лицензию в базу
-    db.refresh(new_license)  # Обновляем объект
+    commit(db) # Добавляем лицензию в базу
     return new_license  # Возвращаем созданную лицензию
 
 
 def get_all_licenses(db: Session, supplier_id: Optional[int] = None,
-                     contract_id: Optional[int] = None, active_only: bool = False) -> List[License]:  # Получить список лицензий
-    query = db.query(License)  # Базовый запрос ко всем лицензиям
+                     contract_id: Optional[int] = None, active_only: bool = False,
+                     cursor: Optional[Tuple] = None, limit: Optional[int] = None,
+                     with_total: bool = False) -> Page:  # Получить список лицензий
+    """Лицензии, поздние сроки первыми; без limit - все лицензии одной страницей"""
+    query = db.query(*columns_of(LicenseRow, License))  # Базовый запрос: только столбцы списка
     if supplier_id is not None:  # Если указан фильтр по поставщику
         validate_positive_int(supplier_id, "ID поставщика")  # Проверяем ID
         query = query.filter(License.supplier_id == supplier_id)  # Фильтруем по поставщику
@@ -160,7 +173,14 @@ def get_all_licenses(db: Session, supplier_id: Optional[int] = None,
     if active_only:  # Если нужны только активные лицензии
         today = date.today()  # Сегодняшняя дата
         query = query.filter(License.start_date <= today, License.end_date >= today)  # Фильтруем по активным
-    return query.order_by(License.end_date.desc()).all()  # Сортируем по дате окончания и возвращаем список
+    return project(keyset_page(query, [License.end_date, License.id], cursor, limit,
+                               key=lambda license_obj: (license_obj.end_date, license_obj.id), descending=True,
+                               with_total=with_total), LicenseRow)  # Сортируем по дате окончания
+
+
+def get_licenses_page(db: Session, cursor: Optional[Tuple] = None,
+                      limit: int = DEFAULT_PAGE_SIZE) -> Page:  # Страница лицензий, поздние сроки первыми
+    return get_all_licenses(db, cursor=cursor, limit=limit)
 
 
 def get_license_by_id(db: Session, license_id: int) -> Optional[License]:  # Получить лицензию по ID
@@ -198,9 +218,8 @@ def update_license(db: Session, license_id: int, film_title: Optional[str] = Non
             raise ValueError("Дата окончания лицензии не может быть позже окончания контракта")
         license_obj.end_date = new_end_date  # Обновляем дату окончания
 
-    with db.begin():  # Транзакция
-        db.add(license_obj)  # Сохраняем изменения
-    db.refresh(license_obj)  # Обновляем объект
+    db.add(license_obj)  # Сохраняем изменения
+    commit(db)
     return license_obj  # Возвращаем обновлённую лицензию
 
 
@@ -216,7 +235,7 @@ def delete_license(db: Session, license_id: int) -> bool:  # Удалить ли
         raise ValueError(f"Невозможно удалить лицензию: есть связанный фильм (ID: {film_exists.id})")  # Ошибка
 
     db.delete(license_obj)
-    db.commit()
+    commit(db)
     return True  # Возвращаем True (успех)
 
 # АНАЛИТИКА КОНТРАКТОВ И ЛИЦЕНЗИЙ
@@ -249,15 +268,16 @@ def get_expiring_licenses(db: Session, days_threshold: int = 30) -> List[Dict[st
     today = date.today()  # Сегодняшняя дата
     threshold_date = today + timedelta(days=days_threshold)  # Дата порога
 
-    expiring_licenses = db.query(License).filter(  # Запрашиваем лицензии
+    first_film = db.query(Film.license_id.label('license_id'), func.min(Film.id).label('film_id')).filter(
+        Film.license_id.isnot(None)).group_by(Film.license_id).subquery()  # Первый фильм каждой лицензии
+    expiring_licenses = db.query(License, first_film.c.film_id).outerjoin(  # Лицензии вместе со связанным фильмом
+        first_film, first_film.c.license_id == License.id).filter(
         License.end_date >= today,  # Дата окончания не раньше сегодняшней
         License.end_date <= threshold_date  # И не позже пороговой даты
     ).order_by(License.end_date).all()  # Сортируем по дате окончания
 
     result = []  # Список результатов
-    from models.cinema import Film  # Импортируем модель Film для проверки связей
-    for license_obj in expiring_licenses:  # Перебираем найденные лицензии
-        film = db.query(Film).filter(Film.license_id == license_obj.id).first()  # Проверяем, есть ли фильм с этой лицензией
+    for license_obj, film_id in expiring_licenses:  # Перебираем найденные лицензии
         result.append({
             'license_id': license_obj.id,  # ID лицензии
             'film_title': license_obj.film_title,  # Название фильма
@@ -266,123 +286,131 @@ def get_expiring_licenses(db: Session, days_threshold: int = 30) -> List[Dict[st
             'end_date': license_obj.end_date,  # Дата окончания
             'days_until_expiry': (license_obj.end_date - today).days,  # Сколько дней осталось
             'is_expired': license_obj.end_date < today,  # Флаг: истекла ли лицензия
-            'has_film': film is not None,  # Есть ли связанный фильм
-            'film_id': film.id if film else None  # ID фильма, если он есть
+            'has_film': film_id is not None,  # Есть ли связанный фильм
+            'film_id': film_id  # ID фильма, если он есть
         })
     return result  # Возвращаем список словарей
 
 
 def get_contract_summary(db: Session, contract_id: int) -> Dict[str, Any]:  # Получить сводную информацию по контракту
     validate_positive_int(contract_id, "ID контракта")  # Проверяем ID
-    contract = db.query(Contract).filter(Contract.id == contract_id).first()  # Ищем контракт
-    if not contract:  # Если контракт не найден
+    rows = _contract_rows(db, Contract.id == contract_id)  # Контракт со счётчиками лицензий одним запросом
+    if not rows:  # Если контракт не найден
         raise ValueError(f"Контракт с ID {contract_id} не найден")  # Ошибка
 
-    licenses = db.query(License).filter(License.contract_id == contract_id).all()  # Все лицензии контракта
     today = date.today()  # Сегодняшняя дата
-    active_licenses = [l for l in licenses if l.start_date <= today and l.end_date >= today]  # Активные лицензии
-
-    from models.cinema import Film  # Импортируем модель Film
-    used_license_ids = [lid[0] for lid in db.query(Film.license_id).filter(Film.license_id.isnot(None)).all()]  # ID используемых лицензий
-    used_licenses = [l for l in licenses if l.id in used_license_ids]  # Список используемых лицензий
-    unused_licenses = [l for l in licenses if l.id not in used_license_ids]  # Список неиспользуемых лицензий
-
-    return {  # Возвращаем словарь со сводной информацией
-        'contract_id': contract.id,
-        'title': contract.title,
-        'supplier_id': contract.supplier_id,
-        'start_date': contract.start_date,
-        'end_date': contract.end_date,
-        'is_active': contract.start_date <= today and contract.end_date >= today,  # Флаг: активен ли контракт
-        'total_licenses': len(licenses),  # Всего лицензий
-        'active_licenses': len(active_licenses),  # Активных лицензий
-        'used_licenses': len(used_licenses),  # Используемых лицензий
-        'unused_licenses': len(unused_licenses),  # Неиспользуемых лицензий
-        'days_remaining': (contract.end_date - today).days if contract.end_date >= today else 0,  # Сколько дней осталось
-        'licenses': [  # Список лицензий с деталями
-            {
-                'license_id': l.id,
-                'film_title': l.film_title,
-                'start_date': l.start_date,
-                'end_date': l.end_date,
-                'is_active': l.start_date <= today and l.end_date >= today,
-                'is_used': l.id in used_license_ids
-            }
-            for l in licenses
-        ]
-    }
+    summary = _contract_summary(rows[0], today)
+    is_used = exists().where(Film.license_id == License.id)  # Есть ли фильм с этой лицензией (по индексу)
+    licenses = db.query(License.id, License.film_title, License.start_date, License.end_date,
+                        is_used.label('is_used')).filter(License.contract_id == contract_id).all()  # Лицензии с признаком использования
+    summary['licenses'] = [  # Список лицензий с деталями
+        {
+            'license_id': l.id,
+            'film_title': l.film_title,
+            'start_date': l.start_date,
+            'end_date': l.end_date,
+            'is_active': l.start_date <= today and l.end_date >= today,
+            'is_used': bool(l.is_used)
+        }
+        for l in licenses
+    ]
+    return summary
+
+
+def get_all_contract_summaries(db: Session) -> List[Dict[str, Any]]:  # Сводка по всем контрактам
+    """Счётчики лицензий всех контрактов одним сгруппированным запросом (без списков лицензий)"""
+    today = date.today()
+    return [_contract_summary(row, today) for row in _contract_rows(db)]
+
 
 def get_supplier_contracts_summary(db: Session, supplier_id: int) -> Dict[str, Any]:  # Получить сводку по контрактам поставщика
     validate_positive_int(supplier_id, "ID поставщика")  # Проверяем, что ID поставщика — положительное целое число
-    contracts = db.query(Contract).filter(Contract.supplier_id == supplier_id).all()  # Запрашиваем все контракты этого поставщика
+    summaries = _supplier_summaries(_contract_rows(db, Contract.supplier_id == supplier_id))  # Один запрос на все контракты
+    return summaries[0] if summaries else _supplier_summary(supplier_id)  # Поставщик без контрактов
+
+
+def get_all_supplier_contract_summaries(db: Session) -> List[Dict[str, Any]]:  # Сводка по контрактам всех поставщиков
+    """Сводки get_supplier_contracts_summary для всех поставщиков с контрактами одним запросом"""
+    return _supplier_summaries(_contract_rows(db))
+
+
+def _contract_rows(db: Session, condition=None) -> List[Any]:  # Контракты со счётчиками лицензий
+    today = date.today()
+    is_active = and_(License.start_date <= today, License.end_date >= today)  # Лицензия действует сегодня
+    is_used = exists().where(Film.license_id == License.id)  # Есть фильм с этой лицензией
+    license_counts = db.query(
+        License.contract_id.label('contract_id'),
+        func.count(License.id).label('total_licenses'),
+        func.sum(case((is_active, 1), else_=0)).label('active_licenses'),
+        func.sum(case((is_used, 1), else_=0)).label('used_licenses')
+    ).join(Contract, Contract.id == License.contract_id)
+    if condition is not None:  # Условие внутри подзапроса: лицензии читаются по индексу только для нужных контрактов
+        license_counts = license_counts.filter(condition)
+    license_counts = license_counts.group_by(License.contract_id).subquery()  # Счётчики за один проход по лицензиям
+
+    query = db.query(Contract.id, Contract.supplier_id, Contract.title, Contract.start_date, Contract.end_date,
+                     func.coalesce(license_counts.c.total_licenses, 0).label('total_licenses'),
+                     func.coalesce(license_counts.c.active_licenses, 0).label('active_licenses'),
+                     func.coalesce(license_counts.c.used_licenses, 0).label('used_licenses')).outerjoin(
+        license_counts, license_counts.c.contract_id == Contract.id)
+    if condition is not None:
+        query = query.filter(condition)
+    return query.order_by(Contract.supplier_id, Contract.id).all()
+
+
+def _contract_status(row: Any, today: date) -> str:  # Статус контракта на сегодня
+    if row.start_date <= today and row.end_date >= today:
+        return 'active'
+    return 'expired' if row.end_date < today else 'future'  # expired — если истёк, future — если ещё не начался
+
+
+def _contract_summary(row: Any, today: date) -> Dict[str, Any]:  # Сводка контракта из строки _contract_rows
+    return {
+        'contract_id': row.id,
+        'title': row.title,
+        'supplier_id': row.supplier_id,
+        'start_date': row.start_date,
+        'end_date': row.end_date,
+        'is_active': _contract_status(row, today) == 'active',  # Флаг: активен ли контракт
+        'total_licenses': row.total_licenses,  # Всего лицензий
+        'active_licenses': int(row.active_licenses),  # Активных лицензий
+        'used_licenses': int(row.used_licenses),  # Используемых лицензий
+        'unused_licenses': row.total_licenses - int(row.used_licenses),  # Неиспользуемых лицензий
+        'days_remaining': (row.end_date - today).days if row.end_date >= today else 0  # Сколько дней осталось
+    }
 
-    today = date.today()  # Получаем сегодняшнюю дату
-    active_contracts = [c for c in contracts if c.start_date <= today and c.end_date >= today]  # Список активных контрактов
-    expired_contracts = [c for c in contracts if c.end_date < today]  # Список истёкших контрактов
-    future_contracts = [c for c in contracts if c.start_date > today]  # Список будущих контрактов
-
-    total_licenses = 0  # Счётчик всех лицензий
-    active_licenses = 0  # Счётчик активных лицензий
-    for contract in contracts:  # Перебираем все контракты
-        licenses = db.query(License).filter(License.contract_id == contract.id).all()  # Получаем лицензии для контракта
-        total_licenses += len(licenses)  # Увеличиваем общий счётчик лицензий
-        active_licenses += len([l for l in licenses if l.start_date <= today and l.end_date >= today])  # Увеличиваем счётчик активных лицензий
-
-    return {  # Возвращаем словарь со сводной информацией
+
+def _supplier_summary(supplier_id: int) -> Dict[str, Any]:  # Пустая сводка поставщика
+    return {
         'supplier_id': supplier_id,  # ID поставщика
-        'total_contracts': len(contracts),  # Всего контрактов
-        'active_contracts': len(active_contracts),  # Количество активных контрактов
-        'expired_contracts': len(expired_contracts),  # Количество истёкших контрактов
-        'future_contracts': len(future_contracts),  # Количество будущих контрактов
-        'total_licenses': total_licenses,  # Всего лицензий
-        'active_licenses': active_licenses,  # Активных лицензий
-        'contracts': [  # Список всех контрактов с деталями
-            {
-                'contract_id': c.id,  # ID контракта
-                'title': c.title,  # Название контракта
-                'start_date': c.start_date,  # Дата начала
-                'end_date': c.end_date,  # Дата окончания
-                'status': 'active' if c.start_date <= today and c.end_date >= today else  # Определяем статус
-                          'expired' if c.end_date < today else 'future',  # expired — если истёк, future — если ещё не начался
-                'days_remaining': (c.end_date - today).days if c.end_date >= today else 0  # Сколько дней осталось до окончания (или 0, если истёк)
-            }
-            for c in contracts  # Перебираем все контракты
-        ]
+        'total_contracts': 0,  # Всего контрактов
+        'active_contracts': 0,  # Количество активных контрактов
+        'expired_contracts': 0,  # Количество истёкших контрактов
+        'future_contracts': 0,  # Количество будущих контрактов
+        'total_licenses': 0,  # Всего лицензий
+        'active_licenses': 0,  # Активных лицензий
+        'contracts': []  # Список всех контрактов с деталями
     }
 
-def delete_contract(db: Session, contract_id: int) -> bool:
-    """Удалить контракт"""
-    validate_positive_int(contract_id, "ID контракта")
-    contract = db.query(Contract).filter(Contract.id == contract_id).first()
-    if not contract:
-        return False
-
-    # Проверяем, есть ли связанные лицензии
-    license_count = db.query(License).filter(License.contract_id == contract_id).count()
-    if license_count > 0:
-        # Можно предложить удалить лицензии или показать ошибку
-        # Пока просто запрещаем удаление
-        raise ValueError(f"Невозможно удалить контракт: есть {license_count} связанных лицензий")
-
-    # ИСПРАВЛЕНИЕ: убираем with db.begin()
-    db.delete(contract)
-    db.commit()
-    return True
-
-def delete_license(db: Session, license_id: int) -> bool:
-    """Удалить лицензию"""
-    validate_positive_int(license_id, "ID лицензии")
-    license_obj = db.query(License).filter(License.id == license_id).first()
-    if not license_obj:
-        return False
-
-    # Проверяем, есть ли связанный фильм
-    from models.cinema import Film
-    film_exists = db.query(Film).filter(Film.license_id == license_id).first()
-    if film_exists:
-        raise ValueError(f"Невозможно удалить лицензию: есть связанный фильм (ID: {film_exists.id})")
-
-    # ИСПРАВЛЕНИЕ: убираем with db.begin()
-    db.delete(license_obj)
-    db.commit()
-    return True
\ No newline at end of file
+
+def _supplier_summaries(rows: List[Any]) -> List[Dict[str, Any]]:  # Свернуть строки контрактов в сводки поставщиков
+    today = date.today()
+    summaries = {}
+    for row in rows:  # Строки уже отсортированы по поставщику
+        summary = summaries.get(row.supplier_id)
+        if summary is None:
+            summary = summaries[row.supplier_id] = _supplier_summary(row.supplier_id)
+        status = _contract_status(row, today)
+        summary['total_contracts'] += 1
+        summary[f'{status}_contracts'] += 1
+        summary['total_licenses'] += row.total_licenses
+        summary['active_licenses'] += int(row.active_licenses)
+        summary['contracts'].append({
+            'contract_id': row.id,  # ID контракта
+            'title': row.title,  # Название контракта
+            'start_date': row.start_date,  # Дата начала
+            'end_date': row.end_date,  # Дата окончания
+            'status': status,  # Статус контракта
+            'days_remaining': (row.end_date - today).days if row.end_date >= today else 0  # Сколько дней осталось до окончания (или 0, если истёк)
+        })
+    return list(summaries.values())
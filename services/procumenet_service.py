@@ -1,16 +1,19 @@
 from sqlalchemy.orm import Session  # Импортируем класс Session из SQLAlchemy — нужен для работы с базой данных
 from sqlalchemy import func  # Импортируем функции для агрегации (например, count, sum)
 from datetime import datetime, date, timedelta  # Импортируем классы для работы с датами
-from typing import List, Optional, Dict, Any  # Импортируем типы для аннотаций
+from typing import List, Optional, Dict, Any, Tuple  # Импортируем типы для аннотаций
 import sys
 import os
 
 # Добавляем путь для импорта модулей
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from database import commit  # Фиксация с учётом единицы работы
 from models.procurement import OrderSupliers, OrderClients, OrderItem  # Импортируем ORM-модели для заказов
 from utils.validators import validate_positive_int, validate_string, validate_price, validate_quantity, validate_status
 from utils.helper import parse_date
+from models.read_models import SupplierOrderRow, ClientOrderRow, columns_of, project  # Строки для чтения
+from utils.pagination import Page, keyset_page
 
 # РАБОТА С ЗАКАЗАМИ ПОСТАВЩИКАМ
 def create_supplier_order(db: Session, supplier_id: int, contract_id: int,
@@ -34,13 +37,14 @@ def create_supplier_order(db: Session, supplier_id: int, contract_id: int,
     )
 
     db.add(new_order)
-    db.commit()
-    db.refresh(new_order)  # Обновляем объект из базы
+    commit(db)
     return new_order  # Возвращаем созданный заказ
 
-def get_all_supplier_orders(db: Session, supplier_id: Optional[int] = None,
-                            status: Optional[str] = None) -> List[OrderSupliers]:  # Получить список заказов поставщикам
-    query = db.query(OrderSupliers)  # Базовый запрос ко всем заказам
+def get_all_supplier_orders(db: Session, supplier_id: Optional[int] = None, status: Optional[str] = None,
+                            cursor: Optional[Tuple] = None, limit: Optional[int] = None,
+                            with_total: bool = False) -> Page:  # Получить список заказов поставщикам
+    """Заказы, новые первыми; без limit - все заказы одной страницей"""
+    query = db.query(*columns_of(SupplierOrderRow, OrderSupliers))  # Базовый запрос: только столбцы списка
 
     if supplier_id is not None:  # Если указан ID поставщика
         validate_positive_int(supplier_id, "ID поставщика")  # Проверяем ID
@@ -51,7 +55,9 @@ def get_all_supplier_orders(db: Session, supplier_id: Optional[int] = None,
         validate_status(status, valid_statuses, "Статус заказа")  # Проверяем статус
         query = query.filter(OrderSupliers.status == status)  # Фильтруем по статусу
 
-    return query.order_by(OrderSupliers.created_date.desc()).all()  # Сортируем по дате создания и возвращаем список
+    return project(keyset_page(query, [OrderSupliers.created_date, OrderSupliers.id], cursor, limit,
+                               key=lambda order: (order.created_date, order.id), descending=True,
+                               with_total=with_total), SupplierOrderRow)  # Сортируем по дате создания
 
 
 def get_supplier_order_by_id(db: Session, order_id: int) -> Optional[OrderSupliers]:  # Получить заказ по ID
@@ -74,8 +80,7 @@ def update_supplier_order_status(db: Session, order_id: int,
         order.delivery_date = date.today()  # Устанавливаем сегодняшнюю дату как дату доставки
 
     db.add(order)
-    db.commit()
-    db.refresh(order)  # Обновляем объект
+    commit(db)
     return order  # Возвращаем обновлённый заказ
 
 
@@ -106,9 +111,8 @@ def add_item_to_supplier_order(db: Session, order_id: int,
     db.add(new_item)
     order.total_amount = round(order.total_amount + total_price, 2)
     db.add(order)
-    db.commit()
+    commit(db)
 
-    db.refresh(new_item)  # Обновляем объект товара
     return new_item  # Возвращаем добавленный товар
 
 
@@ -128,7 +132,7 @@ def delete_supplier_order(db: Session, order_id: int) -> bool:  # Удалить
 
     db.query(OrderItem).filter(OrderItem.order_id == order_id).delete()
     db.delete(order)
-    db.commit()
+    commit(db)
 
     return True
 
@@ -151,14 +155,16 @@ def create_client_order(db: Session, client_name: str, phone: str,
     )
 
     db.add(new_order)
-    db.commit()
-    db.refresh(new_order)  # Обновляем объект
+    commit(db)
     return new_order  # Возвращаем созданный заказ
 
 
 def get_all_client_orders(db: Session, status: Optional[str] = None,
-                          start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[OrderClients]:  # Получить список заказов клиентов
-    query = db.query(OrderClients)  # Базовый запрос ко всем заказам клиентов
+                          start_date: Optional[str] = None, end_date: Optional[str] = None,
+                          cursor: Optional[Tuple] = None, limit: Optional[int] = None,
+                          with_total: bool = False) -> Page:  # Получить список заказов клиентов
+    """Заказы клиентов, новые первыми; без limit - все заказы одной страницей"""
+    query = db.query(*columns_of(ClientOrderRow, OrderClients))  # Базовый запрос: только столбцы списка
 
     if status is not None:  # Если указан статус
         validate_string(status, "Статус заказа")  # Проверяем статус
@@ -172,7 +178,9 @@ def get_all_client_orders(db: Session, status: Optional[str] = None,
         end = parse_date(end_date)  # Парсим дату
         query = query.filter(OrderClients.order_date <= datetime.combine(end, datetime.max.time()))  # Фильтруем по дате окончания
 
-    return query.order_by(OrderClients.order_date.desc()).all()  # Сортируем по дате заказа и возвращаем список
+    return project(keyset_page(query, [OrderClients.order_date, OrderClients.id], cursor, limit,
+                               key=lambda order: (order.order_date, order.id), descending=True,
+                               with_total=with_total), ClientOrderRow)  # Сортируем по дате заказа
 
 
 def get_client_order_by_id(db: Session, order_id: int) -> Optional[OrderClients]:  # Получить заказ клиента по ID
@@ -191,9 +199,8 @@ def update_client_order_status(db: Session, order_id: int,
     validate_string(new_status, "Статус заказа")  # Проверяем новый статус
     order.status = new_status  # Обновляем статус
 
-    with db.begin():  # Транзакция
-        db.add(order)  # Сохраняем изменения
-    db.refresh(order)  # Обновляем объект
+    db.add(order)  # Сохраняем изменения
+    commit(db)
     return order  # Возвращаем обновлённый заказ
 
 
@@ -210,8 +217,7 @@ def update_client_order_amount(db: Session, order_id: int,
     order.total_amount = round(new_amount, 2)  # Обновляем сумму заказа (округляем до 2 знаков)
 
     db.add(order)
-    db.commit()
-    db.refresh(order)  # Обновляем объект
+    commit(db)
     return order  # Возвращаем обновлённый заказ
 
 
@@ -222,7 +228,7 @@ def delete_client_order(db: Session, order_id: int) -> bool:  # Удалить 
         return False  # Возвращаем False
 
     db.delete(order)
-    db.commit()
+    commit(db)
 
     return True
 
@@ -281,13 +287,13 @@ def get_daily_client_revenue(db: Session, date_str: str) -> Dict[str, Any]:  # 
     start_datetime = datetime.combine(target_date, datetime.min.time())  # Начало дня
     end_datetime = datetime.combine(target_date, datetime.max.time())  # Конец дня
 
-    orders = db.query(OrderClients).filter(  # Запрос заказов клиентов за день
+    total_orders, total_revenue = db.query(  # Агрегаты по заказам клиентов за день (диапазон по индексу даты)
+        func.count(OrderClients.id),
+        func.coalesce(func.sum(OrderClients.total_amount), 0)
+    ).filter(
         OrderClients.order_date >= start_datetime,
         OrderClients.order_date <= end_datetime
-    ).all()
-
-    total_revenue = sum(order.total_amount for order in orders)  # Суммируем выручку
-    total_orders = len(orders)  # Считаем количество заказов
+    ).one()
 
     return {  # Возвращаем статистику
         'date': target_date.isoformat(),
@@ -0,0 +1,181 @@
+from sqlalchemy.orm import Session  # Работа с сессией SQLAlchemy
+from sqlalchemy import event, func, update, delete  # События сессии, агрегатные функции и массовые операции
+from sqlalchemy.dialects.sqlite import insert  # INSERT ... ON CONFLICT для накопления итогов
+from datetime import date, datetime, timedelta  # Работа с датами
+from typing import List, Optional, Dict, Any  # Типизация
+import sys
+import os
+
+# Добавляем путь для импорта модулей
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import commit, rollback  # Фиксация с учётом единицы работы
+from models.cinema import Screening, Ticket, SalesDailyRollup, SalesRollupVersion  # ORM-модели
+from utils.validators import validate_positive_int
+from utils.helper import parse_date
+
+# Сколько дней истории пересчитывается за одну транзакцию при перестроении итогов
+REBUILD_CHUNK_DAYS = 31
+
+# Номер изменения итогов в этом процессе: кэши отчётов сбрасываются, когда он меняется
+_generation = 0
+_ROLLUP_CHANGED = "sales_rollup_changed"  # Ключ в db.info: транзакция сессии изменила итоги
+
+
+def rollup_generation() -> int:  # Текущий номер изменения итогов
+    return _generation
+
+
+def _bump_generation() -> None:
+    global _generation
+    _generation += 1
+
+
+def rollup_version(db: Session) -> int:  # Номер изменения итогов в базе, общий для всех процессов
+    return db.query(SalesRollupVersion.version).filter(SalesRollupVersion.id == 1).scalar() or 0
+
+
+def has_uncommitted_rollup_changes(db: Session) -> bool:  # Транзакция сессии изменила итоги, но ещё не зафиксирована
+    return bool(db.info.get(_ROLLUP_CHANGED))
+
+
+def _mark_rollup_changed(db: Session) -> None:  # Отметить изменение итогов в транзакции сессии
+    db.info[_ROLLUP_CHANGED] = True  # Кэши процесса сбросятся после COMMIT: до него другие сессии видят старые итоги
+    statement = insert(SalesRollupVersion).values(id=1, version=1)
+    db.execute(statement.on_conflict_do_update(index_elements=['id'], set_={
+        'version': SalesRollupVersion.version + 1}))  # Другие процессы увидят новый номер после COMMIT
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_generation_on_commit(session: Session) -> None:  # Номер меняется только после фиксации итогов
+    if session.info.pop(_ROLLUP_CHANGED, False):
+        _bump_generation()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_changes(session: Session) -> None:  # Откаченные итоги кэш не сбрасывают
+    session.info.pop(_ROLLUP_CHANGED, None)
+
+# ОБНОВЛЕНИЕ ИТОГОВ ПРИ ПРОДАЖЕ И ВОЗВРАТЕ
+# Функции не фиксируют транзакцию: итоги пишутся в той же транзакции, что и сама продажа.
+
+def record_ticket_sales(db: Session, screening: Optional[Screening], sold_at: datetime,
+                        tickets: int, revenue: float) -> None:  # Учесть продажу билетов показа
+    film_id, hall_id = _screening_key(screening)
+    _add_to_rollup(db, [_rollup_row(film_id, hall_id, sold_at.date(), tickets_sold=tickets, revenue=revenue)])
+
+
+def record_ticket_refunds(db: Session, screening: Optional[Screening], sold_at: Optional[datetime],
+                          tickets: int, amount: float, refunded_at: Optional[datetime] = None) -> None:  # Учесть возврат
+    """Вычесть билеты из итогов дня продажи и записать возврат в итоги дня возврата"""
+    film_id, hall_id = _screening_key(screening)
+    refund_day = (refunded_at or datetime.now()).date()
+    rows = [_rollup_row(film_id, hall_id, refund_day, refunds=tickets, refund_amount=amount)]
+    if sold_at is not None:  # Без даты продажи билет не попадал в итоги продаж
+        rows.append(_rollup_row(film_id, hall_id, sold_at.date(), tickets_sold=-tickets, revenue=-amount))
+    _add_to_rollup(db, rows)
+
+
+def move_screening_sales(db: Session, screening_id: int, film_id: Optional[int],
+                         old_hall_id: Optional[int], new_hall_id: Optional[int]) -> None:  # Перенести продажи показа в другой зал
+    if old_hall_id == new_hall_id:
+        return
+    sales = db.query(func.date(Ticket.sold_date), func.count(Ticket.id), func.sum(Ticket.price)).filter(
+        Ticket.screening_id == screening_id, Ticket.sold == True).group_by(func.date(Ticket.sold_date)).all()
+    rows = []
+    for day, tickets, revenue in sales:
+        if day is None:
+            continue
+        day = date.fromisoformat(day)
+        rows.append(_rollup_row(film_id, old_hall_id, day, tickets_sold=-tickets, revenue=-revenue))
+        rows.append(_rollup_row(film_id, new_hall_id, day, tickets_sold=tickets, revenue=revenue))
+    _add_to_rollup(db, rows)
+
+
+def _screening_key(screening: Optional[Screening]) -> tuple:  # Фильм и зал показа для ключа итогов
+    return (screening.film_id, screening.hall_id) if screening else (None, None)
+
+
+def _rollup_row(film_id: Optional[int], hall_id: Optional[int], day: date, tickets_sold: int = 0,
+                revenue: float = 0.0, refunds: int = 0, refund_amount: float = 0.0) -> Dict[str, Any]:
+    return {'date': day, 'film_id': film_id or 0, 'hall_id': hall_id or 0, 'tickets_sold': tickets_sold,
+            'revenue': round(float(revenue or 0), 2), 'refunds': refunds,
+            'refund_amount': round(float(refund_amount or 0), 2)}
+
+
+def _add_to_rollup(db: Session, rows: List[Dict[str, Any]]) -> None:  # Прибавить значения к итогам (upsert)
+    if not rows:
+        return
+    _mark_rollup_changed(db)
+    statement = insert(SalesDailyRollup)
+    statement = statement.on_conflict_do_update(
+        index_elements=['date', 'film_id', 'hall_id'],
+        set_={
+            'tickets_sold': SalesDailyRollup.tickets_sold + statement.excluded.tickets_sold,
+            'revenue': func.round(SalesDailyRollup.revenue + statement.excluded.revenue, 2),
+            'refunds': SalesDailyRollup.refunds + statement.excluded.refunds,
+            'refund_amount': func.round(SalesDailyRollup.refund_amount + statement.excluded.refund_amount, 2)
+        })
+    db.execute(statement, rows)
+
+# ПЕРЕСТРОЕНИЕ ИТОГОВ ПО ИСТОРИИ БИЛЕТОВ
+
+def rebuild_sales_rollup(db: Session, start_date_str: Optional[str] = None, end_date_str: Optional[str] = None,
+                         chunk_days: int = REBUILD_CHUNK_DAYS) -> Dict[str, Any]:  # Пересчитать итоги продаж
+    """Пересчитать продажи и выручку в итогах по проданным билетам.
+
+    История читается отрезками по chunk_days дней, каждый отрезок - одна
+    сгруппированная выборка по индексу даты продажи и отдельная транзакция,
+    поэтому пересчёт года не держит в памяти все билеты и не блокирует кассы
+    надолго. Без дат пересчитывается вся история. Возвраты по билетам не
+    восстановить (отмена продажи очищает билет), поэтому счётчики возвратов
+    сохраняются как есть.
+    """
+    validate_positive_int(chunk_days, "Размер отрезка в днях")  # Проверка размера отрезка
+    first_sale, last_sale = db.query(func.min(Ticket.sold_date), func.max(Ticket.sold_date)).filter(
+        Ticket.sold == True).one()
+    start_day = parse_date(start_date_str) if start_date_str else (first_sale.date() if first_sale else None)
+    end_day = parse_date(end_date_str) if end_date_str else (last_sale.date() if last_sale else None)
+    if start_day is None or end_day is None:  # Продаж нет - пересчитывать нечего
+        return {'chunks': 0, 'rows': 0}
+    if start_day > end_day:
+        raise ValueError("Дата начала периода не может быть позже даты окончания")  # Ошибка
+
+    chunks = rows_written = 0
+    chunk_start = start_day
+    while chunk_start <= end_day:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_day)
+        try:
+            rows_written += _rebuild_chunk(db, chunk_start, chunk_end)
+            commit(db)  # Каждый отрезок фиксируется отдельно
+        except Exception:
+            rollback(db)
+            raise
+        chunks += 1
+        chunk_start = chunk_end + timedelta(days=1)
+    return {'start_date': start_day.isoformat(), 'end_date': end_day.isoformat(),
+            'chunks': chunks, 'rows': rows_written}
+
+
+def _rebuild_chunk(db: Session, start_day: date, end_day: date) -> int:  # Пересчитать отрезок дней
+    in_range = SalesDailyRollup.date.between(start_day, end_day)
+    _mark_rollup_changed(db)  # Кэши сбросятся после COMMIT отрезка
+    db.execute(update(SalesDailyRollup).where(in_range).values(tickets_sold=0, revenue=0.0).execution_options(
+        synchronize_session=False))  # Обнуляем продажи, возвраты не трогаем
+
+    sale_day = func.date(Ticket.sold_date)
+    sales = db.query(sale_day, func.coalesce(Screening.film_id, 0), func.coalesce(Screening.hall_id, 0),
+                     func.count(Ticket.id), func.sum(Ticket.price)).select_from(Ticket).outerjoin(
+        Screening, Screening.id == Ticket.screening_id).filter(
+        Ticket.sold == True,
+        Ticket.sold_date >= datetime.combine(start_day, datetime.min.time()),
+        Ticket.sold_date <= datetime.combine(end_day, datetime.max.time())).group_by(
+        sale_day, Screening.film_id, Screening.hall_id).all()  # Диапазон по индексу (sold, sold_date)
+
+    rows = [_rollup_row(film_id, hall_id, date.fromisoformat(day), tickets_sold=tickets, revenue=revenue)
+            for day, film_id, hall_id, tickets, revenue in sales]
+    _add_to_rollup(db, rows)
+    db.execute(delete(SalesDailyRollup).where(
+        in_range, SalesDailyRollup.tickets_sold == 0, SalesDailyRollup.refunds == 0).execution_options(
+        synchronize_session=False))  # Пустые строки не храним
+    return len(rows)
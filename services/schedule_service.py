@@ -0,0 +1,299 @@
+from sqlalchemy.orm import Session  # Работа с сессией SQLAlchemy
+from sqlalchemy import func, insert  # Подсчёт и массовая вставка показов
+from bisect import bisect_left  # Бинарный поиск по отсортированным началам показов
+from datetime import datetime, timedelta  # Работа с датами
+from typing import List, Optional, Dict, Any  # Типизация
+import heapq
+import random
+import sys
+import os
+
+# Добавляем путь для импорта модулей
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import commit, rollback  # Фиксация с учётом единицы работы
+from models.cinema import Film, Hall, Screening  # ORM-модели
+from models.license import License
+from services.cinema_service import get_popular_films
+from utils.validators import validate_positive_int, validate_price
+from utils.helper import parse_date
+from config import CLEANING_GAP_MINUTES
+
+# ИНДЕКС ИНТЕРВАЛОВ ПОКАЗОВ
+
+class HallSchedule:
+    """Интервалы показов одного зала, отсортированные по началу.
+
+    Для каждой позиции хранится максимум окончаний всех предыдущих показов,
+    поэтому ответ "зал свободен" - один бинарный поиск, O(log n). При конфликте
+    сам показ ищется обратным проходом: без пересечений в старых данных это
+    соседний показ, в худшем случае O(n). Вставка - O(n) из-за list.insert и
+    пересчёта максимумов после позиции. Индекс держит показы одного зала от
+    текущего момента (за неделю - сотни интервалов), поэтому линейная вставка
+    дешевле дерева интервалов и не требует отдельной структуры.
+    """
+
+    def __init__(self, intervals: Optional[List[tuple]] = None):
+        self.starts = []  # Начала показов по возрастанию
+        self.ends = []  # Окончания в том же порядке
+        self.ids = []  # ID показов (None для ещё не сохранённых)
+        self.max_ends = []  # Максимум окончаний на префиксе
+        for start, end, screening_id in sorted(intervals or [], key=lambda item: item[0]):
+            self.starts.append(start)
+            self.ends.append(end)
+            self.ids.append(screening_id)
+        self._rebuild_max_ends(0)
+
+    def find_conflict(self, start: datetime, end: datetime, gap: timedelta = timedelta(0)) -> Optional[int]:
+        """Позиция показа, пересекающегося с [start, end) с учётом перерыва, или None"""
+        position = bisect_left(self.starts, end + gap)  # Показы, начинающиеся до конца нового с перерывом
+        if position == 0 or self.max_ends[position - 1] + gap <= start:
+            return None
+        for index in range(position - 1, -1, -1):  # Ищем сам пересекающийся показ
+            if self.ends[index] + gap > start:
+                return index
+        return None
+
+    def add(self, start: datetime, end: datetime, screening_id: Optional[int] = None) -> None:  # O(n): сдвиг списков
+        position = bisect_left(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.ids.insert(position, screening_id)
+        self.max_ends.insert(position, end)
+        self._rebuild_max_ends(position)
+
+    def _rebuild_max_ends(self, position: int) -> None:
+        self.max_ends[position:] = []
+        current = self.max_ends[-1] if self.max_ends else None
+        for end in self.ends[position:]:
+            current = end if current is None or end > current else current
+            self.max_ends.append(current)
+
+
+class ScheduleIndex:
+    """Индексы интервалов по залам, загружаемые из базы при первом обращении к залу"""
+
+    def __init__(self, db: Session, since: Optional[datetime] = None,
+                 cleaning_gap_minutes: int = CLEANING_GAP_MINUTES):
+        self.db = db
+        self.since = since or datetime.now()  # Показы, закончившиеся раньше, не могут конфликтовать
+        self.gap = timedelta(minutes=cleaning_gap_minutes)
+        self.halls: Dict[int, HallSchedule] = {}
+
+    def hall(self, hall_id: int) -> HallSchedule:
+        if hall_id not in self.halls:
+            rows = self.db.query(Screening.datetime, Screening.end_datetime, Screening.id).filter(
+                Screening.hall_id == hall_id,
+                Screening.end_datetime > self.since - self.gap).all()  # Один запрос на зал
+            self.halls[hall_id] = HallSchedule(rows)
+        return self.halls[hall_id]
+
+    def preload(self, hall_ids: List[int]) -> None:
+        """Загрузить несколько залов одним запросом"""
+        missing = [hall_id for hall_id in hall_ids if hall_id not in self.halls]
+        if not missing:
+            return
+        rows = self.db.query(Screening.hall_id, Screening.datetime, Screening.end_datetime, Screening.id).filter(
+            Screening.hall_id.in_(missing), Screening.end_datetime > self.since - self.gap).all()
+        intervals = {hall_id: [] for hall_id in missing}
+        for hall_id, start, end, screening_id in rows:
+            intervals[hall_id].append((start, end, screening_id))
+        for hall_id, hall_intervals in intervals.items():
+            self.halls[hall_id] = HallSchedule(hall_intervals)
+
+    def find_conflict(self, hall_id: int, start: datetime, end: datetime) -> Optional[Any]:
+        """ID пересекающегося показа (или 'new' для показа из этой же партии), None если зал свободен"""
+        schedule = self.hall(hall_id)
+        position = schedule.find_conflict(start, end, self.gap)
+        if position is None:
+            return None
+        return schedule.ids[position] or 'new'
+
+    def add(self, hall_id: int, start: datetime, end: datetime, screening_id: Optional[int] = None) -> None:
+        self.hall(hall_id).add(start, end, screening_id)
+
+# ПРОВЕРКА РАСПИСАНИЯ
+
+def validate_schedule(db: Session, slots: List[Dict[str, Any]],
+                      cleaning_gap_minutes: int = CLEANING_GAP_MINUTES) -> List[Dict[str, Any]]:  # Проверить пакет показов
+    """Проверить пакет показов за один проход.
+
+    Каждый слот - словарь с ключами film_id, hall_id и start (datetime). В
+    слот дописывается end по длительности фильма. Возвращает список конфликтов
+    {'slot': номер слота, 'reason': описание}; пустой список - расписание
+    можно сохранять.
+    """
+    conflicts = []
+    film_ids = {slot['film_id'] for slot in slots}
+    hall_ids = {slot['hall_id'] for slot in slots}
+    durations = dict(db.query(Film.id, Film.duration).filter(Film.id.in_(film_ids)).all())  # Длительности одним запросом
+    known_halls = {hall_id for hall_id, in db.query(Hall.id).filter(Hall.id.in_(hall_ids)).all()}
+
+    index = ScheduleIndex(db, cleaning_gap_minutes=cleaning_gap_minutes)
+    index.preload(list(known_halls))
+    now = datetime.now()
+    for number, slot in sorted(enumerate(slots), key=lambda item: item[1]['start']):
+        validate_positive_int(slot['film_id'], "ID фильма")
+        validate_positive_int(slot['hall_id'], "ID зала")
+        if slot['film_id'] not in durations:
+            conflicts.append({'slot': number, 'reason': f"Фильм с ID {slot['film_id']} не найден"})
+            continue
+        if slot['hall_id'] not in known_halls:
+            conflicts.append({'slot': number, 'reason': f"Зал с ID {slot['hall_id']} не найден"})
+            continue
+        if slot['start'] < now:
+            conflicts.append({'slot': number, 'reason': "Дата и время показа не могут быть в прошлом"})
+            continue
+
+        slot['end'] = slot['start'] + timedelta(minutes=durations[slot['film_id']] or 0)
+        conflict = index.find_conflict(slot['hall_id'], slot['start'], slot['end'])
+        if conflict is not None:
+            reason = "пересекается с другим показом пакета" if conflict == 'new' else f"пересекается с показом ID {conflict}"
+            conflicts.append({'slot': number, 'reason': f"Конфликт времени в зале: {reason}"})
+            continue
+        index.add(slot['hall_id'], slot['start'], slot['end'])  # Следующие слоты учитывают принятый
+    return sorted(conflicts, key=lambda conflict: conflict['slot'])
+
+# АВТОМАТИЧЕСКОЕ РАСПИСАНИЕ НА НЕДЕЛЮ
+
+# Шаг, к которому округляется время начала показа, в минутах
+START_STEP_MINUTES = 5
+
+
+def generate_weekly_schedule(db: Session, start_date_str: str, opening_time: str = "09:00",
+                             closing_time: str = "23:00", days: int = 7,
+                             hall_ids: Optional[List[int]] = None,
+                             targets: Optional[Dict[int, int]] = None,
+                             cleaning_gap_minutes: int = CLEANING_GAP_MINUTES,
+                             demand_days: int = 30, seed: int = 0) -> List[Dict[str, Any]]:  # Составить расписание
+    """Составить расписание без пересечений на days дней, начиная с start_date_str.
+
+    В расписание попадают фильмы, лицензия которых действует в день показа.
+    targets задаёт число показов фильма за период {film_id: показов}; без него
+    вес фильма берётся из продаж get_popular_films за demand_days дней. Залы
+    заполняются жадно: освободившемуся раньше всех залу достаётся фильм с
+    наибольшей ожидаемой заполняемостью с учётом уже поставленных показов.
+    Уже существующие показы не сдвигаются, показы в прошлом не ставятся: сегодня
+    расписание начинается с текущего времени, округлённого вверх до
+    START_STEP_MINUTES. При одинаковом seed результат повторяется. Возвращает слоты {film_id, hall_id, start, end, expected_score},
+    готовые для save_schedule.
+    """
+    validate_positive_int(days, "Количество дней")  # Проверка периода
+    first_day = parse_date(start_date_str)
+    opening = datetime.strptime(opening_time, "%H:%M").time()
+    closing = datetime.strptime(closing_time, "%H:%M").time()
+    if closing <= opening:
+        raise ValueError("Время закрытия должно быть позже времени открытия")  # Ошибка
+    if targets:
+        for film_id, count in targets.items():
+            validate_positive_int(film_id, "ID фильма")
+            validate_positive_int(count, "Количество показов")
+
+    halls_query = db.query(Hall.id, Hall.capacity)
+    if hall_ids:
+        halls_query = halls_query.filter(Hall.id.in_(hall_ids))
+    halls = halls_query.order_by(Hall.capacity.desc(), Hall.id).all()  # Большие залы выбирают фильм первыми
+    if not halls:
+        raise ValueError("Нет залов для составления расписания")  # Ошибка
+
+    last_day = first_day + timedelta(days=days - 1)
+    films_query = db.query(Film.id, Film.title, Film.duration, License.start_date, License.end_date).join(
+        License, Film.license_id == License.id).filter(
+        Film.duration > 0, License.start_date <= last_day, License.end_date >= first_day)  # Лицензия пересекает период
+    if targets:
+        films_query = films_query.filter(Film.id.in_(list(targets)))
+    films = films_query.order_by(Film.id).all()
+    if not films:
+        raise ValueError("Нет фильмов с действующей лицензией на этот период")  # Ошибка
+
+    weights = _film_weights(db, films, targets, demand_days)
+    max_capacity = max(capacity for _, capacity in halls) or 1
+    rng = random.Random(seed)
+    tiebreak = {film.id: rng.random() for film in films}  # Детерминированный порядок при равных весах
+    gap = timedelta(minutes=cleaning_gap_minutes)
+    step = timedelta(minutes=START_STEP_MINUTES)
+    earliest_start = _round_up(datetime.now(), step)  # Раньше текущего времени показ не начинается
+
+    index = ScheduleIndex(db, since=datetime.combine(first_day, opening), cleaning_gap_minutes=cleaning_gap_minutes)
+    index.preload([hall_id for hall_id, _ in halls])
+    shows = {film.id: 0 for film in films}  # Показов фильма за период
+    slots = []
+    for day_offset in range(days):
+        day = first_day + timedelta(days=day_offset)
+        day_close = datetime.combine(day, closing)
+        day_films = [film for film in films if film.start_date <= day <= film.end_date]
+        last_start = {}  # Последнее начало фильма за день, чтобы не ставить его в соседние залы одновременно
+        day_open = max(datetime.combine(day, opening), earliest_start)
+        queue = [(day_open, order, hall_id, capacity)
+                 for order, (hall_id, capacity) in enumerate(halls)]
+        heapq.heapify(queue)  # Залы по времени освобождения
+        while queue:
+            free_at, order, hall_id, capacity = heapq.heappop(queue)
+            best = None
+            for film in day_films:
+                if targets and shows[film.id] >= targets[film.id]:
+                    continue
+                end = free_at + timedelta(minutes=film.duration)
+                if end > day_close:
+                    continue
+                score = weights[film.id] / (1 + shows[film.id])  # Каждый следующий показ приносит меньше зрителей
+                score *= (capacity or max_capacity) / max_capacity
+                if film.id in last_start and free_at - last_start[film.id] < timedelta(hours=1):
+                    score /= 2  # Тот же фильм только что начался в другом зале
+                key = (score, tiebreak[film.id])
+                if best is None or key > best[0]:
+                    best = (key, film, end)
+            if best is None:
+                continue  # Ничего не помещается до закрытия, зал на сегодня заполнен
+
+            (score, _), film, end = best
+            schedule = index.hall(hall_id)
+            position = schedule.find_conflict(free_at, end, gap)
+            if position is not None:  # Зал занят существующим показом, продолжаем после него
+                heapq.heappush(queue, (_round_up(schedule.ends[position] + gap, step), order, hall_id, capacity))
+                continue
+            index.add(hall_id, free_at, end)
+            shows[film.id] += 1
+            last_start[film.id] = free_at
+            slots.append({'film_id': film.id, 'hall_id': hall_id, 'start': free_at, 'end': end,
+                          'expected_score': round(score, 4)})
+            heapq.heappush(queue, (_round_up(end + gap, step), order, hall_id, capacity))
+    return sorted(slots, key=lambda slot: (slot['start'], slot['hall_id']))
+
+
+def save_schedule(db: Session, slots: List[Dict[str, Any]], ticket_price: float) -> int:  # Сохранить расписание
+    """Проверить слоты и сохранить их одной массовой вставкой, вернуть число показов"""
+    validate_price(ticket_price, "Цена билета")  # Проверка цены
+    if not slots:
+        return 0
+    conflicts = validate_schedule(db, slots)
+    if conflicts:
+        raise ValueError(f"Расписание содержит конфликты: {conflicts[0]['reason']} (слот {conflicts[0]['slot']})")
+
+    hall_names = dict(db.query(Hall.id, Hall.name).filter(Hall.id.in_({slot['hall_id'] for slot in slots})).all())
+    price = round(float(ticket_price), 2)  # Цена округляется как в create_screening
+    rows = [{'film_id': slot['film_id'], 'datetime': slot['start'], 'end_datetime': slot['end'],
+             'hall': hall_names[slot['hall_id']], 'hall_id': slot['hall_id'], 'ticket_price': price}
+            for slot in slots]
+    try:
+        db.execute(insert(Screening), rows)  # Один executemany на всё расписание
+        commit(db)
+    except Exception:
+        rollback(db)
+        raise
+    return len(rows)
+
+
+def _film_weights(db: Session, films: List[Any], targets: Optional[Dict[int, int]],
+                  demand_days: int) -> Dict[int, float]:  # Вес фильма для расписания
+    if targets:
+        return {film.id: float(targets[film.id]) for film in films}
+    film_count = db.query(func.count(Film.id)).scalar()  # Рейтинг по всем фильмам, чтобы не потерять активные
+    sold_by_film = {row['film_id']: row['tickets_sold']
+                    for row in get_popular_films(db, limit=film_count, days=demand_days)}
+    return {film.id: 1.0 + sold_by_film.get(film.id, 0) for film in films}  # Новые фильмы тоже получают показы
+
+
+def _round_up(moment: datetime, step: timedelta) -> datetime:  # Округлить время вверх до шага
+    remainder = (moment - datetime.min) % step
+    return moment + (step - remainder) if remainder else moment
@@ -0,0 +1,238 @@
+from sqlalchemy.orm import Session  # Работа с сессией SQLAlchemy
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import update, delete  # Условное обновление и удаление
+from datetime import datetime  # Работа с датами
+from typing import List, Optional, Dict, Any  # Типизация
+import json
+import sys
+import os
+
+# Добавляем путь для импорта модулей
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import commit, rollback  # Фиксация с учётом единицы работы
+from models.cinema import Screening, Ticket, SeatMap  # ORM-модели
+from services.cinema_service import layout_seat_numbers, get_hall_layout
+from services.sales_rollup_service import record_ticket_sales, record_ticket_refunds
+from utils.validators import validate_positive_int, validate_price
+
+# Сколько раз повторять условное обновление карты при одновременной продаже
+MAX_UPDATE_RETRIES = 5
+
+# РАБОТА С КАРТОЙ МЕСТ
+
+def create_seat_map(db: Session, screening_id: int, layout: Optional[Dict[str, int]] = None,
+                    price_overrides: Optional[Dict[int, float]] = None) -> SeatMap:  # Создать карту мест показа
+    validate_positive_int(screening_id, "ID показа")  # Проверка ID показа
+    screening = db.query(Screening).filter(Screening.id == screening_id).first()  # Проверяем показ
+    if not screening:
+        raise ValueError(f"Показ с ID {screening_id} не найден")  # Ошибка
+    if db.query(SeatMap).filter(SeatMap.screening_id == screening_id).first():  # Проверка дубликата
+        raise ValueError(f"Карта мест для показа {screening_id} уже существует")  # Ошибка
+    if db.query(Ticket.id).filter(Ticket.screening_id == screening_id).first():  # Показ уже продаётся по билетам
+        raise ValueError(f"У показа {screening_id} уже есть билеты на места, "
+                         f"используйте migrate_screening_to_seat_map")  # Ошибка
+
+    layout = layout or _hall_layout(screening)  # По умолчанию схема зала показа
+    seat_count = len(layout_seat_numbers(layout))  # Проверяем схему и считаем места
+    overrides = _validate_overrides(price_overrides or {}, seat_count)
+    seat_map = SeatMap(screening_id=screening_id, layout=json.dumps(layout, ensure_ascii=False),
+                       seat_count=seat_count, occupancy=bytes((seat_count + 7) // 8),
+                       price_overrides=json.dumps(overrides) if overrides else None, version=0)  # Все места свободны
+
+    db.add(seat_map)
+    commit(db)
+    return seat_map
+
+
+def get_seat_map(db: Session, screening_id: int) -> Optional[SeatMap]:  # Получить карту мест показа
+    validate_positive_int(screening_id, "ID показа")  # Проверка ID
+    return db.query(SeatMap).filter(SeatMap.screening_id == screening_id).first()
+
+
+def get_seat_numbers(seat_map: SeatMap) -> List[str]:  # Номера мест по индексам карты
+    return layout_seat_numbers(json.loads(seat_map.layout))
+
+
+def is_seat_sold(seat_map: SeatMap, seat_index: int) -> bool:  # Проверить место за O(1)
+    _validate_index(seat_index, seat_map.seat_count)
+    return bool(seat_map.occupancy[seat_index // 8] & (1 << (seat_index % 8)))
+
+
+def get_available_seat_indexes(seat_map: SeatMap) -> List[int]:  # Индексы свободных мест
+    return [index for index in range(seat_map.seat_count)
+            if not seat_map.occupancy[index // 8] & (1 << (index % 8))]
+
+
+def get_seat_price(seat_map: SeatMap, seat_index: int, base_price: float) -> float:  # Цена места с учётом переопределений
+    overrides = json.loads(seat_map.price_overrides) if seat_map.price_overrides else {}
+    return overrides.get(str(seat_index), base_price)
+
+
+def get_seat_map_occupancy(seat_map: SeatMap) -> Dict[str, Any]:  # Заполняемость по карте мест
+    seats_sold = bin(int.from_bytes(seat_map.occupancy, "little")).count("1")  # Подсчёт единичных битов
+    return {
+        'screening_id': seat_map.screening_id,
+        'total_seats': seat_map.seat_count,
+        'seats_sold': seats_sold,
+        'seats_available': seat_map.seat_count - seats_sold,
+        'occupancy_rate': round(seats_sold / seat_map.seat_count * 100, 2) if seat_map.seat_count else 0
+    }
+
+
+def _validate_seat_indexes(seat_indexes: List[int]) -> None:  # Непустой список мест без повторов
+    if not seat_indexes or len(set(seat_indexes)) != len(seat_indexes):
+        raise ValueError("Места для продажи должны быть указаны без повторов")  # Ошибка
+
+
+def sell_seats(db: Session, screening_id: int, seat_indexes: List[int],
+               order_id: Optional[int] = None) -> List[Ticket]:  # Продать места по карте
+    """Занять места в карте условным обновлением по версии и создать билеты только для проданных мест"""
+    validate_positive_int(screening_id, "ID показа")  # Проверка ID показа
+    if order_id is not None:
+        validate_positive_int(order_id, "ID заказа")  # Проверка ID заказа
+    _validate_seat_indexes(seat_indexes)  # Проверка списка мест
+
+    screening = db.query(Screening).filter(Screening.id == screening_id).first()  # Проверка показа
+    if not screening:
+        raise ValueError(f"Показ с ID {screening_id} не найден")  # Ошибка
+    if screening.datetime < datetime.now():  # Если показ прошёл
+        raise ValueError("Невозможно продать билет на прошедший показ")  # Ошибка
+    if db.query(Ticket.id).filter(Ticket.screening_id == screening_id, Ticket.sold == False).first():
+        raise ValueError(f"У показа {screening_id} есть непроданные билеты на места: "
+                         f"продажа идёт по билетам, а не по карте")  # Ошибка: два способа продажи одного места
+
+    for _ in range(MAX_UPDATE_RETRIES):
+        seat_map = _load_seat_map(db, screening_id)
+        for index in seat_indexes:
+            if is_seat_sold(seat_map, index):
+                raise ValueError(f"Место с индексом {index} уже продано")  # Ошибка
+        if _swap_occupancy(db, seat_map, seat_indexes, sold=True):
+            break
+    else:
+        raise ValueError("Не удалось занять места: карта мест изменяется другими кассами")  # Ошибка
+
+    seat_numbers = get_seat_numbers(seat_map)
+    sold_at = datetime.now()
+    tickets = [Ticket(screening_id=screening_id, order_id=order_id, seat_number=seat_numbers[index],
+                      price=get_seat_price(seat_map, index, screening.ticket_price), sold=True, sold_date=sold_at)
+               for index in seat_indexes]  # Билеты только для проданных мест
+    db.add_all(tickets)
+    record_ticket_sales(db, screening, sold_at, len(tickets), sum(ticket.price for ticket in tickets))  # Итоги дня
+    commit(db)
+    return tickets
+
+
+def cancel_seats(db: Session, screening_id: int, seat_indexes: List[int]) -> int:  # Отменить продажу мест по карте
+    validate_positive_int(screening_id, "ID показа")  # Проверка ID показа
+    _validate_seat_indexes(seat_indexes)  # Проверка списка мест
+    screening = db.query(Screening).filter(Screening.id == screening_id).first()  # Проверка показа
+    if screening and screening.datetime < datetime.now():  # Если показ прошёл
+        raise ValueError("Невозможно отменить продажу билета на прошедший показ")  # Ошибка
+
+    for _ in range(MAX_UPDATE_RETRIES):
+        seat_map = _load_seat_map(db, screening_id)
+        for index in seat_indexes:
+            if not is_seat_sold(seat_map, index):
+                raise ValueError(f"Место с индексом {index} не продано, отмена невозможна")  # Ошибка
+        if _swap_occupancy(db, seat_map, seat_indexes, sold=False):
+            break
+    else:
+        raise ValueError("Не удалось освободить места: карта мест изменяется другими кассами")  # Ошибка
+
+    seat_numbers = get_seat_numbers(seat_map)
+    seat_filter = (Ticket.screening_id == screening_id,
+                   Ticket.seat_number.in_([seat_numbers[index] for index in seat_indexes]))
+    refunds = {}  # Возвраты по дню продажи: [билетов, сумма]
+    for sold_date, price in db.query(Ticket.sold_date, Ticket.price).filter(*seat_filter, Ticket.sold == True).all():
+        day_refunds = refunds.setdefault(sold_date.date() if sold_date else None, [0, 0.0])
+        day_refunds[0] += 1
+        day_refunds[1] += price
+    for sold_day, (tickets, amount) in refunds.items():
+        sold_at = datetime.combine(sold_day, datetime.min.time()) if sold_day else None
+        record_ticket_refunds(db, screening, sold_at, tickets, amount)  # Итоги дня в той же транзакции
+    db.execute(delete(Ticket).where(*seat_filter))  # Удаляем билеты
+    commit(db)
+    return len(seat_indexes)
+
+# ПЕРЕХОД С БИЛЕТА НА КАЖДОЕ МЕСТО НА КАРТУ МЕСТ
+
+def migrate_screening_to_seat_map(db: Session, screening_id: int,
+                                  layout: Optional[Dict[str, int]] = None) -> SeatMap:  # Перенести показ на карту мест
+    """Построить карту мест по существующим билетам показа и удалить строки непроданных мест"""
+    validate_positive_int(screening_id, "ID показа")  # Проверка ID показа
+    screening = db.query(Screening).filter(Screening.id == screening_id).first()  # Проверяем показ
+    if not screening:
+        raise ValueError(f"Показ с ID {screening_id} не найден")  # Ошибка
+    if db.query(SeatMap).filter(SeatMap.screening_id == screening_id).first():  # Уже перенесён
+        raise ValueError(f"Карта мест для показа {screening_id} уже существует")  # Ошибка
+
+    layout = layout or _hall_layout(screening)  # По умолчанию схема зала показа
+    seat_numbers = layout_seat_numbers(layout)
+    index_by_number = {seat_number: index for index, seat_number in enumerate(seat_numbers)}
+    occupancy = bytearray((len(seat_numbers) + 7) // 8)
+    overrides = {}
+    tickets = db.query(Ticket.seat_number, Ticket.sold, Ticket.price).filter(Ticket.screening_id == screening_id).all()
+    for seat_number, sold, price in tickets:
+        if seat_number not in index_by_number:
+            raise ValueError(f"Место {seat_number} отсутствует в схеме зала")  # Ошибка
+        index = index_by_number[seat_number]
+        if sold:
+            occupancy[index // 8] |= 1 << (index % 8)
+        if price != screening.ticket_price:
+            overrides[str(index)] = price
+
+    try:
+        db.add(SeatMap(screening_id=screening_id, layout=json.dumps(layout, ensure_ascii=False),
+                       seat_count=len(seat_numbers), occupancy=bytes(occupancy),
+                       price_overrides=json.dumps(overrides) if overrides else None, version=0))
+        db.execute(delete(Ticket).where(Ticket.screening_id == screening_id, Ticket.sold == False))  # Непроданные места больше не храним
+        commit(db)
+    except Exception:
+        rollback(db)
+        raise
+    return get_seat_map(db, screening_id)
+
+
+def _hall_layout(screening: Screening) -> Dict[str, int]:  # Схема зала показа
+    if not screening.cinema_hall:
+        raise ValueError(f"Для показа {screening.id} не указан зал, передайте схему мест явно")  # Ошибка
+    return get_hall_layout(screening.cinema_hall)
+
+
+def _load_seat_map(db: Session, screening_id: int) -> SeatMap:  # Свежая карта мест из базы
+    seat_map = db.query(SeatMap).filter(SeatMap.screening_id == screening_id).populate_existing().first()
+    if not seat_map:
+        raise ValueError(f"Карта мест для показа {screening_id} не найдена")  # Ошибка
+    return seat_map
+
+
+def _swap_occupancy(db: Session, seat_map: SeatMap, seat_indexes: List[int], sold: bool) -> bool:  # Условная запись карты
+    occupancy = bytearray(seat_map.occupancy)
+    for index in seat_indexes:
+        if sold:
+            occupancy[index // 8] |= 1 << (index % 8)
+        else:
+            occupancy[index // 8] &= ~(1 << (index % 8)) & 0xFF
+    result = db.execute(update(SeatMap).where(SeatMap.screening_id == seat_map.screening_id,
+                                              SeatMap.version == seat_map.version).values(
+        occupancy=bytes(occupancy), version=seat_map.version + 1).execution_options(synchronize_session=False))
+    if result.rowcount != 1:  # Карту успела изменить другая касса: UPDATE ничего не записал, откат не нужен
+        return False  # Повтор перечитает карту (populate_existing), прежние изменения транзакции сохраняются
+    set_committed_value(seat_map, 'occupancy', bytes(occupancy))  # Обновляем объект без повторной записи
+    set_committed_value(seat_map, 'version', seat_map.version + 1)
+    return True
+
+
+def _validate_index(seat_index: int, seat_count: int) -> None:  # Проверка индекса места
+    if not isinstance(seat_index, int) or not 0 <= seat_index < seat_count:
+        raise ValueError(f"Индекс места должен быть от 0 до {seat_count - 1}, получено: {seat_index}")
+
+
+def _validate_overrides(price_overrides: Dict[int, float], seat_count: int) -> Dict[str, float]:  # Проверка цен мест
+    overrides = {}
+    for index, price in price_overrides.items():
+        _validate_index(index, seat_count)
+        validate_price(price, "Цена места")
+        overrides[str(index)] = round(float(price), 2)
+    return overrides
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session  # Импортируем Session — объект для работы с базой данных
 from sqlalchemy import func, and_, or_  # Импортируем функции: func (агрегация), and_, or_ (логические операторы для фильтров)
-from typing import List, Optional, Dict, Any  # Импортируем типы данных для аннотаций
+from typing import List, Optional, Dict, Any, Tuple  # Импортируем типы данных для аннотаций
 from datetime import date
 import sys
 import os
@@ -8,8 +8,11 @@ import os
 # Добавляем путь для импорта модулей
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from database import commit  # Фиксация с учётом единицы работы
 from models.supplier import Supplier, SupplyType, supplier_supply_type  # Импортируем ORM-модели: поставщик, тип поставки и таблицу связей
 from utils.validators import validate_positive_int, validate_string
+from models.read_models import SupplierRow, columns_of, project  # Строки для чтения
+from utils.pagination import Page, keyset_page, DEFAULT_PAGE_SIZE
 
 
 ###################################
@@ -28,30 +31,30 @@ def create_supplier(db: Session, name: str, contact_info: str = "",
         details=details.strip() if details else None  # Дополнительные реквизиты
     )
 
+    for type_id in supply_type_ids or []:  # Проверяем типы поставок до записи поставщика
+        validate_positive_int(type_id, "ID типа поставки")  # Проверяем ID
+        supply_type = db.query(SupplyType).filter(SupplyType.id == type_id).first()  # Ищем тип поставки
+        if not supply_type:  # Если тип не найден
+            raise ValueError(f"Тип поставки с ID {type_id} не найден")  # Ошибка
+
     db.add(new_supplier)
-    db.commit()
-    db.refresh(new_supplier)
+    db.flush()  # ID поставщика для связей; поставщик и связи фиксируются вместе
 
     if supply_type_ids:  # Если указаны типы поставок
-        for type_id in supply_type_ids:  # Перебираем список ID
-            validate_positive_int(type_id, "ID типа поставки")  # Проверяем ID
-            supply_type = db.query(SupplyType).filter(SupplyType.id == type_id).first()  # Ищем тип поставки
-            if not supply_type:  # Если тип не найден
-                raise ValueError(f"Тип поставки с ID {type_id} не найден")  # Ошибка
-
         for type_id in supply_type_ids:
             db.execute(supplier_supply_type.insert().values(
                 supplier_id=new_supplier.id,
                 supply_type_id=type_id
             ))
-        db.commit()
 
-    db.refresh(new_supplier)  # Обновляем объект с новыми связями
+    commit(db)
     return new_supplier  # Возвращаем созданного поставщика
 
 def get_all_suppliers(db: Session, name_filter: Optional[str] = None,
-                      supply_type_id: Optional[int] = None) -> List[Supplier]:  # Получить список всех поставщиков
-    query = db.query(Supplier)  # Базовый запрос ко всем поставщикам
+                      supply_type_id: Optional[int] = None, cursor: Optional[Tuple] = None,
+                      limit: Optional[int] = None, with_total: bool = False) -> Page:  # Получить список всех поставщиков
+    """Поставщики по имени и ID; без limit - все поставщики одной страницей"""
+    query = db.query(*columns_of(SupplierRow, Supplier))  # Базовый запрос: только столбцы списка
 
     if name_filter:  # Если указан фильтр по имени
         validate_string(name_filter, "Фильтр по имени")  # Проверяем строку
@@ -59,11 +62,18 @@ def get_all_suppliers(db: Session, name_filter: Optional[str] = None,
 
     if supply_type_id is not None:  # Если указан фильтр по типу поставки
         validate_positive_int(supply_type_id, "ID типа поставки")  # Проверяем ID
-        query = query.join(supplier_supply_type).filter(  # Присоединяем таблицу связей
+        query = query.join(supplier_supply_type, supplier_supply_type.c.supplier_id == Supplier.id).filter(  # Присоединяем таблицу связей
             supplier_supply_type.c.supply_type_id == supply_type_id  # Фильтруем по типу поставки
         )
 
-    return query.order_by(Supplier.name).all()  # Сортируем по имени и возвращаем список
+    return project(keyset_page(query, [Supplier.name, Supplier.id], cursor, limit,
+                               key=lambda supplier: (supplier.name, supplier.id), with_total=with_total),
+                   SupplierRow)  # Сортируем по имени
+
+
+def get_suppliers_page(db: Session, cursor: Optional[Tuple] = None,
+                       limit: int = DEFAULT_PAGE_SIZE) -> Page:  # Страница списка поставщиков по имени
+    return get_all_suppliers(db, cursor=cursor, limit=limit)
 
 
 def get_supplier_by_id(db: Session, supplier_id: int) -> Optional[Supplier]:  # Получить поставщика по ID
@@ -96,8 +106,7 @@ def update_supplier(db: Session, supplier_id: int, name: Optional[str] = None,
         supplier.details = details.strip() if details else None  # Обновляем
 
     db.add(supplier)
-    db.commit()
-    db.refresh(supplier)  # Обновляем объект
+    commit(db)
     return supplier  # Возвращаем обновлённого поставщика
 
 def add_supply_type_to_supplier(db: Session, supplier_id: int,
@@ -131,7 +140,7 @@ def add_supply_type_to_supplier(db: Session, supplier_id: int,
             supply_type_id=supply_type_id
         )
     )
-    db.commit()
+    commit(db)
 
     return True  # Возвращаем True (успешно добавили)
 
@@ -161,7 +170,7 @@ def remove_supply_type_from_supplier(db: Session, supplier_id: int,
             )
         )
     )
-    db.commit()
+    commit(db)
 
     return True  # Возвращаем True (успешно удалили)
 
@@ -195,7 +204,7 @@ def delete_supplier(db: Session, supplier_id: int) -> bool:  # Удалить п
         )
     )
     db.delete(supplier)
-    db.commit()
+    commit(db)
 
     return True  # Возвращаем True (успешно удалили)
 
@@ -215,8 +224,7 @@ def create_supply_type(db: Session, name: str, description: str = "") -> SupplyT
     )
 
     db.add(new_type)
-    db.commit()
-    db.refresh(new_type)  # Обновляем объект (чтобы получить ID)
+    commit(db)
     return new_type  # Возвращаем созданный тип
 
 
@@ -251,8 +259,7 @@ def update_supply_type(db: Session, type_id: int, name: Optional[str] = None,
         supply_type.description = description.strip() if description else None  # Обновляем описание
 
     db.add(supply_type)
-    db.commit()
-    db.refresh(supply_type)  # Обновляем объект
+    commit(db)
     return supply_type  # Возвращаем обновлённый тип
 
 
@@ -273,7 +280,7 @@ def delete_supply_type(db: Session, type_id: int) -> bool:  # Удалить т
         raise ValueError(f"Невозможно удалить тип поставки: есть {len(supplier_count)} связанных поставщиков")  # Ошибка
 
     db.delete(supply_type)
-    db.commit()
+    commit(db)
     return True  # Возвращаем True (успешно удалили)
 
 # АНАЛИТИКА ПОСТАВЩИКОВ
@@ -290,13 +297,13 @@ def get_supplier_stats(db: Session, supplier_id: int) -> Dict[str, Any]:  # По
     from models.procurement import OrderSupliers  # Заказы поставщикам
     from models.analytics import SupplierKPI  # KPI поставщика
 
-    contracts = db.query(Contract).filter(Contract.supplier_id == supplier_id).all()  # Все контракты
+    contracts = db.query(Contract.end_date).filter(Contract.supplier_id == supplier_id).all()  # Сроки всех контрактов
     active_contracts = [c for c in contracts if c.end_date >= date.today()]  # Активные контракты
 
-    licenses = db.query(License).filter(License.supplier_id == supplier_id).all()  # Все лицензии
+    licenses = db.query(License.end_date).filter(License.supplier_id == supplier_id).all()  # Сроки всех лицензий
     active_licenses = [l for l in licenses if l.end_date >= date.today()]  # Активные лицензии
 
-    orders = db.query(OrderSupliers).filter(OrderSupliers.supplier_id == supplier_id).all()  # Все заказы
+    orders = db.query(OrderSupliers.status).filter(OrderSupliers.supplier_id == supplier_id).all()  # Статусы всех заказов
     delivered_orders = [o for o in orders if o.status == "доставлен"]  # Доставленные заказы
 
     kpi = db.query(SupplierKPI).filter(SupplierKPI.supplier_id == supplier_id).order_by(
@@ -0,0 +1,51 @@
+# ОБЩИЕ ФИКСТУРЫ ТЕСТОВ: ОТДЕЛЬНАЯ БАЗА SQLITE НА КАЖДЫЙ ТЕСТ
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+import sys
+import os
+
+import pytest
+from sqlalchemy.orm import Session
+
+# Добавляем путь для импорта модулей
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import create_db_engine, init_db, load_models
+from utils.query_profiler import service_query_budget  # Фикстура бюджета запросов
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Новая база с актуальной схемой (create_all и все миграции)"""
+    load_models()
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    init_db(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine, expire_on_commit=False) as session:  # Как SessionLocal программы
+        yield session
+
+
+@pytest.fixture
+def cinema(db):
+    """Поставщик, контракт, лицензия, фильм на 90 минут, зал 3x4 и показ завтра в 19:00"""
+    from services.supplier_service import create_supplier
+    from services.license_service import create_contract, create_license
+    from services.cinema_service import create_film, create_hall, create_screening
+
+    today = date.today()
+    supplier = create_supplier(db, "ООО «Тестовый прокат»")
+    contract = create_contract(db, supplier.id, "Договор проката", (today - timedelta(days=30)).isoformat(),
+                               (today + timedelta(days=365)).isoformat())
+    license_obj = create_license(db, supplier.id, contract.id, "Тестовый фильм", "KEY-1",
+                                 (today - timedelta(days=30)).isoformat(), (today + timedelta(days=300)).isoformat())
+    film = create_film(db, license_obj.id, "Тестовый фильм", 90)
+    hall = create_hall(db, "Зал 1", 3, 4)
+    start = datetime.combine(today + timedelta(days=1), datetime.min.time()) + timedelta(hours=19)
+    screening = create_screening(db, film.id, start.strftime("%Y-%m-%d %H:%M"), hall.name, 300.0)
+    return SimpleNamespace(supplier=supplier, contract=contract, license=license_obj, film=film, hall=hall,
+                           screening=screening, start=start)
@@ -0,0 +1,43 @@
+# УВЕДОМЛЕНИЯ ОБ ОКОНЧАНИИ СРОКОВ: ОБЩЕЕ СОСТОЯНИЕ В БАЗЕ, ИЗМЕНЕНИЯ У КАЖДОГО КЛИЕНТА СВОИ
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from services import expiry_service
+from services.license_service import create_contract
+
+
+def test_thresholds_keep_separate_state(db, cinema):
+    today = date.today()
+    soon = create_contract(db, cinema.supplier.id, "Истекает через неделю", (today - timedelta(days=30)).isoformat(),
+                           (today + timedelta(days=5)).isoformat())
+    key = ('contract', soon.id)
+
+    assert key in [(item['kind'], item['object_id']) for item in expiry_service.scan_expiring(db, 7)['new']]
+    month = expiry_service.scan_expiring(db, 30)
+    assert key in [(item['kind'], item['object_id']) for item in month['new']]  # Свой порог - своё состояние
+    week = expiry_service.scan_expiring(db, 7)
+    assert (week['new'], week['changed'], week['removed']) == ([], [], [])  # Сканирование с 30 днями не мешает
+    assert [item['object_id'] for item in expiry_service.get_expiry_notifications(db, 7)] == [soon.id]
+
+
+def test_center_sees_items_found_by_another_scan(engine, db, cinema, monkeypatch):
+    pytest.importorskip("PyQt6")
+    from ui import notification_center
+
+    monkeypatch.setattr(notification_center, "SessionLocal", sessionmaker(bind=engine, expire_on_commit=False))
+    worker = notification_center.ExpiryScanWorker(days_threshold=30)
+    results = []
+    worker.finished.connect(results.append)
+    worker.scan(True)  # Первое сканирование центра
+    assert results[-1]['new'] == []
+
+    today = date.today()
+    contract = create_contract(db, cinema.supplier.id, "Истекающий договор", (today - timedelta(days=30)).isoformat(),
+                               (today + timedelta(days=10)).isoformat())
+    assert expiry_service.scan_expiring(db, 30)['new']  # Сканирование другого клиента (например, rpm_cli)
+
+    worker.scan(False)
+    assert [item['object_id'] for item in results[-1]['new']] == [contract.id]  # Центр всё равно получает новое
+    assert results[-1]['snapshot'] is None
@@ -0,0 +1,53 @@
+# КЭШ РЕЙТИНГА ФИЛЬМОВ: СБРОС ПОСЛЕ ФИКСАЦИИ ПРОДАЖ И ДЛИНА ОКНА
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import update
+
+from models.cinema import SalesDailyRollup, SalesRollupVersion
+from services import cinema_service, sales_rollup_service
+from services.leaderboard_service import PopularityLeaderboard, leaderboard
+
+
+def test_generation_changes_only_after_commit(db, cinema):
+    generation = sales_rollup_service.rollup_generation()
+    sales_rollup_service.record_ticket_sales(db, cinema.screening, datetime.now(), 2, 600.0)
+    assert sales_rollup_service.rollup_generation() == generation  # До COMMIT кэш не сбрасывается
+    db.rollback()
+    assert sales_rollup_service.rollup_generation() == generation  # Откаченная продажа тоже
+
+    sales_rollup_service.record_ticket_sales(db, cinema.screening, datetime.now(), 2, 600.0)
+    db.commit()
+    assert sales_rollup_service.rollup_generation() == generation + 1
+
+
+def test_window_covers_days_including_today(db, cinema):
+    today = date.today()
+    for days_ago in (0, 6, 7):
+        sold_at = datetime.combine(today - timedelta(days=days_ago), datetime.min.time())
+        sales_rollup_service.record_ticket_sales(db, cinema.screening, sold_at, 1, 300.0)
+    db.commit()
+
+    week = leaderboard.top(db, days=7, today=today)
+    assert week[0]['tickets_sold'] == 2  # Сегодня и 6 дней назад; 7 дней назад - уже восьмой день
+    assert cinema_service.get_popular_films(db, days=1)[0]['tickets_sold'] == 1
+
+
+def test_sale_from_another_process_invalidates_cache(engine, db, cinema):
+    board = PopularityLeaderboard()
+    sales_rollup_service.record_ticket_sales(db, cinema.screening, datetime.now(), 1, 300.0)
+    db.commit()
+    assert board.top(db, days=7)[0]['tickets_sold'] == 1
+
+    with engine.connect() as conn:  # Другая касса: прямая запись в базу, этот процесс о ней не знает
+        conn.execute(update(SalesDailyRollup).values(tickets_sold=SalesDailyRollup.tickets_sold + 2))
+        conn.execute(update(SalesRollupVersion).values(version=SalesRollupVersion.version + 1))
+        conn.commit()
+    assert board.top(db, days=7)[0]['tickets_sold'] == 3
+
+
+def test_uncommitted_sales_are_not_cached(db, cinema):
+    board = PopularityLeaderboard()
+    sales_rollup_service.record_ticket_sales(db, cinema.screening, datetime.now(), 1, 300.0)
+    assert board.top(db, days=7)[0]['tickets_sold'] == 1  # Своя незафиксированная продажа видна
+    db.rollback()
+    assert board.top(db, days=7) == []
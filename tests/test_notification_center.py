@@ -0,0 +1,61 @@
+# СКАНИРОВАНИЕ СРОКОВ НЕ БЛОКИРУЕТ ЦИКЛ СОБЫТИЙ QT
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("PyQt6")
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from services import expiry_service
+from ui import notification_center
+
+SCAN_SECONDS = 0.6  # Сколько длится медленное сканирование в тесте
+TICK_MS = 10  # Интервал таймера потока интерфейса
+MAX_GAP_MS = 250  # Наибольшая допустимая пауза между срабатываниями таймера
+
+
+def test_scan_does_not_block_event_loop(engine, cinema, monkeypatch):
+    app = QCoreApplication.instance() or QCoreApplication([])  # Приложение Qt живёт до конца теста
+    monkeypatch.setattr(notification_center, "SessionLocal", sessionmaker(bind=engine, expire_on_commit=False))
+    scan = {}
+    real_scan = expiry_service.scan_expiring
+
+    def slow_scan(db, days_threshold=30):  # Сканирование на большой базе: запросы не отпускают поток
+        scan['thread'] = threading.get_ident()
+        scan['started'] = time.perf_counter()
+        changes = real_scan(db, days_threshold)
+        time.sleep(SCAN_SECONDS)
+        scan['finished'] = time.perf_counter()
+        return changes
+
+    monkeypatch.setattr(expiry_service, "scan_expiring", slow_scan)
+
+    ticks = []
+    timer = QTimer()
+    timer.setInterval(TICK_MS)
+    timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    loop = QEventLoop()
+    results = []
+    center = notification_center.NotificationCenter(interval_seconds=3600, days_threshold=365)
+    center.changed.connect(results.append)
+    center.changed.connect(loop.quit)
+    center.failed.connect(lambda message: (results.append(message), loop.quit()))
+    QTimer.singleShot(10 * 1000, loop.quit)  # Защита от зависания теста
+    try:
+        timer.start()
+        center.start()
+        loop.exec()
+    finally:
+        timer.stop()
+        center.stop()
+
+    assert results and isinstance(results[0], dict), results  # Сканирование завершилось без ошибки
+    assert results[0]['new']  # Контракт и лицензия из фикстуры попали в уведомления
+    assert scan['thread'] != threading.get_ident()  # Сканирование шло не в потоке интерфейса
+    during_scan = [tick for tick in ticks if scan['started'] <= tick <= scan['finished']]
+    assert len(during_scan) >= SCAN_SECONDS * 1000 / MAX_GAP_MS  # Таймер срабатывал, пока шло сканирование
+    gaps = [(later - earlier) * 1000 for earlier, later in zip(ticks, ticks[1:])
+            if later >= scan['started'] and earlier <= scan['finished']]
+    assert max(gaps) < MAX_GAP_MS, f"Пауза цикла событий {max(gaps):.0f} мс во время сканирования"
@@ -0,0 +1,55 @@
+# БЮДЖЕТ ЗАПРОСОВ СЕРВИСОВ: ОТЧЁТЫ НЕ ВОЗВРАЩАЮТСЯ К ЗАПРОСУ НА КАЖДУЮ СТРОКУ (N+1)
+from datetime import date, timedelta
+
+import pytest
+
+from services import cinema_service, expiry_service, license_service
+from services.supplier_service import create_supplier
+
+ROWS = 4  # Фильмов, контрактов и показов в наборе: больше одной строки на каждый отчёт
+
+
+@pytest.fixture
+def many(db, cinema):
+    """ROWS фильмов со своими лицензиями, истекающими контрактами, показами завтра и продажами сегодня"""
+    today = date.today()
+    screenings = [cinema.screening]
+    for number in range(1, ROWS):
+        supplier = create_supplier(db, f"ООО «Прокат {number}»")
+        contract = license_service.create_contract(db, supplier.id, f"Договор {number}",
+                                                   (today - timedelta(days=30)).isoformat(),
+                                                   (today + timedelta(days=10 + number)).isoformat())
+        license_obj = license_service.create_license(db, supplier.id, contract.id, f"Фильм {number}", f"KEY-{number + 1}",
+                                                     (today - timedelta(days=30)).isoformat(),
+                                                     (today + timedelta(days=5 + number)).isoformat())
+        film = cinema_service.create_film(db, license_obj.id, f"Фильм {number}", 90)
+        start = cinema.start - timedelta(hours=2 * number + 1)  # Тот же зал, без пересечений
+        screenings.append(cinema_service.create_screening(db, film.id, start.strftime("%Y-%m-%d %H:%M"),
+                                                          cinema.hall.name, 300.0 + number))
+    for screening in screenings:
+        cinema_service.generate_seat_inventory(db, screening.id)
+        cinema_service.sell_tickets(db, screening.id, ["1-1", "1-2"], client_name="Иван Петров", phone="+79990000000")
+    return screenings
+
+
+@pytest.mark.parametrize("function, call, budget", [
+    (cinema_service.get_daily_revenue, lambda db, s: cinema_service.get_daily_revenue(db, date.today().isoformat()), 1),
+    (cinema_service.get_attendance_for_date,
+     lambda db, s: cinema_service.get_attendance_for_date(db, s[0].datetime.date().isoformat()), 1),
+    (cinema_service.list_screenings, lambda db, s: cinema_service.list_screenings(db), 1),
+    (license_service.get_all_contract_summaries, lambda db, s: license_service.get_all_contract_summaries(db), 1),
+    (license_service.get_all_supplier_contract_summaries,
+     lambda db, s: license_service.get_all_supplier_contract_summaries(db), 1),
+])
+def test_report_budget(db, many, service_query_budget, function, call, budget):
+    with service_query_budget(budget, function):
+        result = call(db, many)
+    rows = result['revenue_by_film'] if isinstance(result, dict) else getattr(result, 'items', result)
+    assert len(rows) >= ROWS  # Отчёт действительно прошёл по нескольким строкам
+
+
+def test_expiry_scan_budget(db, many, service_query_budget):
+    expiry_service.scan_expiring(db, 30)  # Первое сканирование записывает уведомления
+    with service_query_budget(3, expiry_service.scan_expiring):  # Контракты, лицензии, сохранённое состояние
+        changes = expiry_service.scan_expiring(db, 30)
+    assert changes['new'] == [] and len(expiry_service.get_expiry_notifications(db, 30)) >= 2 * (ROWS - 1)
@@ -0,0 +1,70 @@
+# ЗАПРОСЫ ОСНОВНЫХ СЕРВИСОВ ИДУТ ПО ИНДЕКСАМ, А НЕ ПОЛНЫМ ЧТЕНИЕМ ТАБЛИЦ
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from migrations import find_full_scans
+from services import (analytics_service, cinema_service, expiry_service, license_service, procumenet_service,
+                      seat_map_service)
+from services.leaderboard_service import PopularityLeaderboard
+
+# Таблицы, которые сервис читает целиком намеренно: таблица -> причина
+EXPECTED_SCANS = {}  # Пока таких нет: состояние уведомлений читается по индексу порога
+
+
+@pytest.fixture
+def captured_statements(engine):
+    """Запросы, которые движок выполнил во время теста: (SQL, параметры)"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+def test_service_queries_use_indexes(db, cinema, captured_statements):
+    today = date.today()
+    screening_id = cinema.screening.id
+    show_day = cinema.start.date().isoformat()
+    seat_map_screening = cinema_service.create_screening(
+        db, cinema.film.id, (cinema.start + timedelta(hours=3)).strftime("%Y-%m-%d %H:%M"), cinema.hall.name, 300.0)
+    captured_statements.clear()  # Проверяем только запросы сценариев ниже
+
+    cinema_service.generate_seat_inventory(db, screening_id)
+    cinema_service.get_available_seats(db, screening_id)
+    cinema_service.sell_tickets(db, screening_id, ["1-1"], client_name="Иван Петров", phone="+79990000000")
+    cinema_service.get_daily_revenue(db, today.isoformat())
+    cinema_service.get_revenue_range(db, (today - timedelta(days=6)).isoformat(), today.isoformat())
+    cinema_service.get_screenings_for_date(db, show_day)
+    cinema_service.get_attendance_for_date(db, show_day)
+    cinema_service.get_attendance_for_screenings(db, [screening_id])
+    cinema_service.list_screenings(db, film_id=cinema.film.id)
+    cinema_service.get_available_screenings(db)
+    PopularityLeaderboard().top(db, days=7)
+    seat_map_service.create_seat_map(db, seat_map_screening.id)
+    seat_map_service.sell_seats(db, seat_map_screening.id, [0])
+    license_service.get_expiring_contracts(db)
+    license_service.get_expiring_licenses(db)
+    license_service.get_contract_summary(db, cinema.contract.id)
+    license_service.get_supplier_contracts_summary(db, cinema.supplier.id)
+    expiry_service.scan_expiring(db, days_threshold=400)
+    expiry_service.get_expiry_notifications(db, days_threshold=400)
+    analytics_service.get_all_complaints(db, status="на рассмотрении")
+    analytics_service.get_complaint_stats(db)
+    analytics_service.get_supplier_top(db)
+    procumenet_service.get_daily_client_revenue(db, today.isoformat())
+    procumenet_service.get_supplier_order_stats(db, cinema.supplier.id)
+
+    conn = db.connection()
+    full_scans = {}
+    for statement, parameters in captured_statements:
+        scans = [detail for detail in find_full_scans(conn, statement, parameters)
+                 if detail.split()[1] not in EXPECTED_SCANS]
+        if scans:
+            full_scans[" ".join(statement.split())] = scans
+    assert not full_scans, "\n".join(f"{scans}: {statement}" for statement, scans in full_scans.items())
@@ -0,0 +1,27 @@
+# СОСТАВЛЕНИЕ И СОХРАНЕНИЕ РАСПИСАНИЯ
+from datetime import date, datetime, timedelta
+
+from models.cinema import Screening
+from services import schedule_service
+
+
+def test_schedule_for_today_starts_after_now(db, cinema):
+    before = datetime.now()
+    slots = schedule_service.generate_weekly_schedule(db, date.today().isoformat(), opening_time="00:00",
+                                                      closing_time="23:59", days=2)
+
+    assert slots
+    assert all(slot['start'] >= before for slot in slots)  # Ни одного показа в прошлом
+    first_today = min((slot['start'] for slot in slots if slot['start'].date() == date.today()), default=None)
+    if first_today is not None:  # Перед полуночью на сегодня может ничего не поместиться
+        assert first_today - before < timedelta(minutes=schedule_service.START_STEP_MINUTES)
+        assert first_today.minute % schedule_service.START_STEP_MINUTES == 0 and first_today.second == 0
+
+
+def test_save_schedule_rounds_ticket_price(db, cinema):
+    day = (date.today() + timedelta(days=2)).isoformat()
+    slots = schedule_service.generate_weekly_schedule(db, day, days=1)
+
+    assert schedule_service.save_schedule(db, slots, 299.999) == len(slots)
+    prices = {price for price, in db.query(Screening.ticket_price).filter(Screening.id != cinema.screening.id)}
+    assert prices == {300.0}
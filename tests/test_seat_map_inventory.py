@@ -0,0 +1,53 @@
+# ПОКАЗ ПРОДАЁТСЯ ЛИБО ПО БИЛЕТАМ НА КАЖДОЕ МЕСТО, ЛИБО ПО КАРТЕ МЕСТ
+import pytest
+
+from models.cinema import Ticket
+from services import cinema_service, seat_map_service
+
+
+def test_seat_map_screening_rejects_ticket_inventory(db, cinema):
+    screening_id = cinema.screening.id
+    seat_map_service.create_seat_map(db, screening_id)
+    seat_map_service.sell_seats(db, screening_id, [2])  # Индекс 2 - место 1-3
+
+    assert cinema_service.generate_inventory_for_period(db, cinema.start.date().isoformat(), days=1) == {}
+    assert db.query(Ticket).filter(Ticket.screening_id == screening_id).count() == 1  # Только проданное место
+    with pytest.raises(ValueError, match="карте мест"):
+        cinema_service.generate_seat_inventory(db, screening_id)
+    with pytest.raises(ValueError, match="карте мест"):
+        cinema_service.sell_tickets(db, screening_id, ["1-3"], client_name="Иван Петров", phone="+79990000000")
+    with pytest.raises(ValueError, match="карте мест"):
+        cinema_service.create_ticket(db, screening_id, "1-3", 300.0)
+    with pytest.raises(ValueError, match="карте мест"):
+        cinema_service.get_available_seats(db, screening_id)
+    sold = db.query(Ticket).filter(Ticket.screening_id == screening_id).one()
+    with pytest.raises(ValueError, match="карте мест"):
+        cinema_service.cancel_ticket_sale(db, sold.id)
+
+    revenue = cinema_service.get_daily_revenue(db, sold.sold_date.date().isoformat())
+    assert (revenue['total_tickets_sold'], revenue['total_revenue']) == (1, 300.0)  # Место учтено один раз
+
+
+def test_ticket_inventory_screening_rejects_seat_map(db, cinema):
+    screening_id = cinema.screening.id
+    cinema_service.generate_seat_inventory(db, screening_id)
+
+    with pytest.raises(ValueError, match="migrate_screening_to_seat_map"):
+        seat_map_service.create_seat_map(db, screening_id)
+    assert seat_map_service.get_seat_map(db, screening_id) is None
+
+
+@pytest.mark.parametrize("seat_indexes", [[], [2, 2]])
+def test_cancel_seats_rejects_empty_and_duplicate_indexes(db, cinema, seat_indexes):
+    screening_id = cinema.screening.id
+    seat_map_service.create_seat_map(db, screening_id)
+    seat_map_service.sell_seats(db, screening_id, [2])
+    version = seat_map_service.get_seat_map(db, screening_id).version
+
+    with pytest.raises(ValueError, match="без повторов"):
+        seat_map_service.cancel_seats(db, screening_id, seat_indexes)
+
+    seat_map = seat_map_service.get_seat_map(db, screening_id)
+    assert seat_map.version == version  # Карта не изменилась
+    assert seat_map_service.is_seat_sold(seat_map, 2)
+    assert seat_map_service.cancel_seats(db, screening_id, [2]) == 1
@@ -0,0 +1,48 @@
+# ПРОДАЖА НЕСКОЛЬКИХ МЕСТ: ВСЁ ИЛИ НИЧЕГО, СУММА ЗАКАЗА И ИТОГИ ДНЯ
+import pytest
+
+from models.cinema import SalesDailyRollup, Ticket
+from models.procurement import OrderClients
+from services import cinema_service
+
+
+def _sell(db, cinema, seats, **order):
+    order = order or {'client_name': "Иван Петров", 'phone': "+79990000000"}
+    return cinema_service.sell_tickets(db, cinema.screening.id, seats, **order)
+
+
+def _sold_seats(db, cinema):
+    return {seat for seat, in db.query(Ticket.seat_number).filter(Ticket.screening_id == cinema.screening.id,
+                                                                  Ticket.sold == True)}
+
+
+def test_sell_tickets_sets_total_and_rollup(db, cinema):
+    cinema_service.generate_seat_inventory(db, cinema.screening.id)
+
+    order = _sell(db, cinema, ["1-1", " 1-2 "])
+    order = _sell(db, cinema, ["2-1"], order_id=order.id)  # Дополнение существующего заказа
+
+    assert order.total_amount == 900.0
+    assert _sold_seats(db, cinema) == {"1-1", "1-2", "2-1"}
+    assert {ticket.order_id for ticket in db.query(Ticket).filter(Ticket.sold == True)} == {order.id}
+    rollup = db.query(SalesDailyRollup).one()
+    assert (rollup.film_id, rollup.hall_id) == (cinema.film.id, cinema.hall.id)
+    assert (rollup.tickets_sold, rollup.revenue) == (3, 900.0)
+
+
+@pytest.mark.parametrize("seats, unavailable", [
+    (["1-3", "1-1"], "1-1"),  # Одно место уже продано
+    (["1-3", "9-9"], "9-9"),  # Такого места нет в зале
+])
+def test_sell_tickets_is_all_or_nothing(db, cinema, seats, unavailable):
+    cinema_service.generate_seat_inventory(db, cinema.screening.id)
+    _sell(db, cinema, ["1-1"])
+    orders_before = db.query(OrderClients).count()
+
+    with pytest.raises(ValueError, match=f"Места недоступны для продажи: {unavailable}$"):
+        _sell(db, cinema, seats)
+
+    assert _sold_seats(db, cinema) == {"1-1"}  # Свободное место из неудачной продажи не занято
+    assert db.query(OrderClients).count() == orders_before  # Новый заказ откачен вместе с продажей
+    rollup = db.query(SalesDailyRollup).one()
+    assert (rollup.tickets_sold, rollup.revenue) == (1, 300.0)
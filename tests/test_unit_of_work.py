@@ -0,0 +1,37 @@
+# ЕДИНИЦА РАБОТЫ: ОТКАТ ВНУТРИ ЕДИНИЦЫ НЕ ТЕРЯЕТ ИЗМЕНЕНИЯ МОЛЧА
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm.attributes import set_committed_value
+
+from database import rollback, unit_of_work
+from models.cinema import Ticket
+from models.procurement import OrderClients
+from services import seat_map_service
+from services.procumenet_service import create_client_order
+
+
+def test_rollback_cancels_unit_with_direct_writes(db, cinema):
+    with pytest.raises(ValueError, match="Единица работы отменена"):
+        with unit_of_work(db):
+            db.add(OrderClients(client_name="Иван Петров", phone="+79990000000", order_date=datetime.now()))
+            db.flush()  # Запись напрямую, без commit(db) сервиса
+            rollback(db)  # Откат одной из операций уносит и запись выше
+            create_client_order(db, "Анна Смирнова", "+79991111111")
+
+    assert db.query(OrderClients).count() == 0  # Единица не зафиксировала ничего
+
+
+def test_seat_map_retry_keeps_unit_work(db, cinema):
+    screening_id = cinema.screening.id
+    seat_map_service.create_seat_map(db, screening_id)
+
+    with unit_of_work(db):
+        order = create_client_order(db, "Иван Петров", "+79990000000")
+        seat_map = seat_map_service.get_seat_map(db, screening_id)
+        set_committed_value(seat_map, 'version', seat_map.version + 1)  # Карта устарела: её изменила другая касса
+        assert not seat_map_service._swap_occupancy(db, seat_map, [0], sold=True)
+        seat_map_service.sell_seats(db, screening_id, [0], order_id=order.id)  # Повтор с перечитанной картой
+
+    assert db.query(OrderClients).filter(OrderClients.id == order.id).count() == 1  # Заказ не потерян
+    assert db.query(Ticket).filter(Ticket.order_id == order.id).count() == 1
@@ -0,0 +1,35 @@
+# ИЗМЕНЕНИЕ ДЛИТЕЛЬНОСТИ ФИЛЬМА ПЕРЕСЧИТЫВАЕТ ТОЛЬКО БУДУЩИЕ ПОКАЗЫ
+from datetime import timedelta
+
+import pytest
+
+from config import CLEANING_GAP_MINUTES
+from models.cinema import Screening
+from services import cinema_service
+
+
+def test_update_film_moves_only_future_screening_ends(db, cinema):
+    past_start = cinema.start - timedelta(days=3)
+    past = Screening(film_id=cinema.film.id, datetime=past_start, end_datetime=past_start + timedelta(minutes=90),
+                     hall=cinema.hall.name, hall_id=cinema.hall.id, ticket_price=300.0)
+    db.add(past)
+    db.commit()
+
+    cinema_service.update_film(db, cinema.film.id, duration=100)
+
+    db.expire_all()
+    assert db.get(Screening, cinema.screening.id).end_datetime == cinema.start + timedelta(minutes=100)
+    assert db.get(Screening, past.id).end_datetime == past_start + timedelta(minutes=90)  # Прошедший показ не меняется
+
+
+def test_update_film_rejects_hall_conflict(db, cinema):
+    other = cinema_service.create_film(db, cinema.license.id, "Другой фильм", 60)
+    later_start = cinema.start + timedelta(minutes=90 + CLEANING_GAP_MINUTES)
+    cinema_service.create_screening(db, other.id, later_start.strftime("%Y-%m-%d %H:%M"), cinema.hall.name, 300.0)
+
+    with pytest.raises(ValueError, match="Конфликт времени"):
+        cinema_service.update_film(db, cinema.film.id, duration=120)
+
+    db.expire_all()
+    assert cinema_service.get_film_by_id(db, cinema.film.id).duration == 90
+    assert db.get(Screening, cinema.screening.id).end_datetime == cinema.start + timedelta(minutes=90)
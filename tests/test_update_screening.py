@@ -0,0 +1,50 @@
+# ОШИБКА В АРГУМЕНТАХ ОБНОВЛЕНИЯ ПОКАЗА НЕ ОСТАВЛЯЕТ ЧАСТИЧНЫХ ИЗМЕНЕНИЙ
+from datetime import timedelta
+
+import pytest
+
+from models.cinema import SalesDailyRollup, Screening
+from services import cinema_service
+
+
+def _sell_one(db, cinema):
+    cinema_service.generate_seat_inventory(db, cinema.screening.id)
+    cinema_service.sell_tickets(db, cinema.screening.id, ["1-1"], client_name="Иван Петров", phone="+79990000000")
+
+
+def test_invalid_price_keeps_hall_and_rollup(db, cinema):
+    _sell_one(db, cinema)
+    cinema_service.create_hall(db, "Зал 2", 3, 4)
+
+    with pytest.raises(ValueError, match="Цена"):
+        cinema_service.update_screening(db, cinema.screening.id, hall="Зал 2", ticket_price=-5)
+    cinema_service.create_hall(db, "Зал 3", 2, 2)  # Следующая фиксация той же сессии
+
+    db.expire_all()
+    assert db.get(Screening, cinema.screening.id).hall_id == cinema.hall.id
+    assert {hall_id for hall_id, in db.query(SalesDailyRollup.hall_id)} == {cinema.hall.id}
+
+
+def test_unknown_hall_keeps_datetime(db, cinema):
+    new_start = cinema.start + timedelta(days=1)
+
+    with pytest.raises(ValueError, match="не найден"):
+        cinema_service.update_screening(db, cinema.screening.id, datetime_str=new_start.strftime("%Y-%m-%d %H:%M"),
+                                        hall="Нет такого зала")
+    cinema_service.create_hall(db, "Зал 2", 3, 4)
+
+    db.expire_all()
+    assert db.get(Screening, cinema.screening.id).datetime == cinema.start
+
+
+def test_update_screening_moves_hall_and_rollup(db, cinema):
+    _sell_one(db, cinema)
+    hall = cinema_service.create_hall(db, "Зал 2", 3, 4)
+
+    cinema_service.update_screening(db, cinema.screening.id, hall="Зал 2", ticket_price=350.555)
+
+    db.expire_all()
+    screening = db.get(Screening, cinema.screening.id)
+    assert (screening.hall_id, screening.hall, screening.ticket_price) == (hall.id, "Зал 2", 350.56)
+    sold_by_hall = {hall_id: tickets for hall_id, tickets in db.query(SalesDailyRollup.hall_id, SalesDailyRollup.tickets_sold)}
+    assert sold_by_hall == {cinema.hall.id: 0, hall.id: 1}  # Продажа перенесена в новый зал
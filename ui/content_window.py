@@ -1,24 +1,53 @@
 # UI ФУНКЦИЯ ДЛЯ СОЗДАНИЯ ИНТЕРФЕЙСА ДЛЯ АДМИНИСТРАТОРА КОНТЕНТА
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton,
-                             QTableWidget, QTableWidgetItem, QHBoxLayout,
+                             QTableView, QAbstractItemView, QHBoxLayout,
                              QLineEdit, QMessageBox, QDialog, QFormLayout,
-                             QSpinBox, QTextEdit, QDateTimeEdit)
+                             QSpinBox, QTextEdit, QDateTimeEdit, QComboBox)
 from PyQt6.QtCore import Qt, QDateTime
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import SessionLocal
-from services.cinema_service import (create_film, get_all_films, get_film_by_id,
-                                     delete_film, create_screening, get_all_screenings,
-                                     update_screening, delete_screening)
+from services.cinema_service import (create_film, get_films_page, get_film_by_id, update_film,
+                                     delete_film, create_screening, get_screenings_page,
+                                     update_screening, delete_screening, create_hall,
+                                     get_all_halls, get_halls_page, delete_hall)
+from ui.table_model import (PagedTableModel, TableColumn, format_datetime, format_time,
+                            format_money, format_minutes, truncate)
+from ui.task_runner import TaskRunner, TaskProgressBar
+
+# СТОЛБЦЫ ТАБЛИЦ: ПЕРВЫЙ СТОЛБЕЦ - ID, ВТОРОЙ - НАЗВАНИЕ ДЛЯ ПОДТВЕРЖДЕНИЯ УДАЛЕНИЯ
+FILM_COLUMNS = [
+    TableColumn("ID", lambda film: film.id),
+    TableColumn("Название", lambda film: film.title),
+    TableColumn("Длительность", lambda film: film.duration, format_minutes),
+    TableColumn("Описание", lambda film: film.description, truncate(50)),
+]
+
+SCREENING_COLUMNS = [  # Строки ScreeningRow
+    TableColumn("ID", lambda row: row.id),
+    TableColumn("Фильм", lambda row: row.film_title if row.film_title is not None else f"ID:{row.film_id}"),
+    TableColumn("Дата", lambda row: row.datetime, format_datetime),
+    TableColumn("Окончание", lambda row: row.end_datetime, format_time),
+    TableColumn("Зал", lambda row: row.hall),
+    TableColumn("Цена", lambda row: row.ticket_price, format_money),
+    TableColumn("Продано", lambda row: row.tickets_sold),
+]
+
+HALL_COLUMNS = [
+    TableColumn("ID", lambda hall: hall.id),
+    TableColumn("Название", lambda hall: hall.name),
+    TableColumn("Рядов", lambda hall: hall.rows),
+    TableColumn("Мест в ряду", lambda hall: hall.seats_per_row),
+    TableColumn("Вместимость", lambda hall: hall.capacity),
+]
 
 
 class ContentMainWindow(QWidget):
     def __init__(self):
         super().__init__()
-        self.db = SessionLocal()
+        self.runner = TaskRunner(self)  # Списки, удаление и сохранение выполняются в фоне
         self.init_ui()
 
     def init_ui(self):
@@ -36,9 +65,11 @@ class ContentMainWindow(QWidget):
         button_panel = QHBoxLayout()
         btn_films = QPushButton("Фильмы")
         btn_screenings = QPushButton("Показы")
+        btn_halls = QPushButton("Залы")
 
         button_panel.addWidget(btn_films)
         button_panel.addWidget(btn_screenings)
+        button_panel.addWidget(btn_halls)
         layout.addLayout(button_panel)
 
         # Панель управления
@@ -53,10 +84,14 @@ class ContentMainWindow(QWidget):
             self.control_panel.addWidget(btn)
 
         layout.addLayout(self.control_panel)
+        layout.addWidget(TaskProgressBar(self.runner))
 
-        # Таблица
-        self.tableWidget = QTableWidget()
-        layout.addWidget(self.tableWidget)
+        # Таблица: строки читаются страницами по мере прокрутки
+        self.tableView = QTableView()
+        self.tableView.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tableView.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        layout.addWidget(self.tableView)
+        self.model = None
 
         self.setLayout(layout)
 
@@ -67,6 +102,7 @@ class ContentMainWindow(QWidget):
         # Обработчики
         btn_films.clicked.connect(lambda: self.switch_mode("films"))
         btn_screenings.clicked.connect(lambda: self.switch_mode("screenings"))
+        btn_halls.clicked.connect(lambda: self.switch_mode("halls"))
         self.add_btn.clicked.connect(self.add_item)
         self.edit_btn.clicked.connect(self.edit_item)
         self.delete_btn.clicked.connect(self.delete_item)
@@ -81,61 +117,49 @@ class ContentMainWindow(QWidget):
         """Обновить данные в зависимости от режима"""
         if self.current_mode == "films":
             self.load_films()
+        elif self.current_mode == "halls":
+            self.load_halls()
         else:
             self.load_screenings()
 
     def load_films(self):
         """Загрузить список фильмов"""
-        try:
-            films = get_all_films(self.db)
-            self.tableWidget.setColumnCount(4)
-            self.tableWidget.setHorizontalHeaderLabels(["ID", "Название", "Длительность", "Описание"])
-            self.tableWidget.setRowCount(len(films))
-
-            for row, film in enumerate(films):
-                self.tableWidget.setItem(row, 0, QTableWidgetItem(str(film.id)))
-                self.tableWidget.setItem(row, 1, QTableWidgetItem(film.title))
-                self.tableWidget.setItem(row, 2, QTableWidgetItem(f"{film.duration} мин"))
-                desc = film.description[:50] + "..." if len(film.description) > 50 else film.description
-                self.tableWidget.setItem(row, 3, QTableWidgetItem(desc))
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
+        self.set_model(FILM_COLUMNS, get_films_page)
 
     def load_screenings(self):
         """Загрузить список показов"""
-        try:
-            screenings = get_all_screenings(self.db)
-            self.tableWidget.setColumnCount(5)
-            self.tableWidget.setHorizontalHeaderLabels(["ID", "Фильм", "Дата", "Зал", "Цена"])
-            self.tableWidget.setRowCount(len(screenings))
-
-            for row, screening in enumerate(screenings):
-                film = get_film_by_id(self.db, screening.film_id)
-                film_name = film.title if film else f"ID:{screening.film_id}"
-
-                self.tableWidget.setItem(row, 0, QTableWidgetItem(str(screening.id)))
-                self.tableWidget.setItem(row, 1, QTableWidgetItem(film_name))
-                self.tableWidget.setItem(row, 2, QTableWidgetItem(screening.datetime.strftime("%d.%m.%Y %H:%M")))
-                self.tableWidget.setItem(row, 3, QTableWidgetItem(screening.hall))
-                self.tableWidget.setItem(row, 4, QTableWidgetItem(f"{screening.ticket_price:.2f} руб."))
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
+        self.set_model(SCREENING_COLUMNS, get_screenings_page)
+
+    def load_halls(self):
+        """Загрузить список залов"""
+        self.set_model(HALL_COLUMNS, get_halls_page)
+
+    def set_model(self, columns, fetch_page):
+        """Показать в таблице новую постраничную модель и прочитать первую страницу"""
+        old_model = self.model
+        self.model = PagedTableModel(columns, fetch_page, self.runner, parent=self)
+        self.model.failed.connect(self.show_error)
+        self.tableView.setModel(self.model)
+        if old_model is not None:
+            self.runner.cancel(old_model)
+            old_model.deleteLater()
+        self.model.reset()
 
     def get_selected_id(self):
         """Получить ID выбранной строки"""
-        row = self.tableWidget.currentRow()
+        row = self.tableView.currentIndex().row()
         if row >= 0:
-            return int(self.tableWidget.item(row, 0).text())
+            return int(self.model.data(self.model.index(row, 0)))
         return None
 
     def add_item(self):
         """Добавить новый элемент"""
         if self.current_mode == "films":
-            dialog = FilmDialog(self.db)  # Передаем сессию
+            dialog = FilmDialog()
+        elif self.current_mode == "halls":
+            dialog = HallDialog()
         else:
-            dialog = ScreeningDialog(self.db)  # Передаем сессию
+            dialog = ScreeningDialog()
 
         if dialog.exec():
             self.refresh_data()
@@ -146,11 +170,14 @@ class ContentMainWindow(QWidget):
         if not item_id:
             QMessageBox.warning(self, "Ошибка", "Выберите элемент для редактирования")
             return
+        if self.current_mode == "halls":
+            QMessageBox.warning(self, "Ошибка", "Редактирование залов не поддерживается")
+            return
 
         if self.current_mode == "films":
-            dialog = FilmDialog(self.db, item_id)  # Передаем сессию
+            dialog = FilmDialog(item_id)
         else:
-            dialog = ScreeningDialog(self.db, item_id)  # Передаем сессию
+            dialog = ScreeningDialog(item_id)
 
         if dialog.exec():
             self.refresh_data()
@@ -162,34 +189,42 @@ class ContentMainWindow(QWidget):
             QMessageBox.warning(self, "Ошибка", "Выберите элемент для удаления")
             return
 
-        name = self.tableWidget.item(self.tableWidget.currentRow(), 1).text()
+        name = self.model.data(self.model.index(self.tableView.currentIndex().row(), 1))
 
         reply = QMessageBox.question(self, "Подтверждение",
                                      f"Удалить '{name}'?",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            try:
-                if self.current_mode == "films":
-                    success = delete_film(self.db, item_id)
-                else:
-                    success = delete_screening(self.db, item_id)
+            if self.current_mode == "films":
+                delete_function = delete_film
+            elif self.current_mode == "halls":
+                delete_function = delete_hall
+            else:
+                delete_function = delete_screening
+            self.runner.submit("delete", delete_function, item_id,
+                               on_result=self.on_deleted, on_error=self.show_error)
 
-                if success:
-                    QMessageBox.information(self, "Успех", "Элемент удален")
-                    self.refresh_data()
-                else:
-                    QMessageBox.warning(self, "Ошибка", "Не удалось удалить")
+    def on_deleted(self, success):
+        if success:
+            QMessageBox.information(self, "Успех", "Элемент удален")
+            self.refresh_data()
+        else:
+            QMessageBox.warning(self, "Ошибка", "Не удалось удалить")
+
+    def show_error(self, message):
+        QMessageBox.critical(self, "Ошибка", message)
 
-            except Exception as e:
-                QMessageBox.critical(self, "Ошибка", str(e))
+    def closeEvent(self, event):
+        self.runner.cancel_all()  # Результаты для закрытого окна не нужны
+        super().closeEvent(event)
 
 
 class FilmDialog(QDialog):
-    def __init__(self, db, film_id=None):
+    def __init__(self, film_id=None):
         super().__init__()
-        self.db = db
         self.film_id = film_id
+        self.runner = TaskRunner(self)
         self.init_ui()
 
     def init_ui(self):
@@ -209,9 +244,9 @@ class FilmDialog(QDialog):
         layout.addRow("Длительность (мин):", self.duration_input)
         layout.addRow("Описание:", self.description_input)
 
-        btn_save = QPushButton("Сохранить")
-        btn_save.clicked.connect(self.save)
-        layout.addRow(btn_save)
+        self.btn_save = QPushButton("Сохранить")
+        self.btn_save.clicked.connect(self.save)
+        layout.addRow(self.btn_save)
 
         self.setLayout(layout)
 
@@ -220,53 +255,64 @@ class FilmDialog(QDialog):
             self.load_data()
 
     def load_data(self):
-        try:
-            film = get_film_by_id(self.db, self.film_id)
-            if film:
-                self.title_input.setText(film.title)
-                self.duration_input.setValue(film.duration)
-                self.description_input.setText(film.description)
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
+        self.btn_save.setEnabled(False)  # Без загруженных данных сохранение затрёт фильм значениями по умолчанию
+        self.runner.submit("load", get_film_by_id, self.film_id,
+                           on_result=self.on_loaded, on_error=self.on_load_failed)
+
+    def on_loaded(self, film):
+        if film is None:
+            self.on_load_failed("Фильм не найден")
+            return
+        self.title_input.setText(film.title)
+        self.duration_input.setValue(film.duration)
+        self.description_input.setText(film.description)
+        self.btn_save.setEnabled(True)
+
+    def on_load_failed(self, message):
+        QMessageBox.critical(self, "Ошибка", message)
 
     def save(self):
-        try:
-            if self.film_id:
-                # Редактирование существующего фильма
-                film = get_film_by_id(self.db, self.film_id)
-                if film:
-                    film.title = self.title_input.text()
-                    film.duration = self.duration_input.value()
-                    film.description = self.description_input.toPlainText()
-
-                    self.db.add(film)
-                    self.db.commit()
-
-                    QMessageBox.information(self, "Успех", "Фильм обновлен")
-                    self.accept()
-                else:
-                    QMessageBox.warning(self, "Ошибка", "Фильм не найден")
-            else:
-                # Создание нового фильма
-                film = create_film(
-                    self.db,  # Используем self.db
-                    license_id=1,  # TODO: Добавить выбор лицензии
-                    title=self.title_input.text(),
-                    duration=self.duration_input.value(),
-                    description=self.description_input.toPlainText()
-                )
-                QMessageBox.information(self, "Успех", f"Фильм создан (ID: {film.id})")
-                self.accept()
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
+        self.btn_save.setEnabled(False)  # Сохранение идёт в фоне
+        if self.film_id:
+            # Редактирование существующего фильма
+            self.runner.submit(
+                "save", update_film, self.film_id,
+                title=self.title_input.text(),
+                duration=self.duration_input.value(),
+                description=self.description_input.toPlainText(),
+                on_result=self.on_saved, on_error=self.on_failed
+            )
+        else:
+            # Создание нового фильма
+            self.runner.submit(
+                "save", create_film,
+                license_id=1,  # TODO: Добавить выбор лицензии
+                title=self.title_input.text(),
+                duration=self.duration_input.value(),
+                description=self.description_input.toPlainText(),
+                on_result=self.on_saved, on_error=self.on_failed
+            )
+
+    def on_saved(self, film):
+        if film is None:
+            self.on_failed("Фильм не найден")
+        elif self.film_id:
+            QMessageBox.information(self, "Успех", "Фильм обновлен")
+            self.accept()
+        else:
+            QMessageBox.information(self, "Успех", f"Фильм создан (ID: {film.id})")
+            self.accept()
+
+    def on_failed(self, message):
+        self.btn_save.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", message)
 
 
 class ScreeningDialog(QDialog):
-    def __init__(self, db, screening_id=None):
+    def __init__(self, screening_id=None):
         super().__init__()
-        self.db = db  # Сохраняем сессию
         self.screening_id = screening_id
+        self.runner = TaskRunner(self)
         self.init_ui()
 
     def init_ui(self):
@@ -281,8 +327,7 @@ class ScreeningDialog(QDialog):
         self.datetime_input = QDateTimeEdit()
         self.datetime_input.setDateTime(QDateTime.currentDateTime().addDays(1))
 
-        self.hall_input = QLineEdit()
-        self.hall_input.setText("Зал 1")
+        self.hall_input = QComboBox()  # Залы загружаются в фоне
 
         self.price_input = QLineEdit()
         self.price_input.setText("300")
@@ -292,37 +337,112 @@ class ScreeningDialog(QDialog):
         layout.addRow("Зал:", self.hall_input)
         layout.addRow("Цена:", self.price_input)
 
-        btn_save = QPushButton("Сохранить")
-        btn_save.clicked.connect(self.save)
-        layout.addRow(btn_save)
+        self.btn_save = QPushButton("Сохранить")
+        self.btn_save.clicked.connect(self.save)
+        layout.addRow(self.btn_save)
 
         self.setLayout(layout)
+        self.load_halls()
+
+    def load_halls(self):
+        self.btn_save.setEnabled(False)  # Без списка залов показ не сохранить
+        self.runner.submit("load", get_all_halls, on_result=self.on_halls_loaded, on_error=self.on_load_failed)
+
+    def on_halls_loaded(self, halls):
+        for hall in halls:
+            self.hall_input.addItem(hall.name)
+        self.btn_save.setEnabled(True)
+
+    def on_load_failed(self, message):
+        QMessageBox.critical(self, "Ошибка", message)
 
     def save(self):
         try:
-            if self.screening_id:
-                # Обновляем показ
-                result = update_screening(
-                    self.db,  # Используем self.db
-                    self.screening_id,
-                    datetime_str=self.datetime_input.dateTime().toString("yyyy-MM-dd HH:mm"),
-                    hall=self.hall_input.text(),
-                    ticket_price=float(self.price_input.text())
-                )
-                if result:
-                    QMessageBox.information(self, "Успех", "Показ обновлен")
-                    self.accept()
-            else:
-                # Создаем новый показ
-                screening = create_screening(
-                    self.db,  # Используем self.db
-                    film_id=self.film_id_input.value(),
-                    datetime_str=self.datetime_input.dateTime().toString("yyyy-MM-dd HH:mm"),
-                    hall=self.hall_input.text(),
-                    ticket_price=float(self.price_input.text())
-                )
-                QMessageBox.information(self, "Успех", f"Показ создан (ID: {screening.id})")
-                self.accept()
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
\ No newline at end of file
+            ticket_price = float(self.price_input.text())
+        except ValueError as e:
+            QMessageBox.critical(self, "Ошибка", str(e))
+            return
+        datetime_str = self.datetime_input.dateTime().toString("yyyy-MM-dd HH:mm")
+        self.btn_save.setEnabled(False)  # Сохранение идёт в фоне
+        if self.screening_id:
+            # Обновляем показ
+            self.runner.submit(
+                "save", update_screening, self.screening_id,
+                datetime_str=datetime_str,
+                hall=self.hall_input.currentText(),
+                ticket_price=ticket_price,
+                on_result=self.on_saved, on_error=self.on_failed
+            )
+        else:
+            # Создаем новый показ
+            self.runner.submit(
+                "save", create_screening,
+                film_id=self.film_id_input.value(),
+                datetime_str=datetime_str,
+                hall=self.hall_input.currentText(),
+                ticket_price=ticket_price,
+                on_result=self.on_saved, on_error=self.on_failed
+            )
+
+    def on_saved(self, screening):
+        self.btn_save.setEnabled(True)
+        if screening is None:
+            return
+        if self.screening_id:
+            QMessageBox.information(self, "Успех", "Показ обновлен")
+        else:
+            QMessageBox.information(self, "Успех", f"Показ создан (ID: {screening.id})")
+        self.accept()
+
+    def on_failed(self, message):
+        self.btn_save.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", message)
+
+
+class HallDialog(QDialog):
+    def __init__(self):
+        super().__init__()
+        self.runner = TaskRunner(self)
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("Зал")
+        self.setGeometry(200, 200, 350, 200)
+
+        layout = QFormLayout()
+
+        self.name_input = QLineEdit()
+        self.rows_input = QSpinBox()
+        self.rows_input.setRange(1, 100)
+        self.rows_input.setValue(10)
+        self.seats_input = QSpinBox()
+        self.seats_input.setRange(1, 100)
+        self.seats_input.setValue(20)
+
+        layout.addRow("Название:", self.name_input)
+        layout.addRow("Рядов:", self.rows_input)
+        layout.addRow("Мест в ряду:", self.seats_input)
+
+        self.btn_save = QPushButton("Сохранить")
+        self.btn_save.clicked.connect(self.save)
+        layout.addRow(self.btn_save)
+
+        self.setLayout(layout)
+
+    def save(self):
+        self.btn_save.setEnabled(False)  # Сохранение идёт в фоне
+        self.runner.submit(
+            "save", create_hall,
+            name=self.name_input.text(),
+            rows=self.rows_input.value(),
+            seats_per_row=self.seats_input.value(),
+            on_result=self.on_saved, on_error=self.on_failed
+        )
+
+    def on_saved(self, hall):
+        QMessageBox.information(self, "Успех", f"Зал создан (ID: {hall.id})")
+        self.accept()
+
+    def on_failed(self, message):
+        self.btn_save.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", message)
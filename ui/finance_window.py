@@ -1,6 +1,6 @@
 # UI ФУНКЦИЯ ДЛЯ СОЗДАНИЯ ИНТЕРФЕЙСА ДЛЯ МЕНЕДЖЕРА ПО ЗАКУПКАМ
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton,
-                             QTableWidget, QTableWidgetItem, QHBoxLayout,
+                             QTableView, QHBoxLayout,
                              QDateEdit, QMessageBox)
 from PyQt6.QtCore import Qt, QDate
 import sys
@@ -8,14 +8,40 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import SessionLocal
-from services.cinema_service import get_daily_revenue, get_popular_films, get_screening_attendance
-from services.cinema_service import get_screenings_for_date
+from services.cinema_service import get_daily_revenue, get_popular_films, list_screenings
+from ui.table_model import PagedTableModel, TableColumn, format_money, format_time
+from ui.task_runner import TaskRunner, TaskProgressBar
+
+# СТОЛБЦЫ ОТЧЁТОВ
+REVENUE_COLUMNS = [  # Строки (показатель, значение, описание)
+    TableColumn("Показатель", lambda row: row[0]),
+    TableColumn("Значение", lambda row: row[1]),
+    TableColumn("Описание", lambda row: row[2]),
+]
+
+POPULAR_COLUMNS = [
+    TableColumn("Рейтинг", lambda film: film['rank']),
+    TableColumn("Фильм", lambda film: film['film_title']),
+    TableColumn("Билеты", lambda film: film['tickets_sold']),
+    TableColumn("Выручка", lambda film: film['total_revenue'], format_money),
+    TableColumn("Ср. цена", lambda film: film['average_ticket_price'], format_money),
+]
+
+ATTENDANCE_COLUMNS = [  # Строки ScreeningRow
+    TableColumn("ID", lambda row: row.id),
+    TableColumn("Фильм", lambda row: row.film_title if row.film_title is not None else f"Фильм ID:{row.film_id}"),
+    TableColumn("Время", lambda row: row.datetime, format_time),
+    TableColumn("Зал", lambda row: row.hall),
+    TableColumn("Цена", lambda row: row.ticket_price, format_money),
+    TableColumn("Продано", lambda row: row.tickets_sold),
+    TableColumn("Выручка", lambda row: row.revenue, format_money),
+]
 
 class FinanceMainWindow(QWidget):
     def __init__(self):
         super().__init__()
-        self.db = SessionLocal()
+        self.runner = TaskRunner(self)  # Отчёты считаются в фоне, интерфейс не замирает
+        self.current_report = None  # Открытый отчёт, зависящий от даты
         self.init_ui()
 
     def init_ui(self):
@@ -47,10 +73,12 @@ class FinanceMainWindow(QWidget):
         control_panel.addWidget(btn_attendance)
 
         layout.addLayout(control_panel)
+        layout.addWidget(TaskProgressBar(self.runner))
 
-        # Таблица для результатов
-        self.tableWidget = QTableWidget()
-        layout.addWidget(self.tableWidget)
+        # Таблица для результатов: ячейки форматируются моделью при отрисовке
+        self.tableView = QTableView()
+        layout.addWidget(self.tableView)
+        self.model = None
 
         self.setLayout(layout)
 
@@ -58,118 +86,68 @@ class FinanceMainWindow(QWidget):
         btn_revenue.clicked.connect(self.show_revenue)
         btn_popular.clicked.connect(self.show_popular)
         btn_attendance.clicked.connect(self.show_attendance)
+        self.date_input.dateChanged.connect(self.on_date_changed)
 
     def clear_table(self):
         """Очистить таблицу"""
-        self.tableWidget.clear()
-        self.tableWidget.setRowCount(0)
-        self.tableWidget.setColumnCount(0)
+        self.show_rows([], [])
+
+    def show_rows(self, columns, rows):
+        """Показать строки отчёта в таблице"""
+        old_model = self.model
+        self.model = PagedTableModel.from_rows(columns, rows, parent=self)
+        self.tableView.setModel(self.model)
+        if old_model is not None:
+            old_model.deleteLater()
 
     def show_revenue(self):
         """Показать выручку за выбранный день"""
-        db = SessionLocal()  # Создаем локальную сессию
-        try:
-            date_str = self.date_input.date().toString("yyyy-MM-dd")
-            revenue_data = get_daily_revenue(db, date_str)  # Используем локальную сессию
-
-            self.tableWidget.setColumnCount(3)
-            self.tableWidget.setHorizontalHeaderLabels(["Показатель", "Значение", "Описание"])
-            self.tableWidget.setRowCount(5)
-
-            data = [
-                ("Дата", str(revenue_data['date']), "Анализируемый день"),  # Просто преобразуем в строку
-                ("Продано билетов", str(revenue_data['total_tickets_sold']), "Всего проданных билетов"),
-                ("Общая выручка", f"{revenue_data['total_revenue']:.2f} руб.", "Суммарная выручка"),
-                ("Средняя цена", f"{revenue_data['average_ticket_price']:.2f} руб.", "Средняя цена билета"),
-                ("Фильмы", str(len(revenue_data['revenue_by_film'])), "Количество фильмов")
-            ]
-
-            for row, (name, value, desc) in enumerate(data):
-                self.tableWidget.setItem(row, 0, QTableWidgetItem(name))
-                self.tableWidget.setItem(row, 1, QTableWidgetItem(str(value)))
-                self.tableWidget.setItem(row, 2, QTableWidgetItem(desc))
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
-        finally:
-            db.close()  # Закрываем сессию
+        self.current_report = self.show_revenue
+        date_str = self.date_input.date().toString("yyyy-MM-dd")
+        self.runner.submit("report", get_daily_revenue, date_str,
+                           on_result=self.on_revenue_loaded, on_error=self.show_error)
+
+    def on_revenue_loaded(self, revenue_data):
+        data = [
+            ("Дата", str(revenue_data['date']), "Анализируемый день"),  # Просто преобразуем в строку
+            ("Продано билетов", str(revenue_data['total_tickets_sold']), "Всего проданных билетов"),
+            ("Общая выручка", f"{revenue_data['total_revenue']:.2f} руб.", "Суммарная выручка"),
+            ("Средняя цена", f"{revenue_data['average_ticket_price']:.2f} руб.", "Средняя цена билета"),
+            ("Фильмы", str(len(revenue_data['revenue_by_film'])), "Количество фильмов")
+        ]
+        self.show_rows(REVENUE_COLUMNS, data)
 
     def show_popular(self):
         """Показать популярные фильмы"""
-        try:
-            popular_films = get_popular_films(self.db, limit=5, days=30)
-
-            self.tableWidget.setColumnCount(5)
-            self.tableWidget.setHorizontalHeaderLabels(["Рейтинг", "Фильм", "Билеты", "Выручка", "Ср. цена"])
-            self.tableWidget.setRowCount(len(popular_films))
-
-            for row, film in enumerate(popular_films):
-                self.tableWidget.setItem(row, 0, QTableWidgetItem(str(film['rank'])))
-                self.tableWidget.setItem(row, 1, QTableWidgetItem(film['film_title']))
-                self.tableWidget.setItem(row, 2, QTableWidgetItem(str(film['tickets_sold'])))
-                self.tableWidget.setItem(row, 3, QTableWidgetItem(f"{film['total_revenue']:.2f} руб."))
-                self.tableWidget.setItem(row, 4, QTableWidgetItem(f"{film['average_ticket_price']:.2f} руб."))
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
-
-    def show_attendance(self):
-        """Показать посещаемость за выбранный день"""
-        try:
-            date_str = self.date_input.date().toString("yyyy-MM-dd")
-            screenings = self.get_screenings_for_date(date_str)
-
-            self.tableWidget.setColumnCount(7)
-            self.tableWidget.setHorizontalHeaderLabels([
-                "ID", "Фильм", "Зал", "Всего мест", "Продано", "Свободно", "% заполняемости"
-            ])
-            self.tableWidget.setRowCount(len(screenings))
-
-            for row, screening in enumerate(screenings):
-                attendance = get_screening_attendance(self.db, screening['id'])
-
-                self.tableWidget.setItem(row, 0, QTableWidgetItem(str(screening['id'])))
-                self.tableWidget.setItem(row, 1, QTableWidgetItem(attendance['film_title']))
-                self.tableWidget.setItem(row, 2, QTableWidgetItem(attendance['hall']))
-                self.tableWidget.setItem(row, 3, QTableWidgetItem(str(attendance['total_seats'])))
-                self.tableWidget.setItem(row, 4, QTableWidgetItem(str(attendance['seats_sold'])))
-                self.tableWidget.setItem(row, 5, QTableWidgetItem(str(attendance['seats_available'])))
-                self.tableWidget.setItem(row, 6, QTableWidgetItem(f"{attendance['occupancy_rate']:.1f}%"))
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
+        self.current_report = None  # Рейтинг не зависит от выбранной даты
+        self.runner.submit("report", get_popular_films, limit=5, days=30,
+                           on_result=lambda films: self.show_rows(POPULAR_COLUMNS, films),
+                           on_error=self.show_error)
 
     def show_attendance(self):
         """Показать посещаемость за выбранный день"""
-        db = SessionLocal()  # Создаем локальную сессию
-        try:
-            date_str = self.date_input.date().toString("yyyy-MM-dd")
-            # Используем новую функцию
-            screenings = get_screenings_for_date(db, date_str)
-
-            if not screenings:
-                QMessageBox.information(self, "Информация", "На выбранную дату показов нет")
-                self.clear_table()
-                return
-
-            self.tableWidget.setColumnCount(7)
-            self.tableWidget.setHorizontalHeaderLabels([
-                "ID", "Фильм", "Время", "Зал", "Цена", "Продано", "Выручка"
-            ])
-            self.tableWidget.setRowCount(len(screenings))
-
-            for row, screening in enumerate(screenings):
-                attendance = get_screening_attendance(db, screening['id'])
-
-                self.tableWidget.setItem(row, 0, QTableWidgetItem(str(screening['id'])))
-                self.tableWidget.setItem(row, 1, QTableWidgetItem(screening['film_title']))
-                self.tableWidget.setItem(row, 2, QTableWidgetItem(screening['datetime'].strftime("%H:%M")))
-                self.tableWidget.setItem(row, 3, QTableWidgetItem(screening['hall']))
-                self.tableWidget.setItem(row, 4, QTableWidgetItem(f"{screening['ticket_price']:.2f} руб."))
-                self.tableWidget.setItem(row, 5, QTableWidgetItem(str(attendance['seats_sold'])))
-                self.tableWidget.setItem(row, 6, QTableWidgetItem(f"{attendance['total_revenue']:.2f} руб."))
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
-        finally:
-            db.close()
+        self.current_report = self.show_attendance
+        date_str = self.date_input.date().toString("yyyy-MM-dd")
+        # Показы дня с продажами одним запросом
+        self.runner.submit("report", list_screenings, start_date=date_str, end_date=date_str,
+                           on_result=self.on_attendance_loaded, on_error=self.show_error)
+
+    def on_attendance_loaded(self, page):
+        screenings = page.items
+        if not screenings:
+            QMessageBox.information(self, "Информация", "На выбранную дату показов нет")
+            self.clear_table()
+            return
+        self.show_rows(ATTENDANCE_COLUMNS, screenings)
+
+    def on_date_changed(self, _):
+        """Пересчитать открытый отчёт за новую дату (незавершённый расчёт за старую отменяется)"""
+        if self.current_report is not None:
+            self.current_report()
+
+    def show_error(self, message):
+        QMessageBox.critical(self, "Ошибка", message)
+
+    def closeEvent(self, event):
+        self.runner.cancel_all()  # Результаты для закрытого окна не нужны
+        super().closeEvent(event)
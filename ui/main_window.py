@@ -1,22 +1,25 @@
 # UI ФУНКЦИЯ ДЛЯ СОЗДАНИЯ ИНТЕРФЕЙСА ДЛЯ ОСНОВНОГО МЕНЮ ДЛЯ УПРАВЛЕНИЯ ДРУГИМИ ОКНАМИ
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                              QPushButton, QLabel)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 import sys
 import os
 
 # Добавляем путь для импорта модулей
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ui.content_window import ContentMainWindow
-from ui.finance_window import FinanceMainWindow
-from ui.procurement_window import ProcurementMainWindow
-from ui.notification_dialog import NotificationDialog
+# Окна разделов импортируются при первом открытии: их модули и сервисы не замедляют запуск
+from database import load_models
+from ui.notification_center import NotificationCenter
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.windows = {}  # Открытые хотя бы раз окна разделов, переиспользуются при повторном открытии
         self.init_ui()
+        self.notification_center = NotificationCenter(parent=self)  # Фоновая проверка сроков
+        self.notification_center.count_changed.connect(self.update_notification_badge)
+        QTimer.singleShot(0, self.notification_center.start)  # Первое сканирование - после показа окна
     
     def init_ui(self):
         self.setWindowTitle("SRM-Система кинотеатр")
@@ -61,20 +64,43 @@ class MainWindow(QMainWindow):
         self.procurement_button.clicked.connect(self.open_procurement_window)
         self.notification_button.clicked.connect(self.open_notification_dialog)
     
+    def show_window(self, name, create):
+        """Показать окно раздела: создаётся при первом открытии, затем показывается то же окно"""
+        window = self.windows.get(name)
+        if window is None:
+            load_models()  # Связи моделей настраиваются только после загрузки всех моделей
+            window = self.windows[name] = create()
+        elif not window.isVisible() and hasattr(window, "refresh_data"):
+            window.refresh_data()  # Данные могли измениться, пока окно было закрыто
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        return window
+
     def open_content_window(self):
-        """Открытие окна просмотра студентов"""
-        self.content_window = ContentMainWindow()
-        self.content_window.show()
+        """Открытие окна управления контентом"""
+        from ui.content_window import ContentMainWindow
+        self.show_window("content", ContentMainWindow)
     
     def open_finance_window(self):
-        """Открытие окна добавления студента"""
-        self.finance_window = FinanceMainWindow()
-        self.finance_window.show()
+        """Открытие окна аналитики"""
+        from ui.finance_window import FinanceMainWindow
+        self.show_window("finance", FinanceMainWindow)
 
     def open_procurement_window(self):
-        self.procurement_window = ProcurementMainWindow()
-        self.procurement_window.show()
+        from ui.procurement_window import ProcurementMainWindow
+        self.show_window("procurement", ProcurementMainWindow)
 
     def open_notification_dialog(self):
-        self.notification_dialog = NotificationDialog()
-        self.notification_dialog.show()
\ No newline at end of file
+        from ui.notification_dialog import NotificationDialog
+        self.show_window("notifications", lambda: NotificationDialog(self.notification_center))
+
+    def update_notification_badge(self, count):
+        """Количество уведомлений на кнопке главного меню"""
+        self.notification_button.setText(f"Уведомления ({count})" if count else "Уведомления")
+
+    def closeEvent(self, event):
+        for window in self.windows.values():  # Окна разделов закрываются вместе с главным
+            window.close()
+        self.notification_center.stop()  # Останавливаем фоновый поток до выхода из приложения
+        super().closeEvent(event)
\ No newline at end of file
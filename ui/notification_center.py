@@ -0,0 +1,109 @@
+# ФОНОВЫЙ ЦЕНТР УВЕДОМЛЕНИЙ: ПЕРИОДИЧЕСКОЕ СКАНИРОВАНИЕ СРОКОВ В ОТДЕЛЬНОМ ПОТОКЕ
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+import sys
+import os
+
+# Добавляем путь для импорта модулей
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal, load_models
+from config import NOTIFICATION_DAYS_THRESHOLD, NOTIFICATION_REFRESH_SECONDS
+
+
+class ExpiryScanWorker(QObject):
+    """Сканирование сроков в фоновом потоке, у каждого сканирования своя сессия.
+
+    Сохранённые в базе уведомления общие для всех клиентов (другое окно,
+    rpm_cli scan-expiring), поэтому изменения считаются не по ответу
+    scan_expiring, а по списку уведомлений после сканирования относительно
+    того, что этот центр уже получил.
+    """
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, days_threshold):
+        super().__init__()
+        self.days_threshold = days_threshold
+        self.known = {}  # Уведомления, уже отправленные центру, по ключу (тип, ID объекта)
+
+    @pyqtSlot(bool)
+    def scan(self, with_snapshot):
+        load_models()  # Модели и сервис загружаются в фоновом потоке, а не при запуске программы
+        from services.expiry_service import scan_expiring, get_expiry_notifications, diff_notifications
+        db = SessionLocal()
+        try:
+            changes = scan_expiring(db, self.days_threshold)
+            notifications = get_expiry_notifications(db, self.days_threshold)  # Состояние после любого сканирования
+            changes.update(diff_notifications(self.known, notifications))  # Изменения для этого центра
+            changes['snapshot'] = notifications if with_snapshot else None
+            self.known = {(item['kind'], item['object_id']): item for item in notifications}
+            self.finished.emit(changes)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            db.close()
+
+
+class NotificationCenter(QObject):
+    """Уведомления об окончании сроков, обновляемые по таймеру без блокировки интерфейса.
+
+    Сканирование выполняется в отдельном потоке, результат приходит сигналом
+    в поток интерфейса. Центр хранит текущие уведомления и рассылает только
+    изменения: changed - разница сканирования, count_changed - число уведомлений.
+    Запрос обновления во время идущего сканирования не запускает второе.
+    """
+    scan_requested = pyqtSignal(bool)
+    changed = pyqtSignal(dict)
+    count_changed = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, interval_seconds=NOTIFICATION_REFRESH_SECONDS,
+                 days_threshold=NOTIFICATION_DAYS_THRESHOLD, parent=None):
+        super().__init__(parent)
+        self.notifications = {}  # Уведомления по ключу (тип, ID объекта)
+        self.loaded = False  # Первое сканирование завершено
+        self.scanning = False
+
+        self.thread = QThread()
+        self.worker = ExpiryScanWorker(days_threshold)
+        self.worker.moveToThread(self.thread)
+        self.scan_requested.connect(self.worker.scan)  # Вызов уходит в фоновый поток
+        self.worker.finished.connect(self.on_scan_finished)
+        self.worker.failed.connect(self.on_scan_failed)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_seconds * 1000)
+        self.timer.timeout.connect(self.refresh)
+
+    def start(self):
+        self.thread.start()
+        self.timer.start()
+        self.refresh()
+
+    def stop(self):
+        self.timer.stop()
+        self.thread.quit()
+        self.thread.wait()
+
+    def refresh(self):
+        """Запросить сканирование, если оно ещё не идёт"""
+        if self.scanning or not self.thread.isRunning():
+            return
+        self.scanning = True
+        self.scan_requested.emit(not self.loaded)
+
+    def on_scan_finished(self, changes):
+        self.scanning = False
+        if changes['snapshot'] is not None:
+            self.notifications = {(item['kind'], item['object_id']): item for item in changes['snapshot']}
+        for key in changes['removed']:
+            self.notifications.pop(key, None)
+        for item in changes['new'] + changes['changed']:
+            self.notifications[(item['kind'], item['object_id'])] = item
+        self.loaded = True
+        self.changed.emit(changes)
+        self.count_changed.emit(len(self.notifications))
+
+    def on_scan_failed(self, message):
+        self.scanning = False
+        self.failed.emit(message)
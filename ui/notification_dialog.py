@@ -2,21 +2,32 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QPushButton, 
                             QLabel, QListWidget, QListWidgetItem)
 from PyQt6.QtCore import Qt
+from bisect import bisect_left
+from datetime import date
 import sys
 import os
 
 # Добавляем путь для импорта модулей
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import SessionLocal
-from services.license_service import get_expiring_contracts, get_expiring_licenses
-from services.supplier_service import get_supplier_by_id
+from ui.notification_center import NotificationCenter
 
 class NotificationDialog(QDialog):
-    def __init__(self):
+    def __init__(self, center=None):
         super().__init__()
-        self.db = SessionLocal()
+        if center is None:  # Открыт отдельно от главного окна - свой центр уведомлений
+            center = NotificationCenter(parent=self)
+            center.start()
+            self.finished.connect(lambda _: center.stop())
+        self.center = center
+        self.items = {}  # Элементы списка по ключу (тип, ID объекта)
+        self.notifications = {}  # Уведомления по тому же ключу
+        self.order = []  # Ключи сортировки в порядке строк списка
+        self.rendered_for = None  # День, на который посчитаны "через N дней"
+        self.placeholder = None  # Строка "Нет уведомлений"
         self.init_ui()
+        self.center.changed.connect(self.apply_changes)
+        self.center.failed.connect(self.show_error)
         self.load_notifications()
         
     def init_ui(self):
@@ -42,7 +53,7 @@ class NotificationDialog(QDialog):
         """
 
         self.refresh_button = QPushButton("Обновить")
-        self.refresh_button.clicked.connect(self.load_notifications)
+        self.refresh_button.clicked.connect(self.center.refresh)
         self.refresh_button.setStyleSheet(button_style)
         
         layout.addWidget(self.refresh_button)
@@ -50,55 +61,92 @@ class NotificationDialog(QDialog):
         self.setLayout(layout)
         
     def load_notifications(self):
-        """Загрузка уведомлений о заканчивающихся лицензиях и контрактах"""
+        """Заполнить список текущими уведомлениями центра (без обращения к базе)"""
         self.notifications_list.clear()
-        
-        try:
-            notifications = []
-            
-            # 1. Проверка заканчивающихся контрактов (30 дней)
-            expiring_contracts = get_expiring_contracts(self.db, 30)
-            for contract in expiring_contracts:
-                supplier = get_supplier_by_id(self.db, contract['supplier_id'])
-                supplier_name = supplier.name if supplier else f"ID: {contract['supplier_id']}"
-                
-                days_text = "сегодня" if contract['days_until_expiry'] == 0 else f"через {contract['days_until_expiry']} дней"
-                
-                notifications.append({
-                    'type': 'contract',
-                    'title': f'Контракт заканчивается {days_text}',
-                    'message': f"Контракт '{contract['title']}' с поставщиком '{supplier_name}'",
-                    'end_date': contract['end_date'],
-                    'days': contract['days_until_expiry']
-                })
-            
-            # 2. Проверка заканчивающихся лицензий (30 дней)
-            expiring_licenses = get_expiring_licenses(self.db, 30)
-            for license in expiring_licenses:
-                days_text = "сегодня" if license['days_until_expiry'] == 0 else f"через {license['days_until_expiry']} дней"
-                
-                notifications.append({
-                    'type': 'license',
-                    'title': f'Лицензия заканчивается {days_text}',
-                    'message': f"Лицензия на фильм '{license['film_title']}'",
-                    'end_date': license['end_date'],
-                    'days': license['days_until_expiry']
-                })
-            
-            # Сортируем по количеству оставшихся дней
-            notifications.sort(key=lambda x: x['days'])
-            
-            # Отображаем уведомления
-            if not notifications:
-                item = QListWidgetItem("Нет уведомлений")
-                item.setFlags(Qt.ItemFlag.NoItemFlags)
-                self.notifications_list.addItem(item)
-            else:
-                for notification in notifications:
-                    item_text = f"{notification['title']}\n{notification['message']}"
-                    item = QListWidgetItem(item_text)
-                    self.notifications_list.addItem(item)
-                    
-        except Exception as e:
-            error_item = QListWidgetItem(f"Ошибка загрузки уведомлений: {str(e)}")
-            self.notifications_list.addItem(error_item)
+        self.items, self.notifications, self.order = {}, {}, []
+        self.placeholder = None
+        if not self.center.loaded:  # Первое сканирование ещё идёт в фоне
+            self.show_placeholder(True, "Загрузка уведомлений...")
+            return
+        self.notifications_list.setUpdatesEnabled(False)  # Заполняем одним проходом без перерисовок
+        for notification in sorted(self.center.notifications.values(), key=self.sort_key):
+            key = (notification['kind'], notification['object_id'])
+            self.notifications[key] = dict(notification)
+            self.items[key] = QListWidgetItem(self.notification_text(notification))
+            self.notifications_list.addItem(self.items[key])
+            self.order.append(self.sort_key(notification))
+        self.notifications_list.setUpdatesEnabled(True)
+        self.rendered_for = date.today()
+        self.show_placeholder(not self.notifications)
+
+    def apply_changes(self, changes):
+        """Применить к списку только изменения последнего сканирования"""
+        if changes['snapshot'] is not None or self.rendered_for is None:  # Список ещё не заполнен
+            self.load_notifications()
+            return
+        for key in changes['removed']:
+            self.remove_notification(key)
+        for notification in changes['new'] + changes['changed']:
+            self.put_notification(dict(notification))
+        self.refresh_days()
+
+    def refresh_days(self):
+        """Пересчитать "через N дней" при смене дня и показать заглушку для пустого списка"""
+        if self.rendered_for != date.today():
+            self.rendered_for = date.today()
+            for key, notification in self.notifications.items():
+                self.items[key].setText(self.notification_text(notification))
+        self.show_placeholder(not self.notifications)
+
+    def show_error(self, message):
+        self.notifications_list.clear()
+        self.items, self.notifications, self.order = {}, {}, []
+        self.rendered_for = self.placeholder = None
+        self.notifications_list.addItem(QListWidgetItem(f"Ошибка загрузки уведомлений: {message}"))
+
+    def put_notification(self, notification):
+        """Добавить уведомление на своё место по сроку или обновить существующее"""
+        key = (notification['kind'], notification['object_id'])
+        self.remove_notification(key)
+        sort_key = self.sort_key(notification)
+        row = bisect_left(self.order, sort_key)
+        item = QListWidgetItem(self.notification_text(notification))
+        self.notifications_list.insertItem(row + self.placeholder_rows(), item)
+        self.order.insert(row, sort_key)
+        self.items[key] = item
+        self.notifications[key] = notification
+
+    def remove_notification(self, key):
+        item = self.items.pop(key, None)
+        if item is None:
+            return
+        notification = self.notifications.pop(key)
+        self.order.pop(bisect_left(self.order, self.sort_key(notification)))
+        self.notifications_list.takeItem(self.notifications_list.row(item))
+
+    def placeholder_rows(self):
+        return 1 if self.placeholder is not None else 0
+
+    def show_placeholder(self, visible, text="Нет уведомлений"):
+        """Строка-заглушка для пустого списка"""
+        if visible and self.placeholder_rows() == 0:
+            self.placeholder = QListWidgetItem(text)
+            self.placeholder.setFlags(Qt.ItemFlag.NoItemFlags)
+            self.notifications_list.insertItem(0, self.placeholder)
+        elif not visible and self.placeholder_rows():
+            self.notifications_list.takeItem(self.notifications_list.row(self.placeholder))
+            self.placeholder = None
+
+    @staticmethod
+    def sort_key(notification):
+        return notification['end_date'], notification['kind'], notification['object_id']
+
+    @staticmethod
+    def notification_text(notification):
+        days = (notification['end_date'] - date.today()).days  # Не зависит от дня сканирования
+        days_text = "сегодня" if days == 0 else f"через {days} дней"
+        if notification['kind'] == 'contract':
+            supplier_name = notification['related_name'] or f"ID: {notification['related_id']}"
+            return (f"Контракт заканчивается {days_text}\n"
+                    f"Контракт '{notification['name']}' с поставщиком '{supplier_name}'")
+        return f"Лицензия заканчивается {days_text}\nЛицензия на фильм '{notification['name']}'"
@@ -1,6 +1,6 @@
 # UI ФУНКЦИЯ ДЛЯ СОЗДАНИЯ ИНТЕРФЕЙСА ДЛЯ МЕНЕДЖЕРА ПО ЗАКУПКАМ
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton,
-                             QTableWidget, QTableWidgetItem, QHBoxLayout,
+                             QTableView, QAbstractItemView, QHBoxLayout,
                              QMessageBox, QDialog, QFormLayout, QLineEdit,
                              QSpinBox, QDateEdit)
 from PyQt6.QtCore import Qt, QDate
@@ -10,13 +10,39 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import SessionLocal
-from services.supplier_service import create_supplier, get_all_suppliers, delete_supplier
-from services.license_service import create_contract, get_all_contracts, create_license, get_all_licenses
+from services.supplier_service import create_supplier, get_suppliers_page, delete_supplier
+from services.license_service import create_contract, get_contracts_page, create_license, get_licenses_page
 from services.license_service import delete_contract, delete_license
+from ui.table_model import PagedTableModel, TableColumn, format_date
+from ui.task_runner import TaskRunner, TaskProgressBar
+
+# СТОЛБЦЫ ТАБЛИЦ: ПЕРВЫЙ СТОЛБЕЦ - ID, ВТОРОЙ - НАЗВАНИЕ ДЛЯ ПОДТВЕРЖДЕНИЯ УДАЛЕНИЯ
+SUPPLIER_COLUMNS = [
+    TableColumn("ID", lambda supplier: supplier.id),
+    TableColumn("Название", lambda supplier: supplier.name),
+    TableColumn("Контакты", lambda supplier: supplier.contact_info),
+]
+
+CONTRACT_COLUMNS = [
+    TableColumn("ID", lambda contract: contract.id),
+    TableColumn("Название", lambda contract: contract.title),
+    TableColumn("Поставщик", lambda contract: contract.supplier_id),
+    TableColumn("Начало", lambda contract: contract.start_date, format_date),
+    TableColumn("Окончание", lambda contract: contract.end_date, format_date),
+]
+
+LICENSE_COLUMNS = [
+    TableColumn("ID", lambda license_obj: license_obj.id),
+    TableColumn("Фильм", lambda license_obj: license_obj.film_title),
+    TableColumn("Поставщик", lambda license_obj: license_obj.supplier_id),
+    TableColumn("Контракт", lambda license_obj: license_obj.contract_id),
+    TableColumn("Срок", lambda license_obj: f"{format_date(license_obj.start_date)} - {format_date(license_obj.end_date)}"),
+]
 
 class ProcurementMainWindow(QWidget):
     def __init__(self):
         super().__init__()
+        self.runner = TaskRunner(self)  # Запросы к базе выполняются в фоне со своими сессиями
         self.init_ui()
 
     def init_ui(self):
@@ -53,10 +79,14 @@ class ProcurementMainWindow(QWidget):
             self.control_panel.addWidget(btn)
 
         layout.addLayout(self.control_panel)
+        layout.addWidget(TaskProgressBar(self.runner))
 
-        # Таблица
-        self.tableWidget = QTableWidget()
-        layout.addWidget(self.tableWidget)
+        # Таблица: строки читаются страницами по мере прокрутки
+        self.tableView = QTableView()
+        self.tableView.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tableView.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        layout.addWidget(self.tableView)
+        self.model = None
 
         self.setLayout(layout)
 
@@ -88,72 +118,32 @@ class ProcurementMainWindow(QWidget):
 
     def load_suppliers(self):
         """Загрузить поставщиков"""
-        db = SessionLocal()
-        try:
-            suppliers = get_all_suppliers(db)
-            self.tableWidget.setColumnCount(3)
-            self.tableWidget.setHorizontalHeaderLabels(["ID", "Название", "Контакты"])
-            self.tableWidget.setRowCount(len(suppliers))
-
-            for row, supplier in enumerate(suppliers):
-                self.tableWidget.setItem(row, 0, QTableWidgetItem(str(supplier.id)))
-                self.tableWidget.setItem(row, 1, QTableWidgetItem(supplier.name))
-                self.tableWidget.setItem(row, 2, QTableWidgetItem(supplier.contact_info or ""))
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
-        finally:
-            db.close()
+        self.set_model(SUPPLIER_COLUMNS, get_suppliers_page)
 
     def load_contracts(self):
         """Загрузить контракты"""
-        db = SessionLocal()
-        try:
-            contracts = get_all_contracts(db)
-            self.tableWidget.setColumnCount(5)
-            self.tableWidget.setHorizontalHeaderLabels(["ID", "Название", "Поставщик", "Начало", "Окончание"])
-            self.tableWidget.setRowCount(len(contracts))
-
-            for row, contract in enumerate(contracts):
-                self.tableWidget.setItem(row, 0, QTableWidgetItem(str(contract.id)))
-                self.tableWidget.setItem(row, 1, QTableWidgetItem(contract.title))
-                self.tableWidget.setItem(row, 2, QTableWidgetItem(str(contract.supplier_id)))
-                self.tableWidget.setItem(row, 3, QTableWidgetItem(contract.start_date.strftime("%d.%m.%Y")))
-                self.tableWidget.setItem(row, 4, QTableWidgetItem(contract.end_date.strftime("%d.%m.%Y")))
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
-        finally:
-            db.close()
+        self.set_model(CONTRACT_COLUMNS, get_contracts_page)
 
     def load_licenses(self):
         """Загрузить лицензии"""
-        db = SessionLocal()
-        try:
-            licenses = get_all_licenses(db)
-            self.tableWidget.setColumnCount(5)
-            self.tableWidget.setHorizontalHeaderLabels(["ID", "Фильм", "Поставщик", "Контракт", "Срок"])
-            self.tableWidget.setRowCount(len(licenses))
-
-            for row, license_obj in enumerate(licenses):
-                self.tableWidget.setItem(row, 0, QTableWidgetItem(str(license_obj.id)))
-                self.tableWidget.setItem(row, 1, QTableWidgetItem(license_obj.film_title))
-                self.tableWidget.setItem(row, 2, QTableWidgetItem(str(license_obj.supplier_id)))
-                self.tableWidget.setItem(row, 3, QTableWidgetItem(str(license_obj.contract_id)))
-                self.tableWidget.setItem(row, 4, QTableWidgetItem(
-                    f"{license_obj.start_date.strftime('%d.%m.%Y')} - {license_obj.end_date.strftime('%d.%m.%Y')}"
-                ))
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
-        finally:
-            db.close()
+        self.set_model(LICENSE_COLUMNS, get_licenses_page)
+
+    def set_model(self, columns, fetch_page):
+        """Показать в таблице новую постраничную модель и прочитать первую страницу"""
+        old_model = self.model
+        self.model = PagedTableModel(columns, fetch_page, self.runner, parent=self)
+        self.model.failed.connect(self.show_error)
+        self.tableView.setModel(self.model)
+        if old_model is not None:
+            self.runner.cancel(old_model)
+            old_model.deleteLater()
+        self.model.reset()
 
     def get_selected_id(self):
         """Получить ID выбранной строки"""
-        row = self.tableWidget.currentRow()
+        row = self.tableView.currentIndex().row()
         if row >= 0:
-            return int(self.tableWidget.item(row, 0).text())
+            return int(self.model.data(self.model.index(row, 0)))
         return None
 
     def add_item(self):
@@ -175,37 +165,41 @@ class ProcurementMainWindow(QWidget):
             QMessageBox.warning(self, "Ошибка", "Выберите элемент для удаления")
             return
 
-        name = self.tableWidget.item(self.tableWidget.currentRow(), 1).text()
+        name = self.model.data(self.model.index(self.tableView.currentIndex().row(), 1))
 
         reply = QMessageBox.question(self, "Подтверждение",
                                      f"Удалить '{name}'?",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            db = SessionLocal()
-            try:
-                if self.current_mode == "suppliers":
-                    success = delete_supplier(db, item_id)
-                elif self.current_mode == "contracts":
-                    success = delete_contract(db, item_id)
-                else:
-                    success = delete_license(db, item_id)
+            if self.current_mode == "suppliers":
+                delete_function = delete_supplier
+            elif self.current_mode == "contracts":
+                delete_function = delete_contract
+            else:
+                delete_function = delete_license
+            self.runner.submit("delete", delete_function, item_id,
+                               on_result=self.on_deleted, on_error=self.show_error)
+
+    def on_deleted(self, success):
+        if success:
+            QMessageBox.information(self, "Успех", "Элемент удален")
+            self.refresh_data()
+        else:
+            QMessageBox.warning(self, "Ошибка", "Не удалось удалить (элемент не найден)")
 
-                if success:
-                    QMessageBox.information(self, "Успех", "Элемент удален")
-                    self.refresh_data()
-                else:
-                    QMessageBox.warning(self, "Ошибка", "Не удалось удалить (элемент не найден)")
+    def show_error(self, message):
+        QMessageBox.critical(self, "Ошибка", message)
 
-            except Exception as e:
-                QMessageBox.critical(self, "Ошибка", str(e))
-            finally:
-                db.close()
+    def closeEvent(self, event):
+        self.runner.cancel_all()  # Результаты для закрытого окна не нужны
+        super().closeEvent(event)
 
 
 class SupplierDialog(QDialog):
     def __init__(self):
         super().__init__()
+        self.runner = TaskRunner(self)
         self.init_ui()
 
     def init_ui(self):
@@ -222,32 +216,35 @@ class SupplierDialog(QDialog):
         layout.addRow("Контакты:", self.contact_input)
         layout.addRow("Реквизиты:", self.details_input)
 
-        btn_save = QPushButton("💾 Сохранить")
-        btn_save.clicked.connect(self.save)
-        layout.addRow(btn_save)
+        self.btn_save = QPushButton("💾 Сохранить")
+        self.btn_save.clicked.connect(self.save)
+        layout.addRow(self.btn_save)
 
         self.setLayout(layout)
 
     def save(self):
-        db = SessionLocal()
-        try:
-            supplier = create_supplier(
-                db,
-                name=self.name_input.text(),
-                contact_info=self.contact_input.text(),
-                details=self.details_input.text()
-            )
-            QMessageBox.information(self, "Успех", f"Поставщик создан (ID: {supplier.id})")
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
-        finally:
-            db.close()
+        self.btn_save.setEnabled(False)  # Сохранение идёт в фоне
+        self.runner.submit(
+            "save", create_supplier,
+            name=self.name_input.text(),
+            contact_info=self.contact_input.text(),
+            details=self.details_input.text(),
+            on_result=self.on_saved, on_error=self.on_failed
+        )
+
+    def on_saved(self, supplier):
+        QMessageBox.information(self, "Успех", f"Поставщик создан (ID: {supplier.id})")
+        self.accept()
+
+    def on_failed(self, message):
+        self.btn_save.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", message)
 
 
 class ContractDialog(QDialog):
     def __init__(self):
         super().__init__()
+        self.runner = TaskRunner(self)
         self.init_ui()
 
     def init_ui(self):
@@ -272,33 +269,36 @@ class ContractDialog(QDialog):
         layout.addRow("Дата начала:", self.start_date)
         layout.addRow("Дата окончания:", self.end_date)
 
-        btn_save = QPushButton("💾 Сохранить")
-        btn_save.clicked.connect(self.save)
-        layout.addRow(btn_save)
+        self.btn_save = QPushButton("💾 Сохранить")
+        self.btn_save.clicked.connect(self.save)
+        layout.addRow(self.btn_save)
 
         self.setLayout(layout)
 
     def save(self):
-        db = SessionLocal()
-        try:
-            contract = create_contract(
-                db,
-                supplier_id=self.supplier_id.value(),
-                title=self.title.text(),
-                start_date_str=self.start_date.date().toString("yyyy-MM-dd"),
-                end_date_str=self.end_date.date().toString("yyyy-MM-dd")
-            )
-            QMessageBox.information(self, "Успех", f"Контракт создан (ID: {contract.id})")
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
-        finally:
-            db.close()
+        self.btn_save.setEnabled(False)  # Сохранение идёт в фоне
+        self.runner.submit(
+            "save", create_contract,
+            supplier_id=self.supplier_id.value(),
+            title=self.title.text(),
+            start_date_str=self.start_date.date().toString("yyyy-MM-dd"),
+            end_date_str=self.end_date.date().toString("yyyy-MM-dd"),
+            on_result=self.on_saved, on_error=self.on_failed
+        )
+
+    def on_saved(self, contract):
+        QMessageBox.information(self, "Успех", f"Контракт создан (ID: {contract.id})")
+        self.accept()
+
+    def on_failed(self, message):
+        self.btn_save.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", message)
 
 
 class LicenseDialog(QDialog):
     def __init__(self):
         super().__init__()
+        self.runner = TaskRunner(self)
         self.init_ui()
 
     def init_ui(self):
@@ -329,30 +329,32 @@ class LicenseDialog(QDialog):
         layout.addRow("Дата начала:", self.start_date)
         layout.addRow("Дата окончания:", self.end_date)
 
-        btn_save = QPushButton("💾 Сохранить")
-        btn_save.clicked.connect(self.save)
-        layout.addRow(btn_save)
+        self.btn_save = QPushButton("💾 Сохранить")
+        self.btn_save.clicked.connect(self.save)
+        layout.addRow(self.btn_save)
 
         self.setLayout(layout)
 
     def save(self):
-        db = SessionLocal()
-        try:
-            license_obj = create_license(
-                db,
-                supplier_id=self.supplier_id.value(),
-                contract_id=self.contract_id.value(),
-                film_title=self.film_title.text(),
-                digital_key=self.digital_key.text(),
-                start_date_str=self.start_date.date().toString("yyyy-MM-dd"),
-                end_date_str=self.end_date.date().toString("yyyy-MM-dd")
-            )
-            QMessageBox.information(self, "Успех", f"Лицензия создана (ID: {license_obj.id})")
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
-        finally:
-            db.close()
+        self.btn_save.setEnabled(False)  # Сохранение идёт в фоне
+        self.runner.submit(
+            "save", create_license,
+            supplier_id=self.supplier_id.value(),
+            contract_id=self.contract_id.value(),
+            film_title=self.film_title.text(),
+            digital_key=self.digital_key.text(),
+            start_date_str=self.start_date.date().toString("yyyy-MM-dd"),
+            end_date_str=self.end_date.date().toString("yyyy-MM-dd"),
+            on_result=self.on_saved, on_error=self.on_failed
+        )
+
+    def on_saved(self, license_obj):
+        QMessageBox.information(self, "Успех", f"Лицензия создана (ID: {license_obj.id})")
+        self.accept()
+
+    def on_failed(self, message):
+        self.btn_save.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", message)
 
     def delete_item(self):
         """Удалить выбранный элемент"""
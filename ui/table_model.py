@@ -0,0 +1,136 @@
+# UI ФУНКЦИЯ ДЛЯ ПОСТРАНИЧНОЙ МОДЕЛИ ТАБЛИЦ И ОБЩИХ ФОРМАТОВ СТОЛБЦОВ
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from typing import Any, Callable, List, NamedTuple, Optional
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pagination import DEFAULT_PAGE_SIZE
+
+# ФОРМАТЫ ЗНАЧЕНИЙ СТОЛБЦОВ
+
+def format_text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def format_date(value) -> str:
+    return value.strftime("%d.%m.%Y") if value else ""
+
+
+def format_datetime(value) -> str:
+    return value.strftime("%d.%m.%Y %H:%M") if value else ""
+
+
+def format_time(value) -> str:
+    return value.strftime("%H:%M") if value else ""
+
+
+def format_money(value) -> str:
+    return f"{value or 0:.2f} руб."
+
+
+def format_minutes(value) -> str:
+    return f"{value} мин" if value is not None else ""
+
+
+def truncate(length: int) -> Callable[[Any], str]:  # Формат длинного текста с многоточием
+    def format_truncated(value) -> str:
+        value = value or ""
+        return value[:length] + "..." if len(value) > length else value
+    return format_truncated
+
+
+class TableColumn(NamedTuple):
+    """Столбец таблицы: заголовок, значение из строки данных и формат значения"""
+    header: str
+    value: Callable[[Any], Any]
+    formatter: Callable[[Any], str] = format_text
+
+
+class PagedTableModel(QAbstractTableModel):
+    """Модель таблицы, которая читает строки страницами по мере прокрутки.
+
+    fetch_page(db, cursor, limit) - страничная функция сервиса, возвращающая
+    Page; она выполняется в фоне через TaskRunner. При открытии читается
+    только первая страница, следующие - когда представление дошло до конца
+    загруженных строк (canFetchMore/fetchMore). Ячейки форматируются при
+    отрисовке, поэтому стоимость зависит от видимых строк, а не от размера таблицы.
+    """
+    failed = pyqtSignal(str)  # Ошибка чтения страницы
+
+    def __init__(self, columns: List[TableColumn], fetch_page: Optional[Callable] = None, runner=None,
+                 page_size: int = DEFAULT_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.runner = runner
+        self.page_size = page_size
+        self.rows = []
+        self.cursor = None
+        self.loading = False  # Страница уже запрошена
+        self.exhausted = fetch_page is None  # Все строки уже загружены
+
+    @classmethod
+    def from_rows(cls, columns: List[TableColumn], rows: List[Any], parent=None) -> "PagedTableModel":  # Модель для готового списка
+        model = cls(columns, parent=parent)
+        model.rows = list(rows)
+        return model
+
+    def reset(self) -> None:
+        """Сбросить загруженные строки и прочитать первую страницу заново"""
+        self.beginResetModel()
+        if self.loading:
+            self.runner.cancel(self)  # Страница старого списка уже не нужна
+        self.rows, self.cursor = [], None
+        self.loading = False
+        self.exhausted = self.fetch_page is None
+        self.endResetModel()
+        self.fetchMore()
+
+    def row_at(self, row: int) -> Optional[Any]:  # Строка данных по номеру строки таблицы
+        return self.rows[row] if 0 <= row < len(self.rows) else None
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        column = self.columns[index.column()]
+        return column.formatter(column.value(self.rows[index.row()]))
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.columns[section].header
+        return section + 1
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self.exhausted and not self.loading
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid() or self.exhausted or self.loading:
+            return
+        self.loading = True
+        self.runner.submit(self, self.fetch_page, self.cursor, self.page_size,
+                           on_result=self.append_page, on_error=self.on_fetch_failed)
+
+    def on_fetch_failed(self, message):
+        self.loading = False
+        self.exhausted = True
+        self.failed.emit(message)
+
+    def append_page(self, page) -> None:
+        """Добавить прочитанную страницу в конец таблицы"""
+        self.loading = False
+        self.cursor = page.next_cursor
+        self.exhausted = page.next_cursor is None
+        if page.items:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page.items) - 1)
+            self.rows.extend(page.items)
+            self.endInsertRows()
@@ -0,0 +1,175 @@
+# ВЫПОЛНЕНИЕ ВЫЗОВОВ СЕРВИСОВ В ПУЛЕ ПОТОКОВ БЕЗ БЛОКИРОВКИ ИНТЕРФЕЙСА
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtWidgets import QProgressBar
+from itertools import count
+import threading
+import sys
+import os
+
+# Добавляем путь для импорта модулей
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+
+# Запущенные задачи по ID: ссылка держит задачу до конца выполнения, даже если окно уже закрыто
+_active_tasks = {}
+
+
+def _release_task(task_id, ok=None, payload=None):
+    _active_tasks.pop(task_id, None)
+
+
+class TaskSignals(QObject):
+    """Сигналы задачи: создаются в потоке интерфейса и доставляются в него очередью"""
+    progress = pyqtSignal(int, int)  # (ID задачи, процент)
+    done = pyqtSignal(int, bool, object)  # (ID задачи, успех, результат или текст ошибки)
+
+
+class ServiceTask(QRunnable):
+    """Вызов function(db, *args, **kwargs) в потоке пула со своей сессией"""
+
+    def __init__(self, task_id, function, args, kwargs, with_progress=False):
+        super().__init__()
+        self.setAutoDelete(False)  # Задачей владеет TaskRunner до получения результата
+        self.task_id = task_id
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.with_progress = with_progress
+        self.cancelled = threading.Event()
+        self.signals = TaskSignals()
+
+    def run(self):
+        if self.cancelled.is_set():  # Запрос отменён, пока задача ждала поток
+            self.signals.done.emit(self.task_id, False, None)
+            return
+        kwargs = dict(self.kwargs)
+        if self.with_progress:
+            kwargs['progress'] = lambda percent: self.signals.progress.emit(self.task_id, int(percent))
+        db = SessionLocal()  # Сессия не разделяется между потоками
+        try:
+            result = self.function(db, *self.args, **kwargs)
+        except Exception as e:
+            db.rollback()
+            self.signals.done.emit(self.task_id, False, str(e))
+        else:
+            self.signals.done.emit(self.task_id, True, result)
+        finally:
+            db.close()
+
+
+class _PendingTask:
+    def __init__(self, key, signature, runnable):
+        self.key = key
+        self.signature = signature
+        self.runnable = runnable
+        self.callbacks = []  # Пары (on_result, on_error) всех объединённых запросов
+
+
+class TaskRunner(QObject):
+    """Запуск сервисных функций в QThreadPool с результатом в потоке интерфейса.
+
+    Запросы различаются ключом (например, "report"): новый запрос с тем же
+    ключом, но другими аргументами отменяет предыдущий, и его результат уже не
+    придёт, а такой же запрос во время выполнения не запускается повторно -
+    колбэки получат результат уже идущей задачи. Функция получает собственную
+    сессию первым аргументом; результат - строки чтения (models.read_models)
+    или ORM-объекты только с загруженными столбцами: ленивые связи после
+    закрытия сессии недоступны.
+    """
+    busy_changed = pyqtSignal(bool)
+    progress = pyqtSignal(object, int)  # (ключ, процент)
+
+    _ids = count(1)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.tasks = {}  # Выполняемые задачи по ID
+        self.current = {}  # ID последнего запроса по ключу
+        self.busy = False  # Есть запросы, результат которых ещё ждут
+
+    def submit(self, key, function, *args, on_result=None, on_error=None, with_progress=False, **kwargs) -> int:
+        """Выполнить function(db, *args, **kwargs) в фоне, вернуть ID задачи"""
+        signature = (function, args, kwargs)
+        task_id = self.current.get(key)
+        if task_id is not None:
+            task = self.tasks[task_id]
+            if task.signature == signature:  # Такой же запрос уже выполняется - ждём его результат
+                task.callbacks.append((on_result, on_error))
+                return task_id
+            self.cancel(key)  # Запрос устарел
+
+        task_id = next(self._ids)
+        runnable = ServiceTask(task_id, function, args, kwargs, with_progress)
+        runnable.signals.done.connect(self.on_task_done)
+        runnable.signals.done.connect(_release_task)
+        runnable.signals.progress.connect(self.on_task_progress)
+        task = _PendingTask(key, signature, runnable)
+        task.callbacks.append((on_result, on_error))
+        self.tasks[task_id] = task
+        self.current[key] = task_id
+        _active_tasks[task_id] = runnable
+        self.pool.start(runnable)
+        self.update_busy()
+        return task_id
+
+    def cancel(self, key) -> None:
+        """Отменить запрос по ключу: результат не будет доставлен"""
+        task_id = self.current.pop(key, None)
+        if task_id is None:
+            return
+        task = self.tasks[task_id]
+        task.runnable.cancelled.set()
+        if self.pool.tryTake(task.runnable):  # Ещё не начата - убираем из очереди
+            del self.tasks[task_id]
+            _release_task(task_id)
+        self.update_busy()
+
+    def cancel_all(self) -> None:
+        for key in list(self.current):
+            self.cancel(key)
+
+    def update_busy(self):
+        busy = bool(self.current)
+        if busy != self.busy:
+            self.busy = busy
+            self.busy_changed.emit(busy)
+
+    def on_task_progress(self, task_id, percent):
+        task = self.tasks.get(task_id)
+        if task is not None and self.current.get(task.key) == task_id:
+            self.progress.emit(task.key, percent)
+
+    def on_task_done(self, task_id, ok, payload):
+        task = self.tasks.pop(task_id, None)
+        if task is None or self.current.get(task.key) != task_id:  # Отменённые задачи молча завершаются
+            return
+        del self.current[task.key]
+        self.update_busy()
+        for on_result, on_error in task.callbacks:
+            if ok and on_result is not None:
+                on_result(payload)
+            elif not ok and on_error is not None:
+                on_error(payload)
+
+
+class TaskProgressBar(QProgressBar):
+    """Индикатор выполнения фоновых запросов окна: бегущий, пока процент неизвестен"""
+
+    def __init__(self, runner, parent=None):
+        super().__init__(parent)
+        self.setMaximumHeight(8)
+        self.setTextVisible(False)
+        self.setRange(0, 0)
+        self.hide()
+        runner.busy_changed.connect(self.on_busy_changed)
+        runner.progress.connect(self.on_progress)
+
+    def on_busy_changed(self, busy):
+        self.setRange(0, 0)
+        self.setVisible(busy)
+
+    def on_progress(self, key, percent):
+        self.setRange(0, 100)
+        self.setValue(percent)
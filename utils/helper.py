@@ -16,4 +16,22 @@ def parse_date(datetime_str: str) -> datetime.date:
         except ValueError:
             continue
 
-    raise ValueError(f"Некорректный формат даты/времени: {datetime_str}. Используйте YYYY-MM-DD HH:MM или YYYY-MM-DD")
\ No newline at end of file
+    raise ValueError(f"Некорректный формат даты/времени: {datetime_str}. Используйте YYYY-MM-DD HH:MM или YYYY-MM-DD")
+
+
+def parse_datetime(datetime_str: str) -> datetime.datetime:
+    """Парсинг даты и времени с сохранением времени (без времени - начало дня)"""
+    formats = [
+        "%Y-%m-%d %H:%M",  # 2025-12-15 20:45
+        "%Y-%m-%d",  # 2025-12-15
+        "%d.%m.%Y %H:%M",  # 15.12.2025 20:45
+        "%d.%m.%Y"  # 15.12.2025
+    ]
+
+    for fmt in formats:
+        try:
+            return datetime.datetime.strptime(datetime_str, fmt)
+        except ValueError:
+            continue
+
+    raise ValueError(f"Некорректный формат даты/времени: {datetime_str}. Используйте YYYY-MM-DD HH:MM или YYYY-MM-DD")
@@ -0,0 +1,43 @@
+# ДОПОЛНИТЕЛЬНАЯ ФУНКЦИЯ ДЛЯ ПОСТРАНИЧНОЙ ВЫБОРКИ ПО КЛЮЧУ (KEYSET)
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_, literal
+
+from utils.validators import validate_limit
+
+DEFAULT_PAGE_SIZE = 200  # Строк на страницу по умолчанию
+
+
+class Page(NamedTuple):
+    """Страница выборки: строки, курсор следующей страницы (None - дальше строк нет)
+    и общее число строк выборки, если его запросили"""
+    items: List[Any]
+    next_cursor: Optional[Tuple]
+    total: Optional[int] = None
+
+
+def keyset_page(query, order_columns: Sequence, cursor: Optional[Tuple], limit: Optional[int],
+                key: Callable[[Any], Tuple], descending: bool = False, with_total: bool = False) -> Page:
+    """Страница запроса после cursor в порядке order_columns.
+
+    Вместо OFFSET следующая страница начинается условием (столбцы) > (курсор),
+    поэтому чтение любой страницы - диапазон по индексу без пропуска
+    предыдущих строк. Последним столбцом должен быть уникальный ключ (обычно
+    id), key возвращает значения order_columns для строки результата.
+    Без limit возвращаются все оставшиеся строки одним запросом. with_total
+    добавляет отдельный COUNT по всей выборке - он дороже самой страницы,
+    поэтому считается только по запросу.
+    """
+    if limit is not None:
+        validate_limit(limit)
+    total = query.order_by(None).count() if with_total else None
+    if cursor is not None:
+        bound = tuple_(*[literal(value, column.type) for column, value in zip(order_columns, cursor)])
+        columns = tuple_(*order_columns)
+        query = query.filter(columns < bound if descending else columns > bound)
+    ordering = [column.desc() for column in order_columns] if descending else list(order_columns)
+    if limit is None:
+        return Page(query.order_by(*ordering).all(), None, total)
+    rows = query.order_by(*ordering).limit(limit + 1).all()  # Лишняя строка показывает, есть ли продолжение
+    items = rows[:limit]
+    return Page(items, key(items[-1]) if len(rows) > limit else None, total)
@@ -0,0 +1,341 @@
+# ДОПОЛНИТЕЛЬНАЯ ФУНКЦИЯ ДЛЯ ПРОФИЛИРОВАНИЯ SQL-ЗАПРОСОВ СЕРВИСОВ
+"""Счётчики SQL-запросов по сервисным функциям.
+
+Профилировщик подключается к движку слушателями before/after_cursor_execute
+и для каждого запроса записывает время выполнения, число строк и функцию,
+которая его выполнила. Функция берётся из profile_scope/@profiled, а без них -
+самый внешний кадр стека из пакета services. Одинаковые SELECT, повторённые
+за один вызов не меньше n_plus_one_threshold раз, отмечаются как вероятный N+1.
+
+    profiler.attach()              # database._engine
+    ...
+    print(profiler.report())
+    profiler.dump_json("queries.json")
+
+Для тестов: pytest_plugins = ["utils.query_profiler"] и фикстура
+service_query_budget:
+
+    def test_list(service_query_budget, db):
+        with service_query_budget(2, list_screenings):
+            list_screenings(db)
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Union
+import json
+import re
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import pytest
+except ImportError:  # pytest нужен только для фикстуры бюджета запросов
+    pytest = None
+
+N_PLUS_ONE_THRESHOLD = 5  # Одинаковых SELECT за вызов, после которых запрос считается N+1
+OUTSIDE_SERVICES = "<вне сервисов>"  # Запросы, выполненные не из пакета services
+
+_SERVICE_PACKAGE = "services."
+_START_KEY = "query_profiler_start"  # Время начала запросов в conn.info
+_WHITESPACE = re.compile(r"\s+")
+_PARAM_LIST = re.compile(r"\(\?(?:, \?)+\)")  # IN (?, ?, ...) разной длины - одна форма
+
+
+def statement_shape(statement: str) -> str:  # Форма запроса: текст без различий в пробелах и длине списков
+    return _PARAM_LIST.sub("(?...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def function_name(function: Callable) -> str:  # Имя функции в отчёте: модуль.функция
+    return f"{function.__module__}.{function.__qualname__}"
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def _service_frame():  # Самый внешний кадр сервисной функции в стеке текущего потока
+    found = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").startswith(_SERVICE_PACKAGE):
+            found = frame
+        frame = frame.f_back
+    return found
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals['__name__']}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class FunctionStats:
+    """Накопленная статистика запросов одной функции"""
+
+    def __init__(self):
+        self.calls = 0
+        self.statements = 0
+        self.max_statements = 0  # Наибольшее число запросов за один вызов
+        self.rows = 0  # Прочитанные и изменённые строки
+        self.latencies = []  # Время запросов, мс
+        self.n_plus_one = {}  # Форма SELECT -> наибольшее число повторов за вызов
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'statements': self.statements,
+            'max_statements_per_call': self.max_statements,
+            'rows': self.rows,
+            'total_ms': round(sum(self.latencies), 3),
+            'p50_ms': round(_percentile(self.latencies, 0.5), 3),
+            'p95_ms': round(_percentile(self.latencies, 0.95), 3),
+            'max_ms': round(max(self.latencies, default=0.0), 3),
+            'n_plus_one': [{'statement': shape, 'repeats': repeats}
+                           for shape, repeats in sorted(self.n_plus_one.items(), key=lambda item: -item[1])]
+        }
+
+
+class _Call:
+    """Один вызов функции: запросы этого вызова для поиска N+1"""
+    __slots__ = ('name', 'frame', 'statements', 'shapes')
+
+    def __init__(self, name: str, frame=None):
+        self.name = name
+        self.frame = frame  # Кадр стека для вызовов, определённых без profile_scope
+        self.statements = 0
+        self.shapes = {}  # Форма SELECT -> число выполнений
+
+
+class _CountingFetch:
+    """Обёртка стратегии чтения курсора: считает строки, которые вызывающий код прочитал"""
+
+    def __init__(self, strategy, stats: FunctionStats, lock):
+        self.strategy = strategy
+        self.stats = stats
+        self.lock = lock
+
+    def add_rows(self, rows: int) -> None:
+        with self.lock:
+            self.stats.rows += rows
+
+    def fetchone(self, result, dbapi_cursor, hard_close=False):
+        row = self.strategy.fetchone(result, dbapi_cursor, hard_close)
+        if row is not None:
+            self.add_rows(1)
+        return row
+
+    def fetchmany(self, result, dbapi_cursor, size=None):
+        rows = self.strategy.fetchmany(result, dbapi_cursor, size)
+        self.add_rows(len(rows))
+        return rows
+
+    def fetchall(self, result, dbapi_cursor):
+        rows = self.strategy.fetchall(result, dbapi_cursor)
+        self.add_rows(len(rows))
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self.strategy, name)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Функция выполнила больше запросов, чем разрешено бюджетом"""
+
+
+class QueryProfiler:
+    """Статистика SQL-запросов по функциям для движка или класса Engine"""
+
+    _ids = count(1)
+
+    def __init__(self, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.functions = {}  # Имя функции -> FunctionStats
+        self.lock = threading.Lock()
+        self.targets = []  # Движки, к которым подключены слушатели
+        self.implicit = {}  # ID потока -> вызов, определённый по стеку
+        profiler_id = next(self._ids)
+        self.scope_call = ContextVar(f"query_profiler_scope_{profiler_id}", default=None)
+        self.budgets = ContextVar(f"query_profiler_budgets_{profiler_id}", default=())
+
+    # ПОДКЛЮЧЕНИЕ К ДВИЖКУ
+
+    def attach(self, target=None) -> "QueryProfiler":
+        """Подключить слушатели к движку (по умолчанию database._engine) или ко всем движкам (Engine)"""
+        if target is None:
+            from database import _engine
+            target = _engine
+        if target not in self.targets:
+            event.listen(target, "before_cursor_execute", self.before_cursor_execute)
+            event.listen(target, "after_cursor_execute", self.after_cursor_execute)
+            event.listen(target, "after_execute", self.after_execute)
+            self.targets.append(target)
+        return self
+
+    def detach(self) -> None:
+        """Отключить слушатели и закрыть незавершённые вызовы"""
+        for target in self.targets:
+            event.remove(target, "before_cursor_execute", self.before_cursor_execute)
+            event.remove(target, "after_cursor_execute", self.after_cursor_execute)
+            event.remove(target, "after_execute", self.after_execute)
+        self.targets = []
+        self.flush()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.functions = {}
+            self.implicit = {}
+
+    # ГРАНИЦЫ ВЫЗОВОВ
+
+    @contextmanager
+    def scope(self, name: str):
+        """Считать запросы блока одним вызовом функции name"""
+        call = _Call(name)
+        token = self.scope_call.set(call)
+        try:
+            yield call
+        finally:
+            self.scope_call.reset(token)
+            self.finish(call)
+
+    def profiled(self, function: Callable) -> Callable:
+        """Декоратор: каждый вызов функции - отдельный вызов в статистике"""
+        name = function_name(function)
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.scope(name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    @contextmanager
+    def budget(self, max_statements: int, function: Union[Callable, str, None] = None):
+        """Проверить, что блок (или функция внутри него) выполнил не больше max_statements запросов"""
+        if not self.targets:
+            self.attach()
+        name = function if function is None or isinstance(function, str) else function_name(function)
+        statements = []  # Формы запросов, попавших в бюджет
+        token = self.budgets.set(self.budgets.get() + ((name, statements),))
+        try:
+            yield statements
+        finally:
+            self.budgets.reset(token)
+        if len(statements) > max_statements:
+            listing = "\n".join(f"  {shape}" for shape in statements)
+            raise QueryBudgetExceeded(f"{name or 'Блок'}: {len(statements)} запросов при бюджете "
+                                      f"{max_statements}:\n{listing}")
+
+    def current_call(self) -> _Call:
+        call = self.scope_call.get()
+        if call is not None:
+            return call
+        frame = _service_frame()
+        thread_id = threading.get_ident()
+        call = self.implicit.get(thread_id)
+        if call is not None and call.frame is frame:
+            return call
+        if call is not None:  # Предыдущий вызов сервиса в этом потоке закончился
+            self.finish(call)
+        call = _Call(OUTSIDE_SERVICES if frame is None else _frame_name(frame), frame)
+        self.implicit[thread_id] = call
+        return call
+
+    def finish(self, call: _Call) -> None:
+        stats = self.stats_for(call.name)
+        with self.lock:
+            stats.calls += 1
+            stats.max_statements = max(stats.max_statements, call.statements)
+            for shape, repeats in call.shapes.items():
+                if repeats >= self.n_plus_one_threshold:
+                    stats.n_plus_one[shape] = max(stats.n_plus_one.get(shape, 0), repeats)
+
+    def flush(self) -> None:
+        """Закрыть вызовы, определённые по стеку: их конец виден только по следующему запросу"""
+        with self.lock:
+            calls, self.implicit = list(self.implicit.values()), {}
+        for call in calls:
+            self.finish(call)
+
+    def stats_for(self, name: str) -> FunctionStats:
+        with self.lock:
+            stats = self.functions.get(name)
+            if stats is None:
+                stats = self.functions[name] = FunctionStats()
+            return stats
+
+    # СЛУШАТЕЛИ СОБЫТИЙ ДВИЖКА
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info[_START_KEY].pop()) * 1000
+        call = self.current_call()
+        shape = statement_shape(statement)
+        stats = self.stats_for(call.name)
+        with self.lock:
+            stats.statements += 1
+            stats.latencies.append(elapsed_ms)
+            if cursor.description is None and cursor.rowcount > 0:  # Изменённые строки
+                stats.rows += cursor.rowcount
+        call.statements += 1
+        if shape.startswith("SELECT"):
+            call.shapes[shape] = call.shapes.get(shape, 0) + 1
+        for name, statements in self.budgets.get():
+            if name is None or name == call.name:
+                statements.append(shape)
+        if context is not None:
+            context.query_profiler_stats = stats
+
+    def after_execute(self, conn, clauseelement, multiparams, params, execution_options, result):
+        stats = getattr(result.context, "query_profiler_stats", None)
+        if stats is not None and result.returns_rows:  # Строки SELECT считаются по мере чтения
+            result.cursor_strategy = _CountingFetch(result.cursor_strategy, stats, self.lock)
+
+    # ОТЧЁТЫ
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Статистика по функциям, самые долгие первыми"""
+        self.flush()
+        with self.lock:
+            items = [(name, stats.as_dict()) for name, stats in self.functions.items()]
+        return dict(sorted(items, key=lambda item: -item[1]['total_ms']))
+
+    def report(self) -> str:
+        """Текстовый отчёт для консоли"""
+        lines = ["ЗАПРОСЫ ПО ФУНКЦИЯМ"]
+        for name, stats in self.as_dict().items():
+            lines.append(f"{name}: вызовов {stats['calls']}, запросов {stats['statements']} "
+                         f"(до {stats['max_statements_per_call']} за вызов), {stats['total_ms']:.1f} мс, "
+                         f"p50 {stats['p50_ms']:.2f} мс, p95 {stats['p95_ms']:.2f} мс, строк {stats['rows']}")
+            for item in stats['n_plus_one']:
+                lines.append(f"    вероятный N+1, {item['repeats']} повторов: {item['statement'][:200]}")
+        return "\n".join(lines)
+
+    def dump_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, ensure_ascii=False, indent=2)
+
+
+# Общий профилировщик приложения: подключается явно через attach()
+profiler = QueryProfiler()
+profiled = profiler.profiled
+profile_scope = profiler.scope
+query_budget = profiler.budget
+
+
+if pytest is not None:
+    @pytest.fixture
+    def service_query_budget():
+        """Бюджет запросов для теста: service_query_budget(max_statements, function=None)"""
+        test_profiler = QueryProfiler().attach(Engine)  # Все движки, включая тестовые
+        yield test_profiler.budget
+        test_profiler.detach()
@@ -0,0 +1,366 @@
+# ДОПОЛНИТЕЛЬНАЯ ФУНКЦИЯ ДЛЯ ГЕНЕРАЦИИ СИНТЕТИЧЕСКИХ ДАННЫХ
+"""Детерминированный набор данных кинотеатра для замеров производительности.
+
+Масштаб 1 - год работы одной площадки: 6 залов по 5 показов в день, 150
+фильмов с лицензиями, 40 поставщиков с контрактами, заказами, оценками KPI,
+около 670 тысяч проданных билетов и претензии к части из них. Масштаб N
+умножает залы, фильмы, поставщиков и заказы в N раз при том же годе.
+
+Год - это 351 прошедший день до anchor и 14 дней расписания после него.
+Прошедшие показы хранят только проданные билеты. Будущие показы хранят
+билет на каждое место, а каждый SEAT_MAP_EVERY-й из них - карту мест и
+билеты только проданных мест. Все продажи совершены до начала дня anchor.
+Одинаковые seed, масштаб и anchor дают одинаковую базу.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import json
+import random
+import sys
+import os
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import create_db_engine, init_db
+from models.supplier import Supplier, SupplyType, supplier_supply_type
+from models.license import Contract, License
+from models.cinema import Film, Hall, Screening, Ticket, SeatMap
+from models.procurement import OrderSupliers, OrderClients, OrderItem
+from models.analytics import SupplierKPI, Complaint
+from utils.validators import validate_positive_int
+
+# МАСШТАБЫ НАБОРА ДАННЫХ
+SCALES = {"1x": 1, "10x": 10, "100x": 100}
+
+# Количество сущностей на единицу масштаба
+PER_SCALE = {
+    "halls": 6,
+    "films": 150,
+    "suppliers": 40,
+    "contracts": 80,
+    "supplier_orders": 400,
+}
+
+DAYS_BEFORE = 351  # Прошедшие дни года до anchor
+DAYS_AFTER = 14  # Дни расписания после anchor
+SHOW_TIMES = (time(10, 0), time(13, 0), time(16, 0), time(19, 0), time(22, 0))  # Сеансы зала за день
+SHOW_PRICES = (250.0, 300.0, 350.0, 450.0, 400.0)  # Базовая цена по сеансам
+SEAT_MAP_EVERY = 4  # Каждый N-й будущий показ хранит места картой
+COMPLAINT_RATE = 0.001  # Доля проданных билетов с претензией
+BATCH_ROWS = 20000  # Строк на одну массовую вставку
+
+SUPPLY_TYPES = (
+    ("кино", "Прокат фильмов"),
+    ("товары", "Продукция для бара"),
+    ("услуги", "Уборка и обслуживание"),
+    ("реклама", "Рекламные материалы"),
+    ("оборудование", "Проекционное и звуковое оборудование"),
+)
+_FILM_WORDS = ("Тень", "Город", "Последний", "Рассвет", "Ночной", "Дорога", "Звезда", "Море", "Тайна", "Север",
+               "Огонь", "Время", "Остров", "Песня", "Граница", "Сердце", "Ветер", "Небо", "Путь", "Дом")
+_SUPPLIER_WORDS = ("Кино", "Прокат", "Медиа", "Фильм", "Сервис", "Снаб", "Техно", "Арт", "Вектор", "Альфа")
+_FIRST_NAMES = ("Анна", "Иван", "Мария", "Олег", "Елена", "Павел", "Ольга", "Сергей", "Наталья", "Дмитрий")
+_LAST_NAMES = ("Иванов", "Смирнов", "Кузнецов", "Попов", "Волков", "Соколов", "Лебедев", "Козлов", "Новиков")
+_PRODUCTS = ("Попкорн", "Напитки", "Стаканы", "Лампа проектора", "Очки 3D", "Афиши", "Чистящие средства")
+_ORDER_STATUSES = ("создан", "в процессе", "доставлен", "доставлен", "доставлен", "отменен")
+_COMPLAINT_STATUSES = ("на рассмотрении", "решён", "решён", "не решён")
+_COMPLAINTS = ("Не работал кондиционер", "Плохой звук", "Сеанс начался с опозданием", "Грязный зал",
+               "Ошибка в билете")
+
+
+def dataset_plan(scale: int) -> Dict[str, int]:  # Количество основных сущностей для масштаба
+    validate_positive_int(scale, "Масштаб")
+    plan = {name: count * scale for name, count in PER_SCALE.items()}
+    plan["screenings"] = plan["halls"] * len(SHOW_TIMES) * (DAYS_BEFORE + DAYS_AFTER)
+    return plan
+
+
+def populate(db: Session, scale: int = 1, seed: int = 0, anchor: Optional[date] = None,
+             progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:  # Заполнить пустую базу
+    """Заполнить пустую базу набором масштаба scale, вернуть число строк по таблицам.
+
+    Строки вставляются массово с заранее назначенными ID и фиксируются
+    пачками, поэтому память почти не зависит от масштаба. anchor - "сегодня"
+    набора (по умолчанию текущая дата): сервисы, которые считают от текущей
+    даты, видят в нём прошлое и будущее расписание.
+    """
+    plan = dataset_plan(scale)
+    if db.query(Supplier.id).first() is not None:
+        raise ValueError("База уже содержит данные, синтетический набор создаётся только в пустой базе")  # Ошибка
+    generator = _Generator(db, plan, random.Random(seed), anchor or date.today(), progress)
+    generator.run()
+
+    from services.sales_rollup_service import rebuild_sales_rollup
+    rebuild_sales_rollup(db)  # Дневные итоги по проданным билетам
+    return generator.counts
+
+
+def create_dataset(url: str, scale: int = 1, seed: int = 0, anchor: Optional[date] = None,
+                   progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:  # Создать базу с набором данных
+    """Создать схему в базе url и заполнить её набором масштаба scale"""
+    engine = create_db_engine(url, profile="bulk_import")  # Один писатель без fsync
+    try:
+        init_db(engine)
+        with Session(engine) as db:
+            return populate(db, scale, seed, anchor, progress)
+    finally:
+        engine.dispose()
+
+
+class _Generator:
+    """Построчная генерация набора с вставкой и фиксацией пачками"""
+
+    def __init__(self, db: Session, plan: Dict[str, int], rng: random.Random, anchor: date,
+                 progress: Optional[Callable[[int], None]]):
+        self.db = db
+        self.plan = plan
+        self.rng = rng
+        self.anchor = anchor
+        self.midnight = datetime.combine(anchor, time.min)  # Все продажи раньше этого момента
+        self.first_day = anchor - timedelta(days=DAYS_BEFORE)
+        self.progress = progress
+        self.counts = {}  # Таблица -> число вставленных строк
+        self.pending = {}  # Таблица -> строки, ожидающие вставки
+        self.next_ids = {}  # Таблица -> следующий ID
+
+    def run(self) -> None:
+        self.suppliers()
+        self.contracts()
+        self.films_and_licenses()
+        self.halls()
+        self.report(5)
+        self.screenings_and_tickets()
+        self.supplier_orders()
+        self.scores()
+        self.flush()
+        self.report(100)
+
+    # ВСТАВКА ПАЧКАМИ
+
+    def new_id(self, table) -> int:
+        self.next_ids[table] = self.next_ids.get(table, 0) + 1
+        return self.next_ids[table]
+
+    def add(self, table, row: Dict[str, Any]) -> None:
+        rows = self.pending.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= BATCH_ROWS:
+            self.flush_table(table)
+
+    def flush_table(self, table) -> None:
+        rows = self.pending.pop(table, [])
+        if rows:
+            self.db.execute(insert(table), rows)  # Одна массовая вставка на пачку
+            self.db.commit()  # Журнал WAL не растёт на весь набор
+            self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def flush(self) -> None:
+        for table in list(self.pending):  # Порядок добавления соблюдает внешние ключи
+            self.flush_table(table)
+
+    def report(self, percent: int) -> None:
+        if self.progress is not None:
+            self.progress(percent)
+
+    # ПОСТАВЩИКИ, КОНТРАКТЫ, ЛИЦЕНЗИИ
+
+    def suppliers(self) -> None:
+        rng = self.rng
+        for name, description in SUPPLY_TYPES:
+            self.add(SupplyType.__table__, {"id": self.new_id(SupplyType.__table__), "name": name,
+                                            "description": description})
+        self.distributors = []  # Поставщики фильмов
+        for _ in range(self.plan["suppliers"]):
+            supplier_id = self.new_id(Supplier.__table__)
+            self.add(Supplier.__table__, {
+                "id": supplier_id,
+                "name": f"ООО «{rng.choice(_SUPPLIER_WORDS)}{rng.choice(_SUPPLIER_WORDS).lower()}» {supplier_id}",
+                "contact_info": f"+7 9{rng.randrange(10**9):09d}",
+                "details": f"ИНН {rng.randrange(10**10):010d}",
+            })
+            type_ids = {1} if supplier_id % 5 < 2 else {rng.randint(2, len(SUPPLY_TYPES))}  # 40% - прокатчики
+            if rng.random() < 0.3:
+                type_ids.add(rng.randint(2, len(SUPPLY_TYPES)))
+            for type_id in sorted(type_ids):
+                self.add(supplier_supply_type, {"supplier_id": supplier_id, "supply_type_id": type_id})
+            if 1 in type_ids:
+                self.distributors.append(supplier_id)
+
+    def contracts(self) -> None:
+        rng = self.rng
+        self.contracts_by_supplier = {}
+        supplier_ids = list(range(1, self.plan["suppliers"] + 1))
+        for index in range(self.plan["contracts"]):
+            supplier_id = supplier_ids[index] if index < len(supplier_ids) else rng.choice(supplier_ids)  # У каждого хотя бы один
+            contract_id = self.new_id(Contract.__table__)
+            start_date = self.anchor - timedelta(days=rng.randint(30, 730))
+            self.add(Contract.__table__, {
+                "id": contract_id, "supplier_id": supplier_id, "title": f"Договор поставки №{contract_id}",
+                "start_date": start_date, "end_date": start_date + timedelta(days=rng.randint(180, 760)),
+                "file_path": None,
+            })
+            self.contracts_by_supplier.setdefault(supplier_id, []).append(contract_id)
+
+    def films_and_licenses(self) -> None:
+        rng = self.rng
+        self.films = []  # (ID, длительность, первый день проката, последний день проката)
+        period_days = DAYS_BEFORE + DAYS_AFTER
+        for _ in range(self.plan["films"]):
+            film_id = self.new_id(Film.__table__)
+            release = self.first_day + timedelta(days=rng.randint(-60, period_days - 30))
+            last_day = release + timedelta(days=rng.randint(45, 120))
+            supplier_id = rng.choice(self.distributors)
+            title = f"{rng.choice(_FILM_WORDS)} {rng.choice(_FILM_WORDS).lower()} {film_id}"
+            self.add(License.__table__, {
+                "id": film_id, "supplier_id": supplier_id,
+                "contract_id": rng.choice(self.contracts_by_supplier[supplier_id]),
+                "film_title": title, "digital_key": f"DK-{film_id:08d}-{rng.randrange(16**8):08x}",
+                "start_date": release - timedelta(days=7), "end_date": last_day + timedelta(days=rng.randint(0, 30)),
+            })  # Лицензия на каждый фильм
+            duration = rng.randint(80, 165)  # Помещается в интервал сеанса с уборкой
+            self.add(Film.__table__, {"id": film_id, "license_id": film_id, "title": title, "duration": duration,
+                                      "description": f"Синтетический фильм №{film_id}"})
+            self.films.append((film_id, duration, release, last_day))
+        self.flush()
+
+    def halls(self) -> None:
+        rng = self.rng
+        self.hall_seats = []  # (ID, название, номера мест)
+        for _ in range(self.plan["halls"]):
+            hall_id = self.new_id(Hall.__table__)
+            rows, seats_per_row = rng.randint(8, 16), rng.randint(10, 20)
+            name = f"Зал {hall_id}"
+            self.add(Hall.__table__, {"id": hall_id, "name": name, "rows": rows, "seats_per_row": seats_per_row,
+                                      "capacity": rows * seats_per_row, "seat_categories": None})
+            seats = [f"{row}-{seat}" for row in range(1, rows + 1) for seat in range(1, seats_per_row + 1)]
+            self.hall_seats.append((hall_id, name, rows, seats_per_row, seats))
+        self.flush()
+
+    # ПОКАЗЫ, БИЛЕТЫ И ЗАКАЗЫ КЛИЕНТОВ
+
+    def screenings_and_tickets(self) -> None:
+        rng = self.rng
+        period_days = DAYS_BEFORE + DAYS_AFTER
+        future_index = 0
+        for day_index in range(period_days + 1):
+            day = self.first_day + timedelta(days=day_index)
+            if day == self.anchor:  # Сегодняшних показов нет: прошлое и будущее не пересекаются
+                continue
+            films = [film for film in self.films if film[2] <= day <= film[3]] or self.films
+            for hall_id, hall_name, rows, seats_per_row, seats in self.hall_seats:
+                for slot, show_time in enumerate(SHOW_TIMES):
+                    film_id, duration, _, _ = rng.choice(films)
+                    start = datetime.combine(day, show_time)
+                    price = SHOW_PRICES[slot] + rng.choice((0.0, 0.0, 50.0, -50.0))
+                    screening_id = self.new_id(Screening.__table__)
+                    self.add(Screening.__table__, {
+                        "id": screening_id, "film_id": film_id, "datetime": start,
+                        "end_datetime": start + timedelta(minutes=duration), "hall": hall_name,
+                        "hall_id": hall_id, "ticket_price": price,
+                    })
+                    if day < self.anchor:
+                        occupancy = rng.betavariate(2, 5)
+                        self.sell(screening_id, start, price, seats, occupancy, inventory=False)
+                    else:
+                        future_index += 1
+                        seat_map = future_index % SEAT_MAP_EVERY == 0
+                        sold = self.sell(screening_id, start, price, seats, rng.uniform(0.0, 0.3),
+                                         inventory=not seat_map)
+                        if seat_map:
+                            self.seat_map(screening_id, rows, seats_per_row, seats, sold)
+            if day_index % 30 == 0:
+                self.report(5 + 85 * day_index // period_days)
+
+    def sell(self, screening_id: int, start: datetime, price: float, seats: List[str], occupancy: float,
+             inventory: bool) -> List[int]:  # Билеты показа, вернуть индексы проданных мест
+        rng = self.rng
+        sold_indexes = sorted(rng.sample(range(len(seats)), int(len(seats) * occupancy)))
+        sold_set = set(sold_indexes)
+        sales_start = min(start - timedelta(days=7), self.midnight - timedelta(days=7))
+        sales_end = min(start, self.midnight)
+        window = int((sales_end - sales_start).total_seconds())
+
+        position = 0
+        while position < len(sold_indexes):  # Места продаются заказами по 1-4 билета
+            size = rng.choice((1, 2, 2, 2, 3, 4))
+            group = sold_indexes[position:position + size]
+            position += size
+            order_id = self.new_id(OrderClients.__table__)
+            sold_at = sales_start + timedelta(seconds=rng.randrange(max(window, 1)))
+            self.add(OrderClients.__table__, {
+                "id": order_id, "client_name": f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}",
+                "phone": f"+7 9{rng.randrange(10**9):09d}", "order_date": sold_at,
+                "total_amount": round(price * len(group), 2), "status": "оформлен",
+            })
+            for index in group:
+                ticket_id = self.new_id(Ticket.__table__)
+                self.add(Ticket.__table__, {"id": ticket_id, "screening_id": screening_id, "order_id": order_id,
+                                            "seat_number": seats[index], "price": price, "sold": True,
+                                            "sold_date": sold_at})
+                if rng.random() < COMPLAINT_RATE:
+                    self.add(Complaint.__table__, {
+                        "id": self.new_id(Complaint.__table__), "order_id": order_id, "ticket_id": ticket_id,
+                        "description": rng.choice(_COMPLAINTS),
+                        "date": min(start + timedelta(days=1), self.midnight - timedelta(minutes=1)),
+                        "status": rng.choice(_COMPLAINT_STATUSES),
+                    })
+        if inventory:  # Непроданные места - билеты со статусом "не продан"
+            for index, seat_number in enumerate(seats):
+                if index not in sold_set:
+                    self.add(Ticket.__table__, {"id": self.new_id(Ticket.__table__), "screening_id": screening_id,
+                                                "order_id": None, "seat_number": seat_number, "price": price,
+                                                "sold": False, "sold_date": None})
+        return sold_indexes
+
+    def seat_map(self, screening_id: int, rows: int, seats_per_row: int, seats: List[str],
+                 sold_indexes: List[int]) -> None:
+        occupancy = bytearray((len(seats) + 7) // 8)
+        for index in sold_indexes:
+            occupancy[index // 8] |= 1 << (index % 8)
+        layout = {str(row): seats_per_row for row in range(1, rows + 1)}  # Схема зала, как в get_hall_layout
+        self.add(SeatMap.__table__, {"screening_id": screening_id, "layout": json.dumps(layout, ensure_ascii=False),
+                                     "seat_count": len(seats),
+                                     "occupancy": bytes(occupancy), "price_overrides": None, "version": 0})
+
+    # ЗАКАЗЫ ПОСТАВЩИКАМ И ОЦЕНКИ
+
+    def supplier_orders(self) -> None:
+        rng = self.rng
+        supplier_ids = list(self.contracts_by_supplier)
+        for _ in range(self.plan["supplier_orders"]):
+            order_id = self.new_id(OrderSupliers.__table__)
+            supplier_id = rng.choice(supplier_ids)
+            created = self.midnight - timedelta(days=DAYS_BEFORE) + timedelta(
+                seconds=rng.randrange(DAYS_BEFORE * 86400))
+            status = rng.choice(_ORDER_STATUSES)
+            items = []
+            for _ in range(rng.randint(1, 5)):
+                quantity, price = rng.randint(1, 200), float(rng.randint(50, 5000))
+                items.append({"id": self.new_id(OrderItem.__table__), "order_id": order_id,
+                              "product_name": rng.choice(_PRODUCTS), "quantity": quantity, "price": price,
+                              "total_price": quantity * price})
+            self.add(OrderSupliers.__table__, {
+                "id": order_id, "supplier_id": supplier_id,
+                "contract_id": rng.choice(self.contracts_by_supplier[supplier_id]), "status": status,
+                "created_date": created,
+                "delivery_date": (created + timedelta(days=rng.randint(1, 20))).date() if status == "доставлен" else None,
+                "total_amount": round(sum(item["total_price"] for item in items), 2),
+            })
+            for item in items:
+                self.add(OrderItem.__table__, item)
+
+    def scores(self) -> None:
+        rng = self.rng
+        for supplier_id in range(1, self.plan["suppliers"] + 1):
+            for month in range(12):  # Ежемесячная оценка за год
+                scores = [round(rng.uniform(1.0, 5.0), 1) for _ in range(4)]
+                self.add(SupplierKPI.__table__, {
+                    "id": self.new_id(SupplierKPI.__table__), "supplier_id": supplier_id,
+                    "count_score": scores[0], "on_time_delivery": scores[1], "quantity_score": scores[2],
+                    "budget_adherence": scores[3],
+                    "calculation_date": self.midnight - timedelta(days=30 * month + rng.randint(1, 29)),
+                    "overall_rating": round(sum(scores) / 4, 2),
+                })